@@ -0,0 +1,236 @@
+'''
+Solve a JSONL corpus of Omni/Chess payloads on a local process pool.
+
+    python BatchSolve.py puzzles.jsonl results.jsonl [--workers 8] [--kind auto]
+
+Results are appended to the output file as JSONL, one record per input line, tagged with
+the index of the line. Records are flushed as soon as they are written, so the output
+file is also the checkpoint: running the same command again after a crash skips the lines
+that already have a result and solves the rest.
+'''
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from pydantic import ValidationError
+
+import SolverConfig
+import SolverLog
+from InputJSONClass import Omni, Chess
+from SolverBatch import BatchOutcome
+
+def InitializeWorker(Verbose):
+    
+    # The progress messages of the solvers would drown the progress report. Their warnings
+    # and errors are still logged (on stderr).
+    if not Verbose:
+        SolverLog.RaiseLevel("WARNING")
+    
+    importlib.import_module("SolverManager")
+
+def SolveChunk(Kind, Payloads, SearchWorkerCeiling):
+    
+    import SolverManager
+    
+    if Kind == "chess":
+        return SolverManager.ChessBatchManager(Payloads, SearchWorkerCeiling)
+    
+    return SolverManager.OmniBatchManager(Payloads, SearchWorkerCeiling)
+
+def PayloadKind(Payload, Kind):
+    
+    # Chess payloads have an Order and no grid
+    if Kind == "auto":
+        return "chess" if "Order" in Payload and "Matrix" not in Payload else "omni"
+    
+    return Kind
+
+def CompletedIndices(OutputPath):
+    
+    '''
+    Indices of the input lines that already have a result in the output file. A partly
+    written last line (eg: after a crash) is cut off so that it can be written again.
+    '''
+    
+    Completed = set()
+    
+    if not os.path.exists(OutputPath):
+        return Completed
+    
+    with open(OutputPath, "rb+") as File:
+        ValidLength = 0
+        for Line in File:
+            if not Line.endswith(b"\n"):
+                break
+            
+            try:
+                Completed.add(json.loads(Line)["index"])
+            except (ValueError, KeyError, TypeError):
+                break
+            
+            ValidLength += len(Line)
+        
+        File.truncate(ValidLength)
+    
+    return Completed
+
+def ReadItems(InputPath, Completed, Kind):
+    
+    '''
+    Yield (Index, Kind, Payload or error message) for the lines of the input file that do
+    not have a result yet.
+    '''
+    
+    with open(InputPath, "r", encoding="utf-8") as File:
+        for Index, Line in enumerate(File):
+            if Index in Completed or not Line.strip():
+                continue
+            
+            try:
+                Payload = json.loads(Line)
+                ItemKind = PayloadKind(Payload, Kind)
+                Model = Chess if ItemKind == "chess" else Omni
+                yield Index, ItemKind, Model.model_validate(Payload)
+            except (ValueError, ValidationError, TypeError) as e:
+                yield Index, None, f"Invalid payload: {str(e)}"
+
+def ResultRecord(Index, Solutions, Details):
+    
+    Record = {"index": Index, "outcome": BatchOutcome(Solutions, Details)}
+    
+    if Solutions is None:
+        Record.update({"success": False, "solutions": [], "message": Details})
+    else:
+        Record.update({"success": bool(Solutions), "solutions": Solutions, **Details})
+    
+    return Record
+
+class ProgressReport:
+    
+    def __init__(self, Interval, Skipped):
+        
+        self.Interval = Interval
+        self.Skipped = Skipped
+        self.Solved = 0
+        self.StartTime = time.time()
+        self.LastTime = self.StartTime
+        self.LastSolved = 0
+    
+    def Update(self, Count, Force=False):
+        
+        self.Solved += Count
+        Now = time.time()
+        
+        if not Force and Now - self.LastTime < self.Interval:
+            return
+        
+        Rate = (self.Solved - self.LastSolved) / max(Now - self.LastTime, 1e-9)
+        Overall = self.Solved / max(Now - self.StartTime, 1e-9)
+        
+        print(f"{self.Solved} puzzle(s) done ({self.Skipped} skipped from earlier runs), "
+              f"{Rate:.1f} puzzles/sec now, {Overall:.1f} puzzles/sec overall", file=sys.stderr)
+        
+        self.LastTime = Now
+        self.LastSolved = self.Solved
+
+def RunBatchSolve(InputPath, OutputPath, Workers, ChunkSize, Kind="auto", Verbose=False, Interval=5.0):
+    
+    Completed = CompletedIndices(OutputPath)
+    Progress = ProgressReport(Interval, len(Completed))
+    
+    # The cores are shared between the solver processes
+    SearchWorkerCeiling = max((os.cpu_count() or 1) // max(Workers, 1), 1)
+    
+    if Workers > 0:
+        Executor = ProcessPoolExecutor(
+            max_workers=Workers,
+            mp_context=multiprocessing.get_context(SolverConfig.SOLVER_START_METHOD),
+            initializer=InitializeWorker,
+            initargs=(Verbose,),
+        )
+    else:
+        Executor = ThreadPoolExecutor(max_workers=1, initializer=InitializeWorker, initargs=(Verbose,))
+    
+    # Chunks read ahead of the workers, so that the input is never loaded at once
+    MaxInFlight = 2*max(Workers, 1)
+    InFlight = {}
+    Chunks = {"omni": [], "chess": []}
+    
+    with Executor, open(OutputPath, "a", encoding="utf-8") as Output:
+        
+        def Write(Records):
+            for Record in Records:
+                Output.write(json.dumps(Record) + "\n")
+            Output.flush()
+            Progress.Update(len(Records))
+        
+        def Collect(ReturnWhen):
+            Done, _ = wait(InFlight, return_when=ReturnWhen)
+            for Future in Done:
+                Indices = InFlight.pop(Future)
+                try:
+                    Results = Future.result()
+                except Exception as e:
+                    Results = [(None, f"Error solving puzzle: {str(e)}")]*len(Indices)
+                Write([ResultRecord(Index, *Result) for Index, Result in zip(Indices, Results)])
+        
+        def Submit(ItemKind):
+            Chunk = Chunks[ItemKind]
+            Chunks[ItemKind] = []
+            
+            while len(InFlight) >= MaxInFlight:
+                Collect(FIRST_COMPLETED)
+            
+            Future = Executor.submit(SolveChunk, ItemKind, [Payload for _, Payload in Chunk], SearchWorkerCeiling)
+            InFlight[Future] = [Index for Index, _ in Chunk]
+        
+        for Index, ItemKind, Item in ReadItems(InputPath, Completed, Kind):
+            
+            if ItemKind is None:
+                Write([{"index": Index, "outcome": "invalid", "success": False, "solutions": [], "message": Item}])
+                continue
+            
+            Chunks[ItemKind].append((Index, Item))
+            if len(Chunks[ItemKind]) >= ChunkSize:
+                Submit(ItemKind)
+        
+        for ItemKind in Chunks:
+            if Chunks[ItemKind]:
+                Submit(ItemKind)
+        
+        while InFlight:
+            Collect(FIRST_COMPLETED)
+    
+    Progress.Update(0, Force=True)
+    
+    return Progress.Solved
+
+def main():
+    
+    Parser = argparse.ArgumentParser(description="Solve a JSONL file of Omni/Chess payloads, resuming earlier runs.")
+    Parser.add_argument("input", help="JSONL file with one payload per line")
+    Parser.add_argument("output", help="JSONL file the results are appended to")
+    Parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Solver processes (0 solves in this process). Defaults to the number of cores")
+    Parser.add_argument("--chunk-size", type=int, default=SolverConfig.SOLVER_BATCH_CHUNK_SIZE,
+                        help="Puzzles sent to a solver process at once")
+    Parser.add_argument("--kind", choices=["auto", "omni", "chess"], default="auto",
+                        help="Payload type. auto treats payloads with an Order and no Matrix as chess")
+    Parser.add_argument("--progress-interval", type=float, default=5.0,
+                        help="Seconds between throughput reports")
+    Parser.add_argument("--verbose", action="store_true",
+                        help="Log the progress of the solvers at SOLVER_LOG_LEVEL instead of only their warnings and errors")
+    
+    Args = Parser.parse_args()
+    
+    RunBatchSolve(Args.input, Args.output, Args.workers, max(Args.chunk_size, 1), Args.kind,
+                  Args.verbose, Args.progress_interval)
+
+if __name__ == "__main__":
+    main()
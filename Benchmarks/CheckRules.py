@@ -0,0 +1,650 @@
+'''
+Rules of the constraint methods used by the benchmark corpus, checked on solved grids.
+
+The benchmarks compare the status and the number of solutions of every case against the
+expected results, which only tells that an answer did not change. The solutions are also
+checked here against the rules of the puzzle, written directly from the rule (sums, orders,
+visibility, ...) with plain Python instead of the CP-SAT encodings, so that a wrong encoding
+cannot pass the benchmarks by also being the expected result.
+
+Every rule has the name and the arguments of the solver method that adds it, with the grid
+and the puzzle payload before them, and returns the ways the grid breaks it. A case with a
+method that has no rule here is reported as unchecked.
+'''
+
+from collections import Counter
+from itertools import product
+
+KingMoves = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+KnightMoves = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+OrthogonalMoves = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+DiagonalMoves = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+def Plain(Value):
+    
+    # Maps are written as {"ndarray": [...]} in the corpus
+    if isinstance(Value, dict) and "ndarray" in Value:
+        return Value["ndarray"]
+    
+    if isinstance(Value, list):
+        return [Plain(Item) for Item in Value]
+    
+    return Value
+
+def Values(Grid, Cells):
+    
+    return [Grid[r][c] for r, c in Cells]
+
+def Regions(Map):
+    
+    # Cells of every region of a map in the order of the region IDs, without the cells marked 0
+    Cells = {}
+    for r, Row in enumerate(Map):
+        for c, UID in enumerate(Row):
+            if UID != 0:
+                Cells.setdefault(UID, []).append((r, c))
+    
+    return [Cells[UID] for UID in sorted(Cells)]
+
+def Repeats(Grid, Cells, Name):
+    
+    Seen = Values(Grid, Cells)
+    return [] if len(set(Seen)) == len(Seen) else [f"{Name} {Cells[0]}: repeated digits {Seen}"]
+
+def Neighbours(Grid, Moves):
+    
+    # Every pair of cells one of the moves apart, once
+    N = len(Grid)
+    for r, c in product(range(N), range(N)):
+        for dr, dc in Moves:
+            r2, c2 = r + dr, c + dc
+            if 0 <= r2 < N and 0 <= c2 < N and (r, c) < (r2, c2):
+                yield (r, c), (r2, c2)
+
+def PairErrors(Grid, Pairs, Breaks, Name):
+    
+    return [f"{Name} {A}-{B}: {Grid[A[0]][A[1]]}, {Grid[B[0]][B[1]]}"
+            for A, B in Pairs if Breaks(Grid[A[0]][A[1]], Grid[B[0]][B[1]])]
+
+def IsRenban(Digits):
+    
+    return len(set(Digits)) == len(Digits) and max(Digits) - min(Digits) == len(Digits) - 1
+
+def Visible(Line):
+    
+    Count, Peak = 0, None
+    for Height in Line:
+        if Peak is None or Height > Peak:
+            Count, Peak = Count + 1, Height
+    
+    return Count
+
+def Rows(Grid):
+    
+    return [[(r, c) for c in range(len(Grid))] for r in range(len(Grid))]
+
+def Cols(Grid):
+    
+    return [[(r, c) for r in range(len(Grid))] for c in range(len(Grid))]
+
+# Grids
+
+def SudokuRowConstraints(Grid, puzzle):
+    
+    return [Error for Row in Rows(Grid) for Error in Repeats(Grid, Row, "row")]
+
+def SudokuColConstraints(Grid, puzzle):
+    
+    return [Error for Col in Cols(Grid) for Error in Repeats(Grid, Col, "column")]
+
+def SudokuSubGridConstraints(Grid, puzzle):
+    
+    # Boxes of OrderRow rows and OrderCol columns
+    Boxes = {}
+    for r, c in product(range(len(Grid)), repeat=2):
+        Boxes.setdefault((r // puzzle.OrderRow, c // puzzle.OrderCol), []).append((r, c))
+    
+    return [Error for Box in Boxes.values() for Error in Repeats(Grid, Box, "box")]
+
+def InitializeGivenEntries(Grid, puzzle):
+    
+    return [f"given {(r, c)}: {Grid[r][c]} instead of {Given}"
+            for r, Row in enumerate(puzzle.Matrix) for c, Given in enumerate(Row) if Given and Grid[r][c] != Given]
+
+def ClassicSudokuConstraints(Grid, puzzle):
+    
+    return (SudokuRowConstraints(Grid, puzzle) + SudokuColConstraints(Grid, puzzle)
+            + SudokuSubGridConstraints(Grid, puzzle) + InitializeGivenEntries(Grid, puzzle))
+
+def LatinSquares(Grid, puzzle):
+    
+    return SudokuRowConstraints(Grid, puzzle) + SudokuColConstraints(Grid, puzzle) + InitializeGivenEntries(Grid, puzzle)
+
+def SudokuCustomGridConstraints(Grid, puzzle, SubGridMap):
+    
+    return [Error for Region in Regions(SubGridMap) for Error in Repeats(Grid, Region, "region")]
+
+# Extra regions
+
+def CellSets(*Sets):
+    
+    # A rule made of sets of cells with distinct digits
+    return lambda Grid, puzzle: [Error for Cells in Sets for Error in Repeats(Grid, Cells, "region")]
+
+def Diagonal(Grid, Anti):
+    
+    N = len(Grid)
+    return [(i, N - 1 - i) if Anti else (i, i) for i in range(N)]
+
+def TLBR_DiagonalConstraint(Grid, puzzle):
+    
+    return Repeats(Grid, Diagonal(Grid, False), "diagonal")
+
+def TRBL_DiagonalConstraint(Grid, puzzle):
+    
+    return Repeats(Grid, Diagonal(Grid, True), "anti-diagonal")
+
+def DisjointConstraints(Grid, puzzle):
+    
+    # The cells in the same position of their boxes
+    Sets = {}
+    for r, c in product(range(len(Grid)), repeat=2):
+        Sets.setdefault((r % puzzle.OrderRow, c % puzzle.OrderCol), []).append((r, c))
+    
+    return [Error for Cells in Sets.values() for Error in Repeats(Grid, Cells, "disjoint set")]
+
+def WindokuConstraints(Grid, puzzle, visualize=True):
+    
+    # The four windows and the five regions left between them, by the bands of the rows and columns
+    Bands = [[1, 2, 3], [5, 6, 7], [0, 4, 8]]
+    return [Error for RowBand, ColBand in product(Bands, repeat=2)
+            for Error in Repeats(Grid, list(product(RowBand, ColBand)), "windoku region")]
+
+def ArgyleConstraints(Grid, puzzle):
+    
+    # The diagonals one and four cells away from the main diagonals of the 9x9 grid
+    Lines = [[(r, c) for r, c in product(range(9), repeat=2) if c - r == Offset] for Offset in (-4, -1, 1, 4)]
+    Lines += [[(r, c) for r, c in product(range(9), repeat=2) if r + c == Offset] for Offset in (4, 7, 9, 12)]
+    
+    return [Error for Line in Lines for Error in Repeats(Grid, Line, "argyle line")]
+
+GirandolaConstraints = CellSets([(0, 0), (0, 8), (1, 4), (4, 1), (4, 4), (4, 7), (7, 4), (8, 0), (8, 8)])
+CentreDotConstraints = CellSets([(r, c) for r, c in product((1, 4, 7), repeat=2)])
+AsteriskConstraints = CellSets([(2, 2), (1, 4), (2, 6), (4, 1), (4, 4), (4, 7), (6, 2), (7, 4), (6, 6)])
+
+def MagicSquareConstraints(Grid, puzzle, magic_square_list):
+    
+    Errors = []
+    for Square in magic_square_list:
+        
+        Size = round(len(Square)**0.5)
+        Magic = Size*(Size*Size + 1)//2
+        Digits = [Values(Grid, Square[Row*Size:(Row + 1)*Size]) for Row in range(Size)]
+        
+        Lines = Digits + [list(Col) for Col in zip(*Digits)]
+        Lines += [[Digits[i][i] for i in range(Size)], [Digits[i][Size - 1 - i] for i in range(Size)]]
+        
+        Errors += Repeats(Grid, Square, "magic square")
+        Errors += [f"magic square {Square[0]}: {Line} does not add up to {Magic}" for Line in Lines if sum(Line) != Magic]
+    
+    return Errors
+
+# Neighbours
+
+def AntiKnightConstraints(Grid, puzzle):
+    
+    return PairErrors(Grid, Neighbours(Grid, KnightMoves), lambda A, B: A == B, "knight's move")
+
+def AntiKingConstraints(Grid, puzzle):
+    
+    return PairErrors(Grid, Neighbours(Grid, KingMoves), lambda A, B: A == B, "king's move")
+
+def NonConsecutive(Moves, Cells=None):
+    
+    def Check(Grid, puzzle):
+        Pairs = [Pair for Pair in Neighbours(Grid, Moves) if Cells is None or Pair[0] in Cells or Pair[1] in Cells]
+        return PairErrors(Grid, Pairs, lambda A, B: abs(A - B) == 1, "consecutive")
+    
+    return Check
+
+def OrthogonalNonConsecConstraints(Grid, puzzle):
+    
+    return NonConsecutive(OrthogonalMoves)(Grid, puzzle)
+
+def DiagonalNonConsecConstraints(Grid, puzzle):
+    
+    return NonConsecutive(DiagonalMoves)(Grid, puzzle)
+
+def OrthogonalNonConsecCells(Grid, puzzle, cells):
+    
+    return NonConsecutive(OrthogonalMoves, set(map(tuple, cells)))(Grid, puzzle)
+
+def DiagonalNonConsecCells(Grid, puzzle, cells):
+    
+    return NonConsecutive(DiagonalMoves, set(map(tuple, cells)))(Grid, puzzle)
+
+def OrthogonalMinDifferenceConstraints(Grid, puzzle, min_diff=2):
+    
+    return PairErrors(Grid, Neighbours(Grid, OrthogonalMoves), lambda A, B: abs(A - B) < min_diff, "close")
+
+def DiagonalMinDifferenceConstraints(Grid, puzzle, min_diff=2):
+    
+    return PairErrors(Grid, Neighbours(Grid, DiagonalMoves), lambda A, B: abs(A - B) < min_diff, "close")
+
+def KropkiRatioConstraints(Grid, puzzle, numerator, denominator):
+    
+    # A is the top/left cell of the pair and B the bottom/right one
+    return PairErrors(Grid, Neighbours(Grid, OrthogonalMoves),
+                      lambda A, B: A == numerator*B or B == denominator*A, "ratio")
+
+def KropkiOrthogonalAntiSumConstraints(Grid, puzzle, kropki_sum, PairExceptions=None):
+    
+    Exceptions = {(tuple(A), tuple(B)) for A, B in PairExceptions or []}
+    Pairs = [Pair for Pair in Neighbours(Grid, OrthogonalMoves) if Pair not in Exceptions]
+    
+    return PairErrors(Grid, Pairs, lambda A, B: A + B == kropki_sum, f"sum {kropki_sum}")
+
+def OrthogonalNeighbouringSums(Grid, puzzle, cells):
+    
+    N = len(Grid)
+    Errors = []
+    for r, c in cells:
+        Total = sum(Grid[r + dr][c + dc] for dr, dc in OrthogonalMoves if 0 <= r + dr < N and 0 <= c + dc < N)
+        if Grid[r][c] != Total:
+            Errors.append(f"neighbouring sum {(r, c)}: {Grid[r][c]} instead of {Total}")
+    
+    return Errors
+
+# Cages and regions
+
+def KillerSudokuConstraints(Grid, puzzle, KillerCageSums, KillerCageMap):
+    
+    Errors = []
+    for Cage, Total in zip(Regions(KillerCageMap), KillerCageSums):
+        Errors += Repeats(Grid, Cage, "cage")
+        if Total != -1 and sum(Values(Grid, Cage)) != Total:
+            Errors.append(f"cage {Cage[0]}: {Values(Grid, Cage)} does not add up to {Total}")
+    
+    return Errors
+
+def LittleKillerSudokuConstraints(Grid, puzzle, KillerCageSums, KillerCageMap):
+    
+    return [f"little killer {Cage[0]}: {Values(Grid, Cage)} does not add up to {Total}"
+            for Cage, Total in zip(Regions(KillerCageMap), KillerCageSums)
+            if Total is not None and sum(Values(Grid, Cage)) != Total]
+
+def KillerCageConstraintsWithUnknownSums(Grid, puzzle, KillerCageMap, UnknownSums=False, SumOfAllCagesGiven=False,
+                                         SumOfAllCages=0, SameSumCageGroups=False, SameSumCageGroupIDs=None,
+                                         UniqueCageGroupSums=False, EqualSumCages=False):
+    
+    Cages = dict(zip(sorted({UID for Row in KillerCageMap for UID in Row} - {0}), Regions(KillerCageMap)))
+    Sums = {UID: sum(Values(Grid, Cage)) for UID, Cage in Cages.items()}
+    
+    Errors = []
+    if UnknownSums:
+        Errors += [Error for Cage in Cages.values() for Error in Repeats(Grid, Cage, "cage")]
+    
+    if SumOfAllCagesGiven and sum(Sums.values()) != SumOfAllCages:
+        Errors.append(f"cages add up to {sum(Sums.values())} instead of {SumOfAllCages}")
+    
+    Groups = [list(Group) for Group in SameSumCageGroupIDs or []]
+    if SameSumCageGroups:
+        Errors += [f"cages {Group} do not have the same sum" for Group in Groups if len({Sums[UID] for UID in Group}) > 1]
+    
+    if UniqueCageGroupSums:
+        GroupSums = [Sums[Group[0]] for Group in Groups]
+        if len(set(GroupSums)) != len(GroupSums):
+            Errors.append(f"cage groups share a sum: {GroupSums}")
+    
+    if EqualSumCages and len(set(Sums.values())) > 1:
+        Errors.append("cages do not have the same sum")
+    
+    return Errors
+
+def RegionSumConstraints(Grid, puzzle, RegionSums, RegionMap, RegionUniqueness):
+    
+    Errors = []
+    for Region, Total, Unique in zip(Regions(RegionMap), RegionSums, RegionUniqueness):
+        if Unique == 1:
+            Errors += Repeats(Grid, Region, "region")
+        if Total != -1 and sum(Values(Grid, Region)) != Total:
+            Errors.append(f"region {Region[0]}: {Values(Grid, Region)} does not add up to {Total}")
+    
+    return Errors
+
+def RestrictedCellsConstraints(Grid, puzzle, CellMap, CellValLists):
+    
+    return [f"restricted {Cell}: {Grid[Cell[0]][Cell[1]]} not in {Allowed}"
+            for Group, Allowed in zip(Regions(CellMap), CellValLists)
+            for Cell in Group if Grid[Cell[0]][Cell[1]] not in Allowed]
+
+def OddEvenConstraints(Grid, puzzle, OddEvenMap):
+    
+    # 1 marks the odd cells and 2 the even ones
+    return [f"parity {(r, c)}: {Grid[r][c]}" for r, Row in enumerate(OddEvenMap) for c, Parity in enumerate(Row)
+            if Parity and Grid[r][c] % 2 != Parity % 2]
+
+def CloneRegions(Grid, puzzle, Set1, Set2):
+    
+    return [f"clone {Region1[0]}: {Values(Grid, Region1)} and {Values(Grid, Region2)}"
+            for Region1, Region2 in zip(Set1, Set2) if Values(Grid, Region1) != Values(Grid, Region2)]
+
+def SameSetRegions(Grid, puzzle, Set1, Set2):
+    
+    return [f"same set {Region1[0]}: {Values(Grid, Region1)} and {Values(Grid, Region2)}"
+            for Region1, Region2 in zip(Set1, Set2) if Counter(Values(Grid, Region1)) != Counter(Values(Grid, Region2))]
+
+def QuadsConstraints(Grid, puzzle, QuadsIDs, QuadsVals):
+    
+    Errors = []
+    for (r, c), Digits in zip(QuadsIDs, QuadsVals):
+        Quad = Values(Grid, [(r, c), (r, c + 1), (r + 1, c), (r + 1, c + 1)])
+        Errors += [f"quad {(r, c)}: {Digit} missing from {Quad}" for Digit in set(Digits) if Digit not in Quad]
+    
+    return Errors
+
+# Lines
+
+def RenbanLinesConstraints(Grid, puzzle, lines, linecolour=None, loop=False, TreatAsCells=False, Encoding="minmax"):
+    
+    return [f"renban {Line[0]}: {Values(Grid, Line)}" for Line in lines if not IsRenban(Values(Grid, Line))]
+
+def WarpingRenbanLinesConstraints(Grid, puzzle, LineSet1, LineSet2, linecolour=None, Encoding="minmax"):
+    
+    # Both lines are renbans, or the two lines together form one
+    return [f"warping renban {Line1[0]}: {Values(Grid, Line1)} and {Values(Grid, Line2)}"
+            for Line1, Line2 in zip(LineSet1, LineSet2)
+            if not (IsRenban(Values(Grid, Line1)) and IsRenban(Values(Grid, Line2)))
+            and not IsRenban(Values(Grid, Line1 + Line2))]
+
+def NabnerLinesConstraints(Grid, puzzle, lines, linecolour=None, loop=False, TreatAsCells=False):
+    
+    Errors = []
+    for Line in lines:
+        Digits = Values(Grid, Line)
+        if len(set(Digits)) != len(Digits) or any(abs(A - B) == 1 for A in Digits for B in Digits):
+            Errors.append(f"nabner {Line[0]}: {Digits}")
+    
+    return Errors
+
+def LineDifferences(Grid, puzzle, differences, difference_conditions, lines, linecolour=None, loop=False):
+    
+    # Neighbours along a line differ by at least (1), exactly (0) or at most (-1) the difference
+    Holds = {1: lambda Gap, Difference: Gap >= Difference,
+             0: lambda Gap, Difference: Gap == Difference,
+             -1: lambda Gap, Difference: Gap <= Difference}
+    
+    Errors = []
+    for Difference, Condition, Line in zip(differences, difference_conditions, lines):
+        Digits = Values(Grid, Line)
+        Errors += [f"line difference {Line[0]}: {Digits}" for A, B in zip(Digits, Digits[1:])
+                   if not Holds[Condition](abs(A - B), Difference)][:1]
+    
+    return Errors
+
+def PalindromeLineConstraints(Grid, puzzle, Lines):
+    
+    return [f"palindrome {Line[0]}: {Values(Grid, Line)}" for Line in Lines if Values(Grid, Line) != Values(Grid, Line[::-1])]
+
+def ThermometerConstraints(Grid, puzzle, thermometer_IDs):
+    
+    return [f"thermometer {Thermo[0]}: {Values(Grid, Thermo)}" for Thermo in thermometer_IDs
+            if any(A >= B for A, B in zip(Values(Grid, Thermo), Values(Grid, Thermo)[1:]))]
+
+def SlowThermometerConstraints(Grid, puzzle, thermometer_IDs):
+    
+    return [f"slow thermometer {Thermo[0]}: {Values(Grid, Thermo)}" for Thermo in thermometer_IDs
+            if any(A > B for A, B in zip(Values(Grid, Thermo), Values(Grid, Thermo)[1:]))]
+
+def ArrowSum(Grid, puzzle, arrow_circles, arrow_bodies):
+    
+    return [f"arrow {tuple(Circle)}: {Values(Grid, Body)}" for Circle, Body in zip(arrow_circles, arrow_bodies)
+            if sum(Values(Grid, Body)) != Grid[Circle[0]][Circle[1]]]
+
+def ArrowAverage(Grid, puzzle, arrow_circles, arrow_bodies):
+    
+    return [f"arrow average {tuple(Circle)}: {Values(Grid, Body)}" for Circle, Body in zip(arrow_circles, arrow_bodies)
+            if sum(Values(Grid, Body)) != len(Body)*Grid[Circle[0]][Circle[1]]]
+
+def TwoDigitArrowSum(Grid, puzzle, arrow_circles1, arrow_circles2, arrow_bodies):
+    
+    return [f"two digit arrow {tuple(Tens)}: {Values(Grid, Body)}"
+            for Tens, Units, Body in zip(arrow_circles1, arrow_circles2, arrow_bodies)
+            if sum(Values(Grid, Body)) != 10*Grid[Tens[0]][Tens[1]] + Grid[Units[0]][Units[1]]]
+
+# Pairs of cells
+
+def PairValues(Grid, Pair):
+    
+    (r1, c1), (r2, c2) = Pair
+    return Grid[r1][c1], Grid[r2][c2]
+
+def IsRatio(A, B, Numerator, Denominator):
+    
+    return Numerator*B == Denominator*A or Numerator*A == Denominator*B
+
+def RatioPairs(Grid, puzzle, numerators, denominators, pairs):
+    
+    return [f"ratio {Pair}: {PairValues(Grid, Pair)}" for Numerator, Denominator, Pair in zip(numerators, denominators, pairs)
+            if not IsRatio(*PairValues(Grid, Pair), Numerator, Denominator)]
+
+def DifferencePairs(Grid, puzzle, differences, pairs):
+    
+    return [f"difference {Pair}: {PairValues(Grid, Pair)}" for Difference, Pair in zip(differences, pairs)
+            if abs(PairValues(Grid, Pair)[0] - PairValues(Grid, Pair)[1]) != Difference]
+
+def AdditionPairs(Grid, puzzle, sums, pairs):
+    
+    return [f"addition {Pair}: {PairValues(Grid, Pair)}" for Total, Pair in zip(sums, pairs)
+            if sum(PairValues(Grid, Pair)) != Total]
+
+def MultiAdditionPairs(Grid, puzzle, sums, pairs):
+    
+    return [f"addition {Pair}: {PairValues(Grid, Pair)}" for Totals, Pair in zip(sums, pairs)
+            if sum(PairValues(Grid, Pair)) not in Totals]
+
+def RatioPairsOrDifferencePairs(Grid, puzzle, numerators, denominators, differences, pairs):
+    
+    return [f"ratio or difference {Pair}: {PairValues(Grid, Pair)}"
+            for Numerator, Denominator, Difference, Pair in zip(numerators, denominators, differences, pairs)
+            if not IsRatio(*PairValues(Grid, Pair), Numerator, Denominator)
+            and abs(PairValues(Grid, Pair)[0] - PairValues(Grid, Pair)[1]) != Difference]
+
+# Outside clues
+
+def SandwichConstraints(Grid, puzzle, RowSums, ColSums, LowNumber=1, HighNumber=9, Encoding="compact"):
+    
+    Errors = []
+    for Lines, Clues in ((Rows(Grid), RowSums), (Cols(Grid), ColSums)):
+        for Line, Clue in zip(Lines, Clues):
+            
+            Digits = Values(Grid, Line)
+            if Clue is None:
+                continue
+            
+            if Digits.count(LowNumber) != 1 or Digits.count(HighNumber) != 1:
+                Errors.append(f"sandwich {Line[0]}: {Digits}")
+                continue
+            
+            Start, End = sorted((Digits.index(LowNumber), Digits.index(HighNumber)))
+            if sum(Digits[Start + 1:End]) != Clue:
+                Errors.append(f"sandwich {Line[0]}: {Digits} instead of {Clue}")
+    
+    return Errors
+
+def SkyscraperConstraints(Grid, puzzle, LeftSkyScrapers=None, RightSkyScrapers=None, TopSkyScrapers=None,
+                          BottomSkyScrapers=None, Encoding="auto"):
+    
+    Errors = []
+    for Lines, Front, Back in ((Rows(Grid), LeftSkyScrapers, RightSkyScrapers), (Cols(Grid), TopSkyScrapers, BottomSkyScrapers)):
+        for Index, Line in enumerate(Lines):
+            
+            Digits = Values(Grid, Line)
+            for Clues, Seen in ((Front, Digits), (Back, Digits[::-1])):
+                if Clues is not None and Clues[Index] is not None and Visible(Seen) != Clues[Index]:
+                    Errors.append(f"skyscraper {Line[0]}: {Visible(Seen)} visible in {Seen} instead of {Clues[Index]}")
+    
+    return Errors
+
+def ClassicKakurasuConstraints(Grid, puzzle, RowSums, ColSums):
+    
+    # Shaded cells count their column (row) number, from 1, towards the clue of their row (column)
+    Errors = []
+    for Lines, Clues in ((Rows(Grid), RowSums), (Cols(Grid), ColSums)):
+        for Line, Clue in zip(Lines, Clues):
+            Total = sum(Weight + 1 for Weight, Shaded in enumerate(Values(Grid, Line)) if Shaded)
+            if Clue is not None and Total != Clue:
+                Errors.append(f"kakurasu {Line[0]}: {Total} instead of {Clue}")
+    
+    return Errors
+
+def ClassicSumpleteConstraints(Grid, puzzle, RowSums, ColSums):
+    
+    # The numbers of the kept cells add up to the clue of their row/column
+    Errors = []
+    for Lines, Clues in ((Rows(Grid), RowSums), (Cols(Grid), ColSums)):
+        for Line, Clue in zip(Lines, Clues):
+            Total = sum(puzzle.Matrix[r][c] for r, c in Line if Grid[r][c])
+            if Clue is not None and Total != Clue:
+                Errors.append(f"sumplete {Line[0]}: {Total} instead of {Clue}")
+    
+    return Errors
+
+def ClassicOneUpConstraints(Grid, puzzle, RowGroups, ColGroups):
+    
+    # A group of n cells holds the digits 1 to n
+    Errors = []
+    for Group in Regions(RowGroups) + Regions(ColGroups):
+        if sorted(Values(Grid, Group)) != list(range(puzzle.LowerBound, puzzle.LowerBound + len(Group))):
+            Errors.append(f"one-up group {Group[0]}: {Values(Grid, Group)}")
+    
+    return Errors + InitializeGivenEntries(Grid, puzzle)
+
+# Shaded cells
+
+def RowCountConstraint(Grid, puzzle, count=2):
+    
+    return [f"row {Row[0]}: {sum(Values(Grid, Row))} instead of {count}" for Row in Rows(Grid) if sum(Values(Grid, Row)) != count]
+
+def ColCountConstraint(Grid, puzzle, count=2):
+    
+    return [f"column {Col[0]}: {sum(Values(Grid, Col))} instead of {count}" for Col in Cols(Grid) if sum(Values(Grid, Col)) != count]
+
+def StarBattleAdjacencyConstraint(Grid, puzzle):
+    
+    return PairErrors(Grid, Neighbours(Grid, KingMoves), lambda A, B: A == B == 1, "touching stars")
+
+def NoriNoriAdjacencyConstraint(Grid, puzzle):
+    
+    # Shaded cells come in dominoes: exactly one orthogonal neighbour of a shaded cell is shaded
+    N = len(Grid)
+    return [f"domino {(r, c)}" for r, c in product(range(N), repeat=2) if Grid[r][c] == 1
+            and sum(Grid[r + dr][c + dc] for dr, dc in OrthogonalMoves if 0 <= r + dr < N and 0 <= c + dc < N) != 1]
+
+def Diagonals(Grid):
+    
+    # Every diagonal and anti-diagonal of the grid
+    N = len(Grid)
+    Lines = {}
+    for r, c in product(range(N), repeat=2):
+        Lines.setdefault(("diagonal", r - c), []).append((r, c))
+        Lines.setdefault(("anti-diagonal", r + c), []).append((r, c))
+    
+    return list(Lines.values())
+
+def Pieces(Lines, Grid, Name, Exactly):
+    
+    return [f"{Name} {Line[0]}: {sum(Values(Grid, Line))} pieces" for Line in Lines
+            if sum(Values(Grid, Line)) > 1 or (Exactly and sum(Values(Grid, Line)) != 1)]
+
+def NQueensConstraint(Grid, puzzle):
+    
+    return NRooksConstraint(Grid, puzzle) + Pieces(Diagonals(Grid), Grid, "diagonal", False)
+
+def NRooksConstraint(Grid, puzzle):
+    
+    return Pieces(Rows(Grid), Grid, "row", True) + Pieces(Cols(Grid), Grid, "column", True)
+
+def NBishopsConstraint(Grid, puzzle, RowConstraint=False):
+    
+    Lines = Rows(Grid) if RowConstraint else Cols(Grid)
+    return Pieces(Lines, Grid, "line", True) + Pieces(Diagonals(Grid), Grid, "diagonal", False)
+
+# The rule of every solver method, by name
+Rules = {
+    "SudokuRowConstraints": SudokuRowConstraints, "SudokuColConstraints": SudokuColConstraints,
+    "SudokuSubGridConstraints": SudokuSubGridConstraints,
+    "InitializeGivenEntries": InitializeGivenEntries,
+    "ClassicSudokuConstraints": ClassicSudokuConstraints, "LatinSquares": LatinSquares,
+    "SudokuCustomGridConstraints": SudokuCustomGridConstraints,
+    "TLBR_DiagonalConstraint": TLBR_DiagonalConstraint,
+    "TRBL_DiagonalConstraint": TRBL_DiagonalConstraint, "DisjointConstraints": DisjointConstraints,
+    "WindokuConstraints": WindokuConstraints, "ArgyleConstraints": ArgyleConstraints,
+    "GirandolaConstraints": GirandolaConstraints, "CentreDotConstraints": CentreDotConstraints,
+    "AsteriskConstraints": AsteriskConstraints, "MagicSquareConstraints": MagicSquareConstraints,
+    "AntiKnightConstraints": AntiKnightConstraints, "AntiKingConstraints": AntiKingConstraints,
+    "OrthogonalNonConsecConstraints": OrthogonalNonConsecConstraints,
+    "DiagonalNonConsecConstraints": DiagonalNonConsecConstraints,
+    "OrthogonalNonConsecCells": OrthogonalNonConsecCells,
+    "DiagonalNonConsecCells": DiagonalNonConsecCells,
+    "OrthogonalMinDifferenceConstraints": OrthogonalMinDifferenceConstraints,
+    "DiagonalMinDifferenceConstraints": DiagonalMinDifferenceConstraints,
+    "KropkiRatioConstraints": KropkiRatioConstraints,
+    "KropkiOrthogonalAntiSumConstraints": KropkiOrthogonalAntiSumConstraints,
+    "OrthogonalNeighbouringSums": OrthogonalNeighbouringSums,
+    "KillerSudokuConstraints": KillerSudokuConstraints,
+    "LittleKillerSudokuConstraints": LittleKillerSudokuConstraints,
+    "KillerCageConstraintsWithUnknownSums": KillerCageConstraintsWithUnknownSums,
+    "RegionSumConstraints": RegionSumConstraints,
+    "RestrictedCellsConstraints": RestrictedCellsConstraints, "OddEvenConstraints": OddEvenConstraints,
+    "CloneRegions": CloneRegions, "SameSetRegions": SameSetRegions,
+    "QuadsConstraints": QuadsConstraints, "RenbanLinesConstraints": RenbanLinesConstraints,
+    "WarpingRenbanLinesConstraints": WarpingRenbanLinesConstraints,
+    "NabnerLinesConstraints": NabnerLinesConstraints, "LineDifferences": LineDifferences,
+    "PalindromeLineConstraints": PalindromeLineConstraints,
+    "ThermometerConstraints": ThermometerConstraints,
+    "SlowThermometerConstraints": SlowThermometerConstraints, "ArrowSum": ArrowSum,
+    "ArrowAverage": ArrowAverage, "TwoDigitArrowSum": TwoDigitArrowSum, "RatioPairs": RatioPairs,
+    "DifferencePairs": DifferencePairs, "AdditionPairs": AdditionPairs,
+    "MultiAdditionPairs": MultiAdditionPairs,
+    "RatioPairsOrDifferencePairs": RatioPairsOrDifferencePairs,
+    "SandwichConstraints": SandwichConstraints, "SkyscraperConstraints": SkyscraperConstraints,
+    "ClassicKakurasuConstraints": ClassicKakurasuConstraints,
+    "ClassicSumpleteConstraints": ClassicSumpleteConstraints,
+    "ClassicOneUpConstraints": ClassicOneUpConstraints, "RowCountConstraint": RowCountConstraint,
+    "ColCountConstraint": ColCountConstraint,
+    "StarBattleAdjacencyConstraint": StarBattleAdjacencyConstraint,
+    "NoriNoriAdjacencyConstraint": NoriNoriAdjacencyConstraint, "NQueensConstraint": NQueensConstraint,
+    "NRooksConstraint": NRooksConstraint, "NBishopsConstraint": NBishopsConstraint
+}
+
+def RuleErrors(Case, puzzle, Solutions):
+    
+    '''
+    The rules of a corpus case that its solutions break, with the solutions found more than
+    once. Returns the errors and whether every constraint of the case has a rule here.
+    '''
+    
+    Errors = []
+    Checked = all(Call["method"] in Rules for Call in Case.get("constraints", []))
+    
+    Distinct = {tuple(map(tuple, Grid)) for Grid in Solutions}
+    if len(Distinct) != len(Solutions):
+        Errors.append(f"{len(Solutions) - len(Distinct)} repeated solution(s)")
+    
+    for Grid in Solutions:
+        
+        N = len(puzzle.Matrix) if hasattr(puzzle, "Matrix") else puzzle.Order
+        Low, High = (puzzle.LowerBound, puzzle.UpperBound) if hasattr(puzzle, "LowerBound") else (0, 1)
+        if len(Grid) != N or any(len(Row) != N or min(Row) < Low or max(Row) > High for Row in Grid):
+            Errors.append(f"grid outside of the {N}x{N} grid of digits {Low} to {High}")
+            continue
+        
+        for Call in Case.get("constraints", []):
+            Rule = Rules.get(Call["method"])
+            if Rule is not None:
+                Args = [Plain(Arg) for Arg in Call.get("args", [])]
+                Kwargs = {Name: Plain(Arg) for Name, Arg in Call.get("kwargs", {}).items()}
+                Errors += [f"{Call['method']}: {Error}" for Error in Rule(Grid, puzzle, *Args, **Kwargs)]
+    
+    return Errors, Checked
@@ -0,0 +1,478 @@
+'''
+End-to-end benchmarks of the constraint modules and the NQueens solver.
+
+    python Benchmarks/RunBenchmarks.py [--repeat 5] [--filter killer] [--output results.json]
+    python Benchmarks/RunBenchmarks.py --save-baseline
+    python Benchmarks/RunBenchmarks.py --save-expected
+
+Every case of the corpus (Benchmarks/corpus.json) is built, solved and serialized the way
+the API does it, and the three phases are timed separately:
+
+    build     - creating the solver and adding the constraints of the case to the model
+    solve     - RunSolver in the mode of the payload
+    serialize - encoding the response the same way the endpoints do
+
+The run fails (exit code 1) when:
+
+    - the solve status, the number of solutions or the error of a case differs from the
+      expected results (Benchmarks/expected.json, committed with the corpus). Changed model
+      sizes are reported without failing the run. Commits that change the model of a case
+      or the corpus save the expected results again with --save-expected.
+    - a solution breaks a rule of its puzzle. Benchmarks/CheckRules.py checks the grids
+      in plain Python, without the models, so an encoding that allows wrong grids fails
+      even when the expected results were saved from it. --save-expected refuses to save
+      such results.
+    - a phase got slower than the tolerance allows against the timing baseline. The fastest
+      run of every phase is compared, and the cases that look slower are run again before
+      they are reported, as single runs are noisy. Timings depend on the machine, so the
+      baseline (Benchmarks/baseline.json) is not committed: every machine saves its own
+      with --save-baseline before comparing against it.
+
+A case of the corpus looks like:
+
+    {
+        "name": "killer-9x9-a",
+        "module": "killer_sudoku",
+        "kind": "omni",
+        "puzzle": {<Omni or Chess payload>},
+        "constraints": [
+            {"method": "ClassicSudokuConstraints"},
+            {"method": "KillerSudokuConstraints", "args": [[...], {"ndarray": [[...]]}]}
+        ]
+    }
+
+The constraints are the methods called on the solver, in order. Arguments written as
+{"ndarray": [...], "dtype": "int32"} are passed as numpy arrays (eg: cage and region maps).
+'''
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# The benchmarks import the solvers from the root of the repository
+RepositoryDirectory = Path(__file__).resolve().parent.parent
+if str(RepositoryDirectory) not in sys.path:
+    sys.path.insert(0, str(RepositoryDirectory))
+
+import numpy as np
+import ortools
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from InputJSONClass import Omni, Chess
+from OmniSolver.OmniPuzzleSolver import OmniPuzzleSolver
+from NQueens.NQueensSolver import NQueens
+from SolverManager import RunSolver
+from Benchmarks.CheckRules import RuleErrors
+import SolverLog
+
+BenchmarksDirectory = Path(__file__).resolve().parent
+DefaultCorpus = BenchmarksDirectory / "corpus.json"
+DefaultBaseline = BenchmarksDirectory / "baseline.json"
+DefaultExpected = BenchmarksDirectory / "expected.json"
+
+# Results of a case that do not depend on the machine, checked against the expected results
+ExpectedFields = ("status", "solutions", "variables", "constraints")
+
+Phases = ("build", "solve", "serialize", "total")
+
+def LoadCorpus(CorpusPath, Filter=None):
+    
+    with open(CorpusPath, "r", encoding="utf-8") as File:
+        Cases = json.load(File)["cases"]
+    
+    if Filter:
+        Cases = [Case for Case in Cases if Filter in Case["name"] or Filter == Case["module"]]
+    
+    return Cases
+
+def DecodeArgument(Value):
+    
+    # Maps and other 2D clues are indexed as Map[i, j], so they are passed as numpy arrays
+    if isinstance(Value, dict) and "ndarray" in Value:
+        return np.array(Value["ndarray"], dtype=Value.get("dtype", "int32"))
+    
+    if isinstance(Value, list):
+        return [DecodeArgument(Item) for Item in Value]
+    
+    return Value
+
+def BuildSolver(Case, SearchWorkers=1):
+    
+    '''
+    Create the solver of a case and add its constraints. Returns the solver and the payload.
+    '''
+    
+    if Case.get("kind", "omni") == "chess":
+        puzzle = Chess.model_validate(Case["puzzle"])
+        Solver = NQueens(puzzle)
+    else:
+        puzzle = Omni.model_validate(Case["puzzle"])
+        Solver = OmniPuzzleSolver(puzzle)
+    
+    for Call in Case.get("constraints", []):
+        Method = getattr(Solver, Call["method"])
+        Args = [DecodeArgument(Arg) for Arg in Call.get("args", [])]
+        Kwargs = {Name: DecodeArgument(Arg) for Name, Arg in Call.get("kwargs", {}).items()}
+        Method(*Args, **Kwargs)
+    
+    # A fixed number of search workers keeps the solve times comparable between machines
+    Solver.Solver.parameters.num_search_workers = SearchWorkers
+    
+    return Solver, puzzle
+
+def SerializeResponse(Solutions, Details):
+    
+    # Same encoding as a dict returned by the /solve and /nqueens endpoints
+    if Solutions:
+        Response = {"success": True, "solutions": Solutions, **Details}
+    else:
+        Response = {"success": False, "solutions": [], **Details}
+    
+    return JSONResponse(content=jsonable_encoder(Response)).body
+
+def Summarise(Timings):
+    
+    return {
+        "median": statistics.median(Timings),
+        "min": min(Timings),
+        "runs": Timings
+    }
+
+def RunCase(Case, Repeat, SearchWorkers=1):
+    
+    '''
+    Build, solve and serialize a case Repeat times and summarise the time of every phase.
+    '''
+    
+    Timings = {Phase: [] for Phase in Phases}
+    
+    for _ in range(Repeat):
+        
+        StartTime = time.perf_counter()
+        Solver, puzzle = BuildSolver(Case, SearchWorkers)
+        BuiltTime = time.perf_counter()
+        Solutions, Details = RunSolver(Solver, puzzle)
+        SolvedTime = time.perf_counter()
+        Body = SerializeResponse(Solutions, Details)
+        EndTime = time.perf_counter()
+        
+        Timings["build"].append(BuiltTime - StartTime)
+        Timings["solve"].append(SolvedTime - BuiltTime)
+        Timings["serialize"].append(EndTime - SolvedTime)
+        Timings["total"].append(EndTime - StartTime)
+    
+    Proto = Solver.Model.Proto()
+    RuleBreaks, Checked = RuleErrors(Case, puzzle, Solutions)
+    
+    Result = {
+        "module": Case["module"],
+        "kind": Case.get("kind", "omni"),
+        "status": Details["status"],
+        "solutions": len(Solutions),
+        "variables": len(Proto.variables),
+        "constraints": len(Proto.constraints),
+        "response_bytes": len(Body),
+        "rules_checked": Checked,
+        "rule_errors": RuleBreaks[:10],
+    }
+    Result.update({Phase: Summarise(Timings[Phase]) for Phase in Phases})
+    
+    return Result
+
+def MergeResults(Result, Rerun):
+    
+    # The runs of both attempts are summarised together
+    if "error" in Result or "error" in Rerun:
+        return Rerun
+    
+    Merged = dict(Rerun)
+    Merged.update({Phase: Summarise(Result[Phase]["runs"] + Rerun[Phase]["runs"]) for Phase in Phases})
+    
+    return Merged
+
+def GitCommit():
+    
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RepositoryDirectory,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def RunBenchmarks(Cases, Repeat, SearchWorkers=1):
+    
+    Results = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": GitCommit(),
+            "python": platform.python_version(),
+            "ortools": ortools.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": Repeat,
+            "search_workers": SearchWorkers,
+            # The constraint modules are loaded when the solver is imported, outside of the timed phases
+            "module_load_times": dict(OmniPuzzleSolver.ConstraintLoadTimes),
+        },
+        "cases": {}
+    }
+    
+    for Case in Cases:
+        Results["cases"][Case["name"]] = RunReportedCase(Case, Repeat, SearchWorkers)
+    
+    return Results
+
+def RunReportedCase(Case, Repeat, SearchWorkers=1):
+    
+    # A case that fails is recorded with its error instead of stopping the run
+    try:
+        Result = RunCase(Case, Repeat, SearchWorkers)
+    except Exception as e:
+        Result = {"module": Case["module"], "kind": Case.get("kind", "omni"), "error": f"{type(e).__name__}: {e}"}
+    
+    if "error" in Result:
+        print(f"{Case['name']:<32} ERROR {Result['error']}", file=sys.stderr)
+    else:
+        print(f"{Case['name']:<32} {Result['status']:<10} "
+              + " ".join(f"{Phase} {Result[Phase]['median']*1000:9.2f} ms" for Phase in Phases[:3]),
+              file=sys.stderr)
+    
+    return Result
+
+def ExpectedResults(Results):
+    
+    '''
+    The machine independent part of a run (statuses, solution counts and model sizes), as
+    stored in the expected results.
+    '''
+    
+    return {
+        "meta": {Name: Results["meta"][Name] for Name in ("commit", "ortools", "search_workers")},
+        "cases": {
+            Name: {"error": Result["error"]} if "error" in Result else {Field: Result[Field] for Field in ExpectedFields}
+            for Name, Result in Results["cases"].items()
+        }
+    }
+
+def CheckExpected(Results, Expected, Partial=False):
+    
+    '''
+    Compare the outcome of every case against the expected results. Returns the failures
+    (a different status, number of solutions or error) and the changes (different model
+    sizes, new cases). Partial runs (eg: --filter) do not report missing cases.
+    '''
+    
+    Failures = []
+    Changes = []
+    
+    for Name, Result in Results["cases"].items():
+        
+        Base = Expected["cases"].get(Name)
+        if Base is None:
+            Changes.append(f"{Name}: not in the expected results")
+            continue
+        
+        if "error" in Result or "error" in Base:
+            if Result.get("error") != Base.get("error"):
+                Failures.append(f"{Name}: error changed from {Base.get('error')} to {Result.get('error')}")
+            continue
+        
+        if Result["status"] != Base["status"] or Result["solutions"] != Base["solutions"]:
+            Failures.append(f"{Name}: {Base['status']} with {Base['solutions']} solution(s) became "
+                            f"{Result['status']} with {Result['solutions']} solution(s)")
+        
+        for Size in ("variables", "constraints"):
+            if Result[Size] != Base[Size]:
+                Changes.append(f"{Name}: {Base[Size]} {Size} became {Result[Size]}")
+    
+    for Name in Expected["cases"]:
+        if not Partial and Name not in Results["cases"]:
+            Failures.append(f"{Name}: missing from this run")
+    
+    return Failures, Changes
+
+def RuleFailures(Results):
+    
+    '''
+    The cases whose solutions break the rules of the puzzle (see CheckRules), whatever the
+    expected results say.
+    '''
+    
+    return [f"{Name}: {Error}" for Name, Result in Results["cases"].items() for Error in Result.get("rule_errors", [])]
+
+def CompareTimings(Results, Baseline, Tolerance, MinDelta, Statistic="min"):
+    
+    '''
+    Compare the phase times of a run against a baseline run of the same machine. A phase
+    regressed when its Statistic ("min" or "median" of the runs) is slower than the baseline
+    by more than Tolerance (relative) and MinDelta seconds. Returns the regressions.
+    '''
+    
+    Regressions = []
+    
+    for Name, Result in Results["cases"].items():
+        
+        Base = Baseline["cases"].get(Name)
+        if Base is None or "error" in Result or "error" in Base:
+            continue
+        
+        for Phase in Phases:
+            Before = Base[Phase][Statistic]
+            After = Result[Phase][Statistic]
+            if After > Before*(1 + Tolerance) and After - Before > MinDelta:
+                Regressions.append({
+                    "case": Name,
+                    "phase": Phase,
+                    "baseline": Before,
+                    "current": After,
+                    "ratio": After / Before if Before > 0 else float("inf")
+                })
+    
+    return Regressions
+
+def LoadJSON(Path):
+    
+    if not os.path.exists(Path):
+        return None
+    
+    with open(Path, "r", encoding="utf-8") as File:
+        return json.load(File)
+
+def SaveJSON(Path, Value):
+    
+    with open(Path, "w", encoding="utf-8") as File:
+        json.dump(Value, File, indent=2)
+
+def main():
+    
+    Parser = argparse.ArgumentParser(description="Benchmark the constraint modules and compare against a baseline.")
+    Parser.add_argument("--corpus", default=str(DefaultCorpus), help="Corpus of benchmark cases")
+    Parser.add_argument("--filter", help="Only run the cases whose name contains this text, or of this module")
+    Parser.add_argument("--repeat", type=int, default=5, help="Runs of every case")
+    Parser.add_argument("--search-workers", type=int, default=1, help="CP-SAT search workers of every solve")
+    Parser.add_argument("--output", help="File the results are written to (JSON)")
+    Parser.add_argument("--expected", default=str(DefaultExpected),
+                        help="Expected statuses, solution counts and model sizes of the cases (committed)")
+    Parser.add_argument("--save-expected", action="store_true",
+                        help="Store the statuses, solution counts and model sizes as the expected results")
+    Parser.add_argument("--baseline", default=str(DefaultBaseline),
+                        help="Timings of this machine to compare against (not committed)")
+    Parser.add_argument("--save-baseline", action="store_true", help="Store the timings as the new baseline of this machine")
+    Parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown of a phase before it counts as a regression")
+    Parser.add_argument("--min-delta", type=float, default=0.002,
+                        help="Slowdowns below this many seconds are never regressions")
+    Parser.add_argument("--statistic", choices=["min", "median"], default="min",
+                        help="Statistic of the runs that is compared against the baseline")
+    Parser.add_argument("--confirm", type=int, default=1,
+                        help="Times the regressed cases are run again before they are reported")
+    Parser.add_argument("--verbose", action="store_true",
+                        help="Log the progress of the solvers at SOLVER_LOG_LEVEL instead of only their warnings and errors")
+    
+    Args = Parser.parse_args()
+    
+    # The progress messages of the solvers are not part of the benchmark output
+    if not Args.verbose:
+        SolverLog.RaiseLevel("WARNING")
+    
+    Cases = LoadCorpus(Args.corpus, Args.filter)
+    Repeat = max(Args.repeat, 1)
+    Results = RunBenchmarks(Cases, Repeat, Args.search_workers)
+    
+    Baseline = None if Args.save_baseline else LoadJSON(Args.baseline)
+    Regressions = []
+    
+    if Baseline is not None:
+        Regressions = CompareTimings(Results, Baseline, Args.tolerance, Args.min_delta, Args.statistic)
+        
+        # Timings are noisy on a busy machine, so the regressed cases are run again and only
+        # the regressions that still show up over all their runs are reported
+        for _ in range(Args.confirm):
+            Suspects = {Regression["case"] for Regression in Regressions}
+            if not Suspects:
+                break
+            
+            print(f"Running {len(Suspects)} regressed case(s) again", file=sys.stderr)
+            for Case in Cases:
+                if Case["name"] in Suspects:
+                    Rerun = RunReportedCase(Case, 2*Repeat, Args.search_workers)
+                    Results["cases"][Case["name"]] = MergeResults(Results["cases"][Case["name"]], Rerun)
+            
+            Regressions = CompareTimings(Results, Baseline, Args.tolerance, Args.min_delta, Args.statistic)
+    
+    if Args.output:
+        SaveJSON(Args.output, Results)
+    
+    # Solutions that break the rules of their puzzle fail the run, and are never saved as
+    # the expected results
+    Failures = RuleFailures(Results)
+    for Failure in Failures:
+        print(f"WRONG {Failure}", file=sys.stderr)
+    
+    Unchecked = [Name for Name, Result in Results["cases"].items() if not Result.get("rules_checked", True)]
+    if Unchecked:
+        print(f"No rules to check the solutions of {', '.join(Unchecked)}", file=sys.stderr)
+    
+    if Args.save_expected and Failures:
+        print("Expected results not saved", file=sys.stderr)
+        return 1
+    
+    if Args.save_expected:
+        Expected = ExpectedResults(Results)
+        
+        # A partial run only updates its own cases
+        Previous = LoadJSON(Args.expected) if Args.filter else None
+        if Previous is not None:
+            Expected["cases"] = {**Previous["cases"], **Expected["cases"]}
+        
+        SaveJSON(Args.expected, Expected)
+        print(f"Expected results saved to {Args.expected}", file=sys.stderr)
+    
+    if Args.save_baseline:
+        SaveJSON(Args.baseline, Results)
+        print(f"Baseline saved to {Args.baseline}", file=sys.stderr)
+    
+    if Args.save_expected or Args.save_baseline:
+        return 0
+    
+    Expected = LoadJSON(Args.expected)
+    
+    if Expected is None:
+        print(f"No expected results at {Args.expected}. Run with --save-expected to create them", file=sys.stderr)
+    else:
+        ExpectedFailures, Changes = CheckExpected(Results, Expected, Partial=bool(Args.filter))
+        for Change in Changes:
+            print(f"CHANGED {Change}", file=sys.stderr)
+        for Failure in ExpectedFailures:
+            print(f"WRONG {Failure}", file=sys.stderr)
+        Failures += ExpectedFailures
+    
+    if Baseline is None:
+        print(f"No timing baseline at {Args.baseline}. Run with --save-baseline to create one", file=sys.stderr)
+    
+    for Regression in Regressions:
+        print(f"REGRESSION {Regression['case']} {Regression['phase']}: "
+              f"{Regression['baseline']*1000:.2f} ms -> {Regression['current']*1000:.2f} ms "
+              f"({Regression['ratio']:.2f}x)", file=sys.stderr)
+    
+    if Failures or Regressions:
+        return 1
+    
+    if Expected is not None:
+        print(f"Results match {Args.expected} and the solutions follow the rules of their puzzles", file=sys.stderr)
+    
+    if Baseline is not None:
+        print(f"No regressions against {Args.baseline}", file=sys.stderr)
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
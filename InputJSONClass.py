@@ -1,5 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional, Literal
+
+# Fields that only change how a puzzle is solved, not its solutions.
+# They are left out of the result cache key.
+SolveSettingFields = {"SearchWorkers", "TimeLimit"}
 
 class Omni(BaseModel):
     
@@ -12,6 +16,8 @@ class Omni(BaseModel):
     
     # Puzzle Booleans
     Sudoku: bool = True
+    # Rows and columns only, without the boxes. Ignored when Sudoku is set.
+    LatinSquare: bool = False
     
     # Chess Constraints
     AntiKnight: bool = False
@@ -20,6 +26,18 @@ class Omni(BaseModel):
     # Non-consecutive Constraints:
     OrthogonalNonConsec: bool = False
     DiagonalNonConse: bool = False
+    
+    # Solver settings
+    # Mode: "single" returns one solution, "all" enumerates the solutions (upto MaxSolutions),
+    # "unique" checks if the puzzle has exactly one solution
+    Mode: Literal["single", "all", "unique"] = "single"
+    MaxSolutions: Optional[int] = None
+    SearchWorkers: Optional[int] = None
+    # Time budget of the solve in seconds, capped by the server
+    TimeLimit: Optional[float] = None
+    # Adds the build profile of the CP-SAT model (time, variables and constraints added by
+    # each constraint function) to the response. Puzzles solved without CP-SAT have none.
+    Debug: bool = False
 
 class Chess(BaseModel):
     
@@ -28,6 +46,14 @@ class Chess(BaseModel):
     NBishops: bool = False
     NBishopsRowConstraint: bool = False
     NQueens: bool = True
+    
+    # Solver settings
+    # Mode: "single" returns one solution, "all" enumerates the solutions (upto MaxSolutions)
+    Mode: Literal["single", "all"] = "single"
+    MaxSolutions: Optional[int] = None
+    SearchWorkers: Optional[int] = None
+    # Time budget of the solve in seconds, capped by the server
+    TimeLimit: Optional[float] = None
 
 class PocketCube(BaseModel):
     
@@ -1,7 +1,11 @@
 import numpy as np
 import time
 from ortools.sat.python import cp_model
+from SolverCallbacks import EnumerateSolutions
 from InputJSONClass import Chess
+import SolverLog
+
+Log = SolverLog.GetLogger(__name__)
 
 class NQueens:
     
@@ -13,6 +17,7 @@ class NQueens:
         
         # CP Solver Model
         self.Model = cp_model.CpModel()
+        self.VariableNames = SolverLog.VariableNames
         
         # CP Solver
         self.Solver = cp_model.CpSolver()
@@ -20,15 +25,29 @@ class NQueens:
         # Create all the variables for the solver and assign possible values
         self.Cells = [
                         [
-                            self.Model.NewIntVar(0, 1, name=f"x({i}, {j})")
+                            self.Model.NewIntVar(0, 1, name=self.VarName("x({}, {})", i, j))
                             for j in range(self.Cols)
                         ]
                         for i in range(self.Rows)
                     ]
 
         self.ModelStatus = False
+        
+        # Outcome of the last solve
+        self.SolveTime = 0.0
+        self.TimedOut = False
+        
+        # Outcome of the last solution enumeration
+        self.SolutionCount = 0
+        self.Exhaustive = False
+        self.SolutionsCapped = False
 
     
+    def VarName(self, Format, *Args):
+        
+        # Names are only built when the model is inspected, see SOLVER_VARIABLE_NAMES
+        return Format.format(*Args) if self.VariableNames else ""
+    
     def RowConstraint(self):
         
         # Collect all rows and columns separately.
@@ -41,7 +60,7 @@ class NQueens:
             # Put a condition that you can have only 1 piece in every row
             self.Model.Add(sum(RowCollection) == 1)
         
-        print("Row Collections Added")
+        Log.debug("Row Collections Added")
     
     def ColConstraint(self):
         
@@ -55,7 +74,7 @@ class NQueens:
             # Put a condition that you can have only 1 piece in every column
             self.Model.Add(sum(ColCollection) == 1)
         
-        print("Col Rook Collections Added")
+        Log.debug("Col Rook Collections Added")
     
     def NQueensConstraint(self):
         
@@ -63,14 +82,14 @@ class NQueens:
         self.ColConstraint()
         self.DiagonalAntiDiagonalConstraint()
         
-        print(f"{self.Order} Queens Constraints Added.")
+        Log.debug("%s Queens Constraints Added.", self.Order)
     
     def NRooksConstraint(self):
         
         self.RowConstraint()
         self.ColConstraint()
         
-        print(f"{self.Order} Rooks Constraints Added.")
+        Log.debug("%s Rooks Constraints Added.", self.Order)
     
     def NBishopsConstraint(self, RowConstraint=False):
         
@@ -78,12 +97,12 @@ class NQueens:
             self.RowConstraint()
             self.DiagonalAntiDiagonalConstraint()
             
-            print(f"{self.Order} Bishops on {self.Order} Rows Constraints Added.")
+            Log.debug("%s Bishops on %s Rows Constraints Added.", self.Order, self.Order)
         else:
             self.ColConstraint()
             self.DiagonalAntiDiagonalConstraint()
             
-            print(f"{self.Order} Bishops on {self.Order} Cols Constraints Added.")
+            Log.debug("%s Bishops on %s Cols Constraints Added.", self.Order, self.Order)
     
     def DiagonalAntiDiagonalConstraint(self):
         
@@ -116,7 +135,7 @@ class NQueens:
             Cells = [self.Cells[r][c] for r, c in Diagonals]
             self.Model.Add(sum(Cells) <= 1)
         
-        print("Diagonal/Anti-Diagonal Bishop Collections Added")
+        Log.debug("Diagonal/Anti-Diagonal Bishop Collections Added")
     
     def DiagonalTRBL_ids(self, RowID, ColID):
         
@@ -142,21 +161,33 @@ class NQueens:
         
         return IDs
     
-    def Solve(self):
+    def Solve(self, TimeLimit=None):
+        
+        '''
+        Find one solution of the model. The search gives up after TimeLimit seconds, in
+        which case TimedOut is set and no solution is returned.
+        '''
         
         solution_count = 0
         solutions = []
         
+        if TimeLimit is not None:
+            self.Solver.parameters.max_time_in_seconds = TimeLimit
+        
         StartTime = time.time()
         self.ModelStatus = self.Solver.Solve(self.Model)
         EndTime = time.time()
         
         TimeTaken = EndTime - StartTime
+        self.SolveTime = TimeTaken
         
-        print(f"Solving done in {TimeTaken} second(s)")
+        # UNKNOWN means the time limit was reached before the search could decide
+        self.TimedOut = self.ModelStatus == cp_model.UNKNOWN
+        
+        Log.info("Solving done in %s second(s)", TimeTaken)
         
         if self.ModelStatus == cp_model.FEASIBLE or self.ModelStatus == cp_model.OPTIMAL:    
-            print("Optimal Solution Found!")
+            Log.info("Optimal Solution Found!")
             
             solution = []
             for i in range(self.Order):
@@ -167,8 +198,10 @@ class NQueens:
                 solution.append(row)
             solutions.append(solution)
             solution_count += 1
+        elif self.TimedOut:
+            Log.info("Time limit reached after %.2f second(s) without a solution", TimeTaken)
         else:
-            print("Houston, we don't have a solution")
+            Log.info("Houston, we don't have a solution")
         
         return solutions
     
@@ -179,50 +212,11 @@ class NQueens:
         for row in solution:
             print(row)
     
-    def MultiSolutionSolve(self):
+    def MultiSolutionSolve(self, MaxSolutions=None, TimeLimit=None, OnSolution=None):
         
-        StartTime = time.time()
+        '''
+        Enumerate the distinct solutions of the model in a single search using a solution
+        callback, see SolverCallbacks.EnumerateSolutions.
+        '''
         
-        solution_count = 0  # To count the number of solutions
-        solutions = []      # To store all solutions
-
-        while True:
-            self.ModelStatus = self.Solver.Solve(self.Model)
-            
-            if self.ModelStatus == cp_model.FEASIBLE or self.ModelStatus == cp_model.OPTIMAL:
-                print(f"Solution {solution_count + 1} Found!")
-                solution = []
-                for i in range(self.Rows):
-                    row = []
-                    for j in range(self.Cols):
-                        value = self.Solver.Value(self.Cells[i][j])
-                        self.OutputMatrix[i, j] = value
-                        row.append(value)
-                    solution.append(row)
-                solutions.append(solution)
-                solution_count += 1
-
-                # Create a list of Boolean variables to exclude the current solution
-                exclusion_constraints = []
-                for i in range(self.Rows):
-                    for j in range(self.Cols):
-                        # Create a unique Boolean variable for each solution using the solution count
-                        bool_var = self.Model.NewBoolVar(f"exclusion_{solution_count}_{i}_{j}")
-                        self.Model.Add(self.Cells[i][j] != solutions[-1][i][j]).OnlyEnforceIf(bool_var)
-                        exclusion_constraints.append(bool_var)
-                
-                # Add a constraint to ensure that at least one of the inequalities holds
-                self.Model.AddBoolOr(exclusion_constraints)
-                
-            else:
-                if solution_count == 0:
-                    print("Houston, we don't have a solution")
-                else:
-                    print(f"No more solutions. Total solutions found: {solution_count}")
-                break
-
-        EndTime = time.time()
-        TimeTaken = EndTime - StartTime
-        print(f"Analysis Done in {TimeTaken:.2f} second(s)")
-
-        return solutions
+        return EnumerateSolutions(self, MaxSolutions, TimeLimit, OnSolution)
\ No newline at end of file
@@ -0,0 +1,32 @@
+'''
+Unary restrictions of the variables (givens, parity, restricted values, cage digits, ...).
+
+A restriction on a single variable does not need a constraint: it is written straight into
+the domain of the variable in the model, so the model carries no unary constraints and the
+solver starts from the reduced domains.
+'''
+
+from ortools.sat.python import cp_model
+
+def RestrictDomain(Model, Variable, Domain):
+    
+    '''
+    Intersect the domain of Variable (an IntVar of Model) with Domain (a cp_model.Domain).
+    When nothing would be left, the restriction is added as a constraint instead, so that the
+    solver reports the model infeasible rather than invalid.
+    '''
+    
+    Reduced = Variable.domain.intersection_with(Domain)
+    
+    if Reduced.is_empty():
+        Model.AddLinearExpressionInDomain(Variable, Domain)
+    else:
+        Variable.with_domain(Reduced)
+
+def RestrictValues(Model, Variable, Values):
+    
+    '''
+    Limit Variable to Values.
+    '''
+    
+    RestrictDomain(Model, Variable, cp_model.Domain.FromValues(list(Values)))
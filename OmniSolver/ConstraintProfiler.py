@@ -0,0 +1,112 @@
+import time
+import functools
+from contextlib import contextmanager
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
+class ConstraintProfile:
+    
+    '''
+    Build profile of a model: the time taken by each constraint function and the number of
+    variables, constraints and boolean variables it added to the model.
+    
+    Only the outermost constraint call is measured. Constraint functions called by another
+    one (eg: SudokuRowConstraints from ClassicSudokuConstraints) are counted in the caller.
+    '''
+    
+    def __init__(self):
+        
+        self.Entries = {}
+        self.Depth = 0
+        self.BuildTime = 0.0
+    
+    @contextmanager
+    def Measure(self, Name, Model):
+        
+        Proto = Model.Proto()
+        Variables = len(Proto.variables)
+        Constraints = len(Proto.constraints)
+        
+        self.Depth += 1
+        StartTime = time.perf_counter()
+        
+        try:
+            yield
+        finally:
+            TimeTaken = time.perf_counter() - StartTime
+            self.Depth -= 1
+            
+            Proto = Model.Proto()
+            AddedVariables = len(Proto.variables) - Variables
+            Booleans = sum(
+                1 for Index in range(Variables, len(Proto.variables))
+                if list(Proto.variables[Index].domain) == [0, 1]
+            )
+            
+            Entry = self.Entries.setdefault(Name, {
+                "calls": 0,
+                "time": 0.0,
+                "variables": 0,
+                "constraints": 0,
+                "booleans": 0
+            })
+            Entry["calls"] += 1
+            Entry["time"] += TimeTaken
+            Entry["variables"] += AddedVariables
+            Entry["constraints"] += len(Proto.constraints) - Constraints
+            Entry["booleans"] += Booleans
+            
+            self.BuildTime += TimeTaken
+    
+    def Summary(self, Model):
+        
+        '''
+        The profile as a JSON friendly dict, with the constraint functions in the order they
+        were first called and the size of the whole model.
+        '''
+        
+        Proto = Model.Proto()
+        
+        return {
+            "constraints": [{"function": Name, **Entry} for Name, Entry in self.Entries.items()],
+            "build_time": self.BuildTime,
+            "model": {
+                "variables": len(Proto.variables),
+                "constraints": len(Proto.constraints)
+            }
+        }
+    
+    def Report(self, Model):
+        
+        Summary = self.Summary(Model)
+        
+        Log.info("Model built in %.2f ms with %s variable(s) and %s constraint(s)",
+                 Summary["build_time"]*1000, Summary["model"]["variables"], Summary["model"]["constraints"])
+        
+        for Entry in Summary["constraints"]:
+            Log.info("    %s: %.2f ms, %s call(s), +%s variable(s) (%s boolean), +%s constraint(s)",
+                     Entry["function"], Entry["time"]*1000, Entry["calls"], Entry["variables"],
+                     Entry["booleans"], Entry["constraints"])
+
+def ProfiledConstraint(Function):
+    
+    '''
+    Wrap a constraint function so that its calls are measured when the solver has a
+    ConstraintProfile. Without one the function is called as is.
+    '''
+    
+    Name = Function.__name__
+    
+    @functools.wraps(Function)
+    def Wrapper(self, *args, **kwargs):
+        
+        Profile = self.ConstraintProfile
+        
+        if Profile is None or Profile.Depth:
+            return Function(self, *args, **kwargs)
+        
+        with Profile.Measure(Name, self.Model):
+            return Function(self, *args, **kwargs)
+    
+    return Wrapper
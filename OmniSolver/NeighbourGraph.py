@@ -0,0 +1,66 @@
+'''
+Pairs of cells a move apart (a knight's move, a king's move, orthogonal or diagonal
+neighbours), for the constraints that hold between every such pair of cells.
+
+Every pair is listed once: a move and its opposite give the same pairs, so only one of them
+is kept. The edge lists only depend on the grid size and the moves, so they are computed
+once per process with NumPy and cached.
+'''
+
+from functools import lru_cache
+import numpy as np
+
+OrthogonalMoves = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DiagonalMoves = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+KingMoves = OrthogonalMoves + DiagonalMoves
+KnightMoves = ((-2, -1), (-2, 1), (2, -1), (2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2))
+
+@lru_cache(maxsize=256)
+def _EdgeArray(Rows, Cols, Moves):
+    
+    # A move and its opposite give the same pairs. Keep the one going forward in row major order.
+    Forward = sorted({(di, dj) if (di, dj) > (0, 0) else (-di, -dj) for di, dj in Moves} - {(0, 0)})
+    
+    I, J = np.divmod(np.arange(Rows*Cols), Cols)
+    Parts = []
+    
+    for di, dj in Forward:
+        NI, NJ = I + di, J + dj
+        Inside = (NI >= 0) & (NI < Rows) & (NJ >= 0) & (NJ < Cols)
+        Parts.append(np.stack([I[Inside], J[Inside], NI[Inside], NJ[Inside]], axis=1))
+    
+    Array = np.concatenate(Parts) if Parts else np.zeros((0, 4), dtype=int)
+    
+    # Row major order of the first cell, then of the second one
+    Array = Array[np.lexsort((Array[:, 3], Array[:, 2], Array[:, 1], Array[:, 0]))]
+    Array.flags.writeable = False
+    
+    return Array
+
+@lru_cache(maxsize=256)
+def Edges(Rows, Cols, Moves):
+    
+    '''
+    The pairs ((i, j), (ni, nj)) of cells of a Rows x Cols grid that are one of Moves apart,
+    each pair once with (i, j) first in row major order.
+    '''
+    
+    return tuple(((i, j), (ni, nj)) for i, j, ni, nj in _EdgeArray(Rows, Cols, tuple(Moves)).tolist())
+
+def EdgesOutsideGroups(Rows, Cols, Moves, GroupMaps):
+    
+    '''
+    Edges of Moves whose two cells do not share a region of any of GroupMaps (region maps
+    with 0 for cells outside every region). GroupMaps are the AllDifferent groups of the
+    model, so two cells of the same group already differ.
+    '''
+    
+    Array = _EdgeArray(Rows, Cols, tuple(Moves))
+    Keep = np.ones(len(Array), dtype=bool)
+    
+    for Map in GroupMaps:
+        First = Map[Array[:, 0], Array[:, 1]]
+        Second = Map[Array[:, 2], Array[:, 3]]
+        Keep &= (First != Second) | (First == 0)
+    
+    return [((i, j), (ni, nj)) for i, j, ni, nj in Array[Keep].tolist()]
@@ -1,16 +1,142 @@
 from ortools.sat.python import cp_model
+import copy
 import time
 import numpy as np
 import sys
+import inspect
+import threading
 from pathlib import Path
 import importlib.util
+from collections import OrderedDict
+from SolverCallbacks import EnumerateSolutions
 from InputJSONClass import Omni
+from OmniSolver.ConstraintProfiler import ConstraintProfile, ProfiledConstraint
+from OmniSolver.RegionIndex import RegionIndex
+from OmniSolver import NeighbourGraph, CellDomains
+import SolverConfig
+import SolverLog
+
+Log = SolverLog.GetLogger(__name__)
+
+# Directory holding the constraint modules that are bound onto the solver
+DefaultSolversDirectory = Path(__file__).resolve().parent / "constraints"
+
+class ModelTemplateCache:
+    
+    '''
+    LRU cache of pre-built models. Each template is a model with all the constraints of a
+    puzzle shape and constraint set except the givens, so a request only has to clone it
+    and add its own givens.
+    '''
+    
+    def __init__(self, MaxSize=64):
+        
+        self.MaxSize = MaxSize
+        self.Templates = OrderedDict()
+        self.Hits = 0
+        self.Misses = 0
+        self._Lock = threading.Lock()
+    
+    def Get(self, Key):
+        
+        with self._Lock:
+            Template = self.Templates.get(Key)
+            if Template is None:
+                self.Misses += 1
+                return None
+            
+            self.Templates.move_to_end(Key)
+            self.Hits += 1
+            return Template
+    
+    def Put(self, Key, Template):
+        
+        with self._Lock:
+            self.Templates[Key] = Template
+            self.Templates.move_to_end(Key)
+            
+            # Evict the least recently used templates
+            while len(self.Templates) > self.MaxSize:
+                self.Templates.popitem(last=False)
+    
+    def Clear(self):
+        
+        with self._Lock:
+            self.Templates.clear()
+
+# Process-wide model templates shared by all the solvers
+ModelTemplates = ModelTemplateCache()
+
+class _TemplateVariable:
+    
+    '''
+    Stands for a model variable in the attributes stored with a model template: the index
+    of the variable in the model proto, which is the same in every clone of the model.
+    '''
+    
+    __slots__ = ("Index",)
+    
+    def __init__(self, Index):
+        
+        self.Index = Index
+
+def _DetachVariables(Value):
+    
+    '''
+    Deep copy of an attribute for a model template, with its model variables replaced by
+    TemplateVariables.
+    '''
+    
+    if isinstance(Value, cp_model.IntVar):
+        return _TemplateVariable(Value.Index())
+    
+    if isinstance(Value, dict):
+        return {Key: _DetachVariables(Item) for Key, Item in Value.items()}
+    
+    if isinstance(Value, (list, tuple)):
+        return type(Value)(_DetachVariables(Item) for Item in Value)
+    
+    return copy.deepcopy(Value)
+
+def _AttachVariables(Value, Model):
+    
+    '''
+    Deep copy of an attribute of a model template for a solver, with its TemplateVariables
+    bound to the variables of Model (a clone of the template model).
+    '''
+    
+    if isinstance(Value, _TemplateVariable):
+        return Model.GetIntVarFromProtoIndex(Value.Index)
+    
+    if isinstance(Value, dict):
+        return {Key: _AttachVariables(Item, Model) for Key, Item in Value.items()}
+    
+    if isinstance(Value, (list, tuple)):
+        return type(Value)(_AttachVariables(Item, Model) for Item in Value)
+    
+    return copy.deepcopy(Value)
 
 class OmniPuzzleSolver:
     
-    def __init__(self, Data: Omni, SolversDirectory="./OmniSolver/constraints"):
+    # Process-wide constraint registry. The constraint modules are executed once per
+    # process and their functions are bound onto the class, so constructing a solver
+    # for a request does not pay for any module loading or method lookup.
+    ConstraintRegistry = {}
+    ConstraintLoadTimes = {}
+    _LoadedSolverDirectories = set()
+    _RegistryLock = threading.Lock()
+    
+    # Attributes that the constraint functions set or fill in while building a model. They
+    # are stored with a model template and restored on the solvers that clone it, see
+    # BuildModelFromTemplate.
+    TemplateAttributes = (
+        "SubgridMap", "AllDifferentMaps", "RegionIndexes", "ValueLiterals", "OneHotCells",
+        "QuadsIDs", "TopRowNums", "BottomRowNums", "LeftColumnNums", "RightColumnNums"
+    )
+    
+    def __init__(self, Data: Omni, SolversDirectory=None):
         
-        print(f"Initializing OmniPuzzleSolver with data {Data}")
+        Log.debug("Initializing OmniPuzzleSolver with data %s", Data)
         
         # Sudoku Puzzle Variables
         self.OrderRow = Data.OrderRow
@@ -37,6 +163,22 @@ class OmniPuzzleSolver:
         
         # CP Solver Model
         self.Model = cp_model.CpModel()
+        self.VariableNames = SolverLog.VariableNames
+        
+        # Per constraint function build profile, for debugging slow or oversized models
+        self.ConstraintProfile = ConstraintProfile() if Data.Debug or SolverConfig.SOLVER_PROFILE_CONSTRAINTS else None
+        
+        # RegionIndex of each region map used by the constraints, see Regions
+        self.RegionIndexes = {}
+        
+        # Region maps of the AllDifferent groups added so far (rows, columns, subgrids), see
+        # NeighbourEdges
+        self.AllDifferentMaps = []
+        
+        # (i, j, Value) -> literal of Cells[i][j] == Value, shared by the constraints. See
+        # ValueLiteral and ChannelOneHot
+        self.ValueLiterals = {}
+        self.OneHotCells = set()
         
         # CP Solver
         self.Solver = cp_model.CpSolver()
@@ -50,7 +192,7 @@ class OmniPuzzleSolver:
         # Create all the variables for the sudoku and assign possible value
         self.Cells = [ 
                         [
-                            self.Model.NewIntVar(self.LowerBound, self.UpperBound, f"x({i}, {j})")
+                            self.Model.NewIntVar(self.LowerBound, self.UpperBound, self.VarName("x({}, {})", i, j))
                             for j in range(self.Cols)
                         ]
                         for i in range(self.Rows)
@@ -60,8 +202,21 @@ class OmniPuzzleSolver:
 
         self.ModelStatus = False
         
-        self.solvers_directory = Path(SolversDirectory)
-        self._load_solver_methods()
+        # Outcome of the last solve
+        self.SolveTime = 0.0
+        self.TimedOut = False
+        
+        # Outcome of the last solution enumeration
+        self.SolutionCount = 0
+        self.Exhaustive = False
+        self.SolutionsCapped = False
+        
+        # Givens are held back while a model template is being built
+        self.DeferGivenEntries = False
+        self.GivenEntriesRequested = False
+        
+        self.solvers_directory = Path(SolversDirectory) if SolversDirectory is not None else DefaultSolversDirectory
+        self._load_solver_methods(self.solvers_directory)
         
         ## Parameters for different sudoku and puzzle solvers
         
@@ -118,29 +273,179 @@ class OmniPuzzleSolver:
         self.MultiAdditionPairsSudoku = False
         self.MultiAdditionPairsPoints = []
     
-    def _load_solver_methods(self):
-        """Dynamically load all solver methods from separate files"""
-        if not self.solvers_directory.exists():
-            return
+    @classmethod
+    def _load_solver_methods(cls, SolversDirectory=DefaultSolversDirectory):
+        """
+        Load all solver methods from separate files and bind them to the class.
+        
+        Every directory is loaded only once per process. The time taken to load each
+        module is recorded in ConstraintLoadTimes and reported when it is loaded. The
+        bound functions are wrapped so that a solver with a ConstraintProfile measures them.
+        """
+        SolversDirectory = Path(SolversDirectory).resolve()
+        
+        with cls._RegistryLock:
+            if SolversDirectory in cls._LoadedSolverDirectories:
+                return
             
-        for file_path in self.solvers_directory.glob("*.py"):
-            if file_path.name.startswith("_"):
-                continue  # Skip private files
-                
-            # Load the module
-            spec = importlib.util.spec_from_file_location(file_path.stem, file_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            if not SolversDirectory.exists():
+                cls._LoadedSolverDirectories.add(SolversDirectory)
+                return
             
-            # Add all public functions to this instance
-            for attr_name in dir(module):
-                if not attr_name.startswith("_"):
-                    attr = getattr(module, attr_name)
+            for file_path in sorted(SolversDirectory.glob("*.py")):
+                if file_path.name.startswith("_"):
+                    continue  # Skip private files
+                
+                StartTime = time.perf_counter()
+                
+                # Load the module
+                spec = importlib.util.spec_from_file_location(file_path.stem, file_path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                
+                # Bind all public functions of the module to the class
+                for attr_name, attr in vars(module).items():
+                    if attr_name.startswith("_"):
+                        continue
                     
-                    if hasattr(attr, '__get__') and callable(attr):
-                        setattr(self, attr_name, attr.__get__(self, type(self)))
-                    else:
-                        setattr(self, attr_name, attr)  # Just set it directly
+                    if inspect.isfunction(attr) and attr.__module__ == module.__name__:
+                        setattr(cls, attr_name, ProfiledConstraint(attr))
+                        cls.ConstraintRegistry[attr_name] = attr
+                
+                LoadTime = time.perf_counter() - StartTime
+                cls.ConstraintLoadTimes[file_path.stem] = LoadTime
+                Log.info("Loaded constraint module %s in %.2f ms", file_path.stem, LoadTime*1000)
+            
+            cls._LoadedSolverDirectories.add(SolversDirectory)
+    
+    def BuildModelFromTemplate(self, TemplateKey, Builder):
+        
+        '''
+        Add the constraints of Builder(self) to the model, reusing a cached template when a
+        model with the same TemplateKey was built before. TemplateKey must identify the puzzle
+        shape, bounds and every constraint flag/parameter used by Builder. The givens are not
+        part of the template and are added to the cloned model instead.
+        
+        The TemplateAttributes set by the builder are stored with the template as deep
+        copies, with their model variables (eg: the ValueLiterals) rebound to the variables
+        of the cloned model when they are restored, so that no state is shared between
+        the solvers.
+        '''
+        
+        Template = ModelTemplates.Get(TemplateKey)
+        
+        if Template is None:
+            
+            self.DeferGivenEntries = True
+            try:
+                Builder(self)
+            finally:
+                self.DeferGivenEntries = False
+            
+            Attributes = {
+                Name: _DetachVariables(getattr(self, Name)) for Name in self.TemplateAttributes
+                if hasattr(self, Name)
+            }
+            
+            Template = {
+                "Model": self.Model.Clone(),
+                "CellIndices": [[Cell.Index() for Cell in Row] for Row in self.Cells],
+                "GivenEntriesRequested": self.GivenEntriesRequested,
+                "Attributes": Attributes,
+            }
+            ModelTemplates.Put(TemplateKey, Template)
+        else:
+            self.Model = Template["Model"].Clone()
+            self.Cells = [
+                            [self.Model.GetIntVarFromProtoIndex(Index) for Index in Row]
+                            for Row in Template["CellIndices"]
+                        ]
+            for Name, Value in Template["Attributes"].items():
+                setattr(self, Name, _AttachVariables(Value, self.Model))
+        
+        # Only the givens differ between requests sharing a template
+        if Template["GivenEntriesRequested"]:
+            self.InitializeGivenEntries()
+    
+    def VarName(self, Format, *Args):
+        
+        # Names are only built when the model is inspected, see SOLVER_VARIABLE_NAMES
+        return Format.format(*Args) if self.VariableNames else ""
+    
+    def Regions(self, Map):
+        
+        '''
+        RegionIndex of a region map (eg: KillerCageMap). It is built once per map and reused
+        by every constraint given the same map.
+        '''
+        
+        Map = np.asarray(Map)
+        Key = (Map.shape, Map.dtype.str, Map.tobytes())
+        
+        Index = self.RegionIndexes.get(Key)
+        if Index is None:
+            Index = self.RegionIndexes[Key] = RegionIndex(Map)
+        
+        return Index
+    
+    def NeighbourEdges(self, Moves, SkipAllDifferent=False):
+        
+        '''
+        The pairs of cells one of Moves apart (eg: NeighbourGraph.KnightMoves), each pair once.
+        With SkipAllDifferent, the pairs of cells already in the same AllDifferent group
+        (a row, column or subgrid) are left out.
+        '''
+        
+        if SkipAllDifferent and self.AllDifferentMaps:
+            return NeighbourGraph.EdgesOutsideGroups(self.Rows, self.Cols, Moves, self.AllDifferentMaps)
+        
+        return NeighbourGraph.Edges(self.Rows, self.Cols, Moves)
+    
+    def ValueLiteral(self, i, j, Value):
+        
+        '''
+        Boolean literal that is true exactly when Cells[i][j] == Value. It is created on the
+        first request and shared by every constraint that asks for the same cell and value.
+        '''
+        
+        Key = (i, j, Value)
+        
+        Literal = self.ValueLiterals.get(Key)
+        if Literal is None:
+            Literal = self.Model.NewBoolVar(self.VarName("x({}, {})=={}", i, j, Value))
+            self.Model.Add(self.Cells[i][j] == Value).OnlyEnforceIf(Literal)
+            self.Model.Add(self.Cells[i][j] != Value).OnlyEnforceIf(Literal.Not())
+            self.ValueLiterals[Key] = Literal
+        
+        return Literal
+    
+    def ChannelOneHot(self, i, j):
+        
+        '''
+        One-hot encoding of Cells[i][j]: a ValueLiteral for every value of its domain, exactly
+        one of them true and the cell equal to the value of the true one. Returns the literals
+        in the order of the values.
+        '''
+        
+        Values = range(self.LowerBound, self.UpperBound + 1)
+        Literals = [self.ValueLiteral(i, j, Value) for Value in Values]
+        
+        if (i, j) not in self.OneHotCells:
+            self.Model.AddExactlyOne(Literals)
+            self.Model.Add(self.Cells[i][j] == sum(Value*Literal for Value, Literal in zip(Values, Literals)))
+            self.OneHotCells.add((i, j))
+        
+        return Literals
+    
+    def RestrictCellValues(self, Cell, Values):
+        
+        '''
+        Limit the cell variable Cell (eg: self.Cells[i][j]) to Values. Unary restrictions
+        (givens, parity, restricted values, ...) shrink the domain of the cell in the model
+        instead of adding a constraint, see CellDomains.
+        '''
+        
+        CellDomains.RestrictValues(self.Model, Cell, Values)
     
     def PrintConstraints(self):
         print(self.Model)
@@ -188,7 +493,7 @@ class OmniPuzzleSolver:
             self.ModelStatus = self.Solver.Solve(self.Model)
             
             if self.ModelStatus == cp_model.FEASIBLE or self.ModelStatus == cp_model.OPTIMAL:
-                print(f"Solution {solution_count + 1} Found! Iteration {iteration_count + 1}")
+                Log.debug("Solution %s Found! Iteration %s", solution_count + 1, iteration_count + 1)
                 solution = []
                 for i in range(self.Rows):
                     row = []
@@ -207,7 +512,9 @@ class OmniPuzzleSolver:
                     for i in range(self.Rows):
                         for j in range(self.Cols):
                             # Create a unique Boolean variable for each symmetry
-                            bool_var = self.Model.NewBoolVar(f"exclusion_{solution_count}_{symmetry_index}_{i}_{j}")
+                            bool_var = self.Model.NewBoolVar(
+                                self.VarName("exclusion_{}_{}_{}_{}", solution_count, symmetry_index, i, j)
+                            )
                             self.Model.Add(self.Cells[i][j] != symmetry[i][j]).OnlyEnforceIf(bool_var)
                             exclusion_constraints.append(bool_var)
                 
@@ -222,80 +529,53 @@ class OmniPuzzleSolver:
             
             else:
                 if solution_count == 0:
-                    print("Houston, we don't have a solution")
+                    Log.info("Houston, we don't have a solution")
                 else:
-                    print(f"No more solutions. Total solutions found: {solution_count}")
+                    Log.info("No more solutions. Total solutions found: %s", solution_count)
                 break
 
         EndTime = time.time()
         TimeTaken = EndTime - StartTime
-        print(f"Analysis Done in {TimeTaken:.2f} second(s)")
+        Log.info("Analysis Done in %.2f second(s)", TimeTaken)
         
         return solutions
     
-    def MultiSolutionSolve(self):
+    def MultiSolutionSolve(self, MaxSolutions=None, TimeLimit=None, OnSolution=None):
         
-        StartTime = time.time()
+        '''
+        Enumerate the distinct solutions of the model in a single search using a solution
+        callback, see SolverCallbacks.EnumerateSolutions.
+        '''
         
-        solution_count = 0  # To count the number of solutions
-        solutions = []      # To store all solutions
-
-        while True:
-            self.ModelStatus = self.Solver.Solve(self.Model)
-            
-            if self.ModelStatus == cp_model.FEASIBLE or self.ModelStatus == cp_model.OPTIMAL:
-                print(f"Solution {solution_count + 1} Found!")
-                solution = []
-                for i in range(self.Rows):
-                    row = []
-                    for j in range(self.Cols):
-                        value = self.Solver.Value(self.Cells[i][j])
-                        self.OutputMatrix[i, j] = value
-                        row.append(value)
-                    solution.append(row)
-                solutions.append(solution)
-                solution_count += 1
-
-                # Create a list of Boolean variables to exclude the current solution
-                exclusion_constraints = []
-                for i in range(self.Rows):
-                    for j in range(self.Cols):
-                        # Create a unique Boolean variable for each solution using the solution count
-                        bool_var = self.Model.NewBoolVar(f"exclusion_{solution_count}_{i}_{j}")
-                        self.Model.Add(self.Cells[i][j] != solutions[-1][i][j]).OnlyEnforceIf(bool_var)
-                        exclusion_constraints.append(bool_var)
-                
-                # Add a constraint to ensure that at least one of the inequalities holds
-                self.Model.AddBoolOr(exclusion_constraints)
-                
-            else:
-                if solution_count == 0:
-                    print("Houston, we don't have a solution")
-                else:
-                    print(f"No more solutions. Total solutions found: {solution_count}")
-                break
-
-        EndTime = time.time()
-        TimeTaken = EndTime - StartTime
-        print(f"Analysis Done in {TimeTaken:.2f} second(s)")
-
-        return solutions
+        return EnumerateSolutions(self, MaxSolutions, TimeLimit, OnSolution)
     
-    def Solve(self):
+    def Solve(self, TimeLimit=None):
+        
+        '''
+        Find one solution of the model. The search gives up after TimeLimit seconds, in
+        which case TimedOut is set and no solution is returned.
+        '''
         
         solution_count = 0  # To count the number of solutions
         solutions = []      # To store all solutions
         
+        if TimeLimit is not None:
+            self.Solver.parameters.max_time_in_seconds = TimeLimit
+        
         StartTime = time.time()
         self.ModelStatus = self.Solver.Solve(self.Model)
         EndTime = time.time()
         
         TimeTaken = EndTime - StartTime
+        self.SolveTime = TimeTaken
         
-        print(f"Solving done in {TimeTaken} second(s)")
+        # UNKNOWN means the time limit was reached before the search could decide
+        self.TimedOut = self.ModelStatus == cp_model.UNKNOWN
+        
+        Log.info("Solving done in %s second(s)", TimeTaken)
         
         if self.ModelStatus == cp_model.FEASIBLE or self.ModelStatus == cp_model.OPTIMAL:    
-            print("Optimal Solution Found!")
+            Log.info("Optimal Solution Found!")
             
             solution = []
             for i in range(self.Rows):
@@ -306,8 +586,10 @@ class OmniPuzzleSolver:
                 solution.append(row)
             solutions.append(solution)
             solution_count += 1
+        elif self.TimedOut:
+            Log.info("Time limit reached after %.2f second(s) without a solution", TimeTaken)
         else:
-            print("Houston, we don't have a solution")
+            Log.info("Houston, we don't have a solution")
         
         return solutions
         
@@ -353,4 +635,7 @@ class OmniPuzzleSolver:
                     line += " |"
             print(line, file=file)
             
-        print(self.border, file=file)
\ No newline at end of file
+        print(self.border, file=file)
+
+# Build the constraint registry once, when the solver module is first imported
+OmniPuzzleSolver._load_solver_methods()
@@ -0,0 +1,305 @@
+from itertools import groupby, permutations, product
+from math import factorial, prod
+from InputJSONClass import Omni
+
+# Upper limit on the number of tied transforms that are compared while canonicalising a
+# puzzle. Near-empty or highly symmetric grids exceed it and are not canonicalised.
+MaxCanonicalCandidates = 512
+
+class PuzzleTransform:
+    
+    '''
+    A symmetry of a sudoku/latin square grid. Apply maps a grid into the canonical frame:
+        
+        Canonical[i][j] = DigitMap[Grid'[RowOrder[i]][ColOrder[j]]]
+    
+    where Grid' is the grid, transposed if Transpose is set. Invert maps a grid in the
+    canonical frame (eg: a cached solution) back to the frame of the original puzzle.
+    0 marks an empty cell and is never relabelled.
+    '''
+    
+    def __init__(self, Transpose, RowOrder, ColOrder, DigitMap):
+        
+        self.Transpose = Transpose
+        self.RowOrder = tuple(RowOrder)
+        self.ColOrder = tuple(ColOrder)
+        self.DigitMap = dict(DigitMap)
+        self.InverseDigitMap = {Mapped: Digit for Digit, Mapped in self.DigitMap.items()}
+    
+    def Apply(self, Grid):
+        
+        if self.Transpose:
+            Grid = [list(Row) for Row in zip(*Grid)]
+        
+        return [
+                    [self.DigitMap.get(Grid[r][c], Grid[r][c]) for c in self.ColOrder]
+                    for r in self.RowOrder
+                ]
+    
+    def Invert(self, Grid):
+        
+        Rows, Cols = len(self.RowOrder), len(self.ColOrder)
+        Original = [[0]*Cols for _ in range(Rows)]
+        
+        for i, r in enumerate(self.RowOrder):
+            for j, c in enumerate(self.ColOrder):
+                Original[r][c] = self.InverseDigitMap.get(Grid[i][j], Grid[i][j])
+        
+        if self.Transpose:
+            Original = [list(Row) for Row in zip(*Original)]
+        
+        return Original
+
+class SymmetryGroup:
+    
+    '''
+    Symmetries that map a puzzle onto an equivalent puzzle.
+    
+    Geometric:
+        "full"     - band/stack permutations, row/column permutations within bands/stacks and
+                     transposition (when the boxes are square). For latin squares (Boxes=False)
+                     every row and column permutation is allowed.
+        "dihedral" - only the 8 rotations/reflections of the grid.
+    Relabel:
+        "any"      - any permutation of the digits.
+        "reverse"  - only the digit reversal v -> LowerBound + UpperBound - v.
+        "none"     - digits are fixed.
+    '''
+    
+    def __init__(self, Rows, Cols, OrderRow, OrderCol, LowerBound, UpperBound,
+                 Boxes=True, Geometric="full", Relabel="any"):
+        
+        if Geometric == "full" and Relabel != "any":
+            raise ValueError("Full geometric symmetry is only supported with full digit relabelling.")
+        
+        self.Rows = Rows
+        self.Cols = Cols
+        self.OrderRow = OrderRow if Boxes else Rows
+        self.OrderCol = OrderCol if Boxes else Cols
+        self.LowerBound = LowerBound
+        self.UpperBound = UpperBound
+        self.Geometric = Geometric
+        self.Relabel = Relabel
+        
+        # Transposing a grid with rectangular boxes does not give a valid grid
+        self.AllowTranspose = Rows == Cols and self.OrderRow == self.OrderCol
+
+def SymmetryGroupForOmni(puzzle: Omni, Rows, Cols, LowerBound, UpperBound):
+    
+    '''
+    Symmetry group of an Omni puzzle, shrunk by the variant flags that break symmetries.
+    Returns None when the puzzle is not a classic sudoku based puzzle.
+    '''
+    
+    if not puzzle.Sudoku:
+        return None
+    
+    if Rows % puzzle.OrderRow != 0 or Cols % puzzle.OrderCol != 0:
+        return None
+    
+    Geometric = "full"
+    Relabel = "any"
+    
+    # Chess and adjacency constraints are only preserved by rotations/reflections
+    if puzzle.AntiKing or puzzle.AntiKnight or puzzle.OrthogonalNonConsec or puzzle.DiagonalNonConse:
+        Geometric = "dihedral"
+    
+    # Non-consecutive constraints are only preserved by reversing the digits
+    if puzzle.OrthogonalNonConsec or puzzle.DiagonalNonConse:
+        Relabel = "reverse"
+    
+    return SymmetryGroup(Rows, Cols, puzzle.OrderRow, puzzle.OrderCol, LowerBound, UpperBound,
+                         Boxes=True, Geometric=Geometric, Relabel=Relabel)
+
+def CanonicalOmniPuzzle(puzzle: Omni):
+    
+    '''
+    Canonical representative of an Omni puzzle and the transform that maps the puzzle onto
+    it. Returns (puzzle, None) when the puzzle cannot be canonicalised.
+    '''
+    
+    Grid = puzzle.Matrix
+    Rows = len(Grid)
+    Cols = len(Grid[0]) if Rows else 0
+    
+    if Rows == 0 or any(len(Row) != Cols for Row in Grid):
+        return puzzle, None
+    
+    # Same defaults as OmniPuzzleSolver
+    LowerBound = puzzle.LowerBound if puzzle.LowerBound is not None else 1
+    UpperBound = puzzle.UpperBound if puzzle.UpperBound is not None else max(Rows, Cols)
+    
+    Group = SymmetryGroupForOmni(puzzle, Rows, Cols, LowerBound, UpperBound)
+    if Group is None:
+        return puzzle, None
+    
+    CanonicalGrid, Transform = CanonicalizeGrid(Grid, Group)
+    if Transform is None:
+        return puzzle, None
+    
+    return puzzle.model_copy(update={"Matrix": CanonicalGrid}), Transform
+
+def CanonicalizeGrid(Grid, Group: SymmetryGroup):
+    
+    '''
+    Map a grid to its minimal representative under the symmetry group and return it with the
+    transform used. Returns (Grid, None) if the grid cannot be canonicalised.
+    '''
+    
+    Digits = range(Group.LowerBound, Group.UpperBound + 1)
+    if any(Value != 0 and Value not in Digits for Row in Grid for Value in Row):
+        return Grid, None
+    
+    if Group.Geometric == "dihedral":
+        Candidates = _DihedralCandidates(Group)
+    else:
+        Candidates = _RefinedCandidates(Grid, Group)
+        if Candidates is None:
+            return Grid, None
+    
+    Best = None
+    for Transpose, RowOrder, ColOrder in Candidates:
+        for DigitMap in _DigitMaps(Grid, Group, Transpose, RowOrder, ColOrder):
+            Transform = PuzzleTransform(Transpose, RowOrder, ColOrder, DigitMap)
+            Key = tuple(Value for Row in Transform.Apply(Grid) for Value in Row)
+            if Best is None or Key < Best[0]:
+                Best = (Key, Transform)
+    
+    Key, Transform = Best
+    Canonical = [list(Key[i*Group.Cols:(i + 1)*Group.Cols]) for i in range(Group.Rows)]
+    
+    return Canonical, Transform
+
+def _DihedralCandidates(Group: SymmetryGroup):
+    
+    # Rotations and reflections are combinations of a transpose and reversing rows/columns
+    Rows, Cols = list(range(Group.Rows)), list(range(Group.Cols))
+    Orientations = [False, True] if Group.AllowTranspose else [False]
+    
+    return [
+        (Transpose, RowOrder, ColOrder)
+        for Transpose in Orientations
+        for RowOrder in (Rows, Rows[::-1])
+        for ColOrder in (Cols, Cols[::-1])
+    ]
+
+def _DigitMaps(Grid, Group: SymmetryGroup, Transpose, RowOrder, ColOrder):
+    
+    Digits = list(range(Group.LowerBound, Group.UpperBound + 1))
+    
+    if Group.Relabel == "none":
+        return [{Digit: Digit for Digit in Digits}]
+    
+    if Group.Relabel == "reverse":
+        return [
+            {Digit: Digit for Digit in Digits},
+            {Digit: Group.LowerBound + Group.UpperBound - Digit for Digit in Digits},
+        ]
+    
+    # The smallest relabelling numbers the digits in their order of first appearance
+    if Transpose:
+        Grid = [list(Row) for Row in zip(*Grid)]
+    
+    DigitMap = {}
+    for r in RowOrder:
+        for c in ColOrder:
+            Value = Grid[r][c]
+            if Value != 0 and Value not in DigitMap:
+                DigitMap[Value] = Digits[len(DigitMap)]
+    
+    # Digits missing from the grid take the remaining labels so the map is a bijection
+    for Digit in Digits:
+        if Digit not in DigitMap:
+            DigitMap[Digit] = Digits[len(DigitMap)]
+    
+    return [DigitMap]
+
+def _LineSignatures(Grid, Transpose):
+    
+    '''
+    Signatures of the rows and columns that do not change under row/column permutations and
+    digit relabelling. They are refined once with the signatures of the crossing lines.
+    '''
+    
+    if Transpose:
+        Grid = [list(Row) for Row in zip(*Grid)]
+    
+    Rows, Cols = len(Grid), len(Grid[0])
+    Givens = [(r, c, Grid[r][c]) for r in range(Rows) for c in range(Cols) if Grid[r][c] != 0]
+    
+    RowCount = [0]*Rows
+    ColCount = [0]*Cols
+    DigitFrequency = {}
+    for r, c, Value in Givens:
+        RowCount[r] += 1
+        ColCount[c] += 1
+        DigitFrequency[Value] = DigitFrequency.get(Value, 0) + 1
+    
+    def Signatures(Size, Count, Crossing, Index):
+        Pairs = [[] for _ in range(Size)]
+        for Given in Givens:
+            Pairs[Given[Index]].append((Crossing[Given[1 - Index]], DigitFrequency[Given[2]]))
+        return [(Count[Line], tuple(sorted(Pairs[Line]))) for Line in range(Size)]
+    
+    RowSigs = Signatures(Rows, RowCount, ColCount, 0)
+    ColSigs = Signatures(Cols, ColCount, RowCount, 1)
+    
+    return Signatures(Rows, RowCount, ColSigs, 0), Signatures(Cols, ColCount, RowSigs, 1)
+
+def _LineOrders(Signatures, Order):
+    
+    '''
+    All the orderings of the lines that give the smallest sequence of signatures, keeping
+    lines within their bands (or stacks) of Order lines each.
+    '''
+    
+    Bands = []
+    for Start in range(0, len(Signatures), Order):
+        Lines = sorted(range(Start, Start + Order), key=lambda Line: Signatures[Line])
+        TieGroups = [list(Group) for _, Group in groupby(Lines, key=lambda Line: Signatures[Line])]
+        Bands.append((tuple(Signatures[Line] for Line in Lines), TieGroups))
+    
+    Bands.sort(key=lambda Band: Band[0])
+    BandTieGroups = [list(Group) for _, Group in groupby(Bands, key=lambda Band: Band[0])]
+    
+    Count = prod(factorial(len(Group)) for Group in BandTieGroups)
+    Count *= prod(factorial(len(Ties)) for _, TieGroups in Bands for Ties in TieGroups)
+    
+    def Orders():
+        for BandOrder in product(*[permutations(Group) for Group in BandTieGroups]):
+            OrderedBands = [Band for Group in BandOrder for Band in Group]
+            LineChoices = [permutations(Ties) for _, TieGroups in OrderedBands for Ties in TieGroups]
+            for Choice in product(*LineChoices):
+                yield [Line for Ties in Choice for Line in Ties]
+    
+    SignatureSequence = tuple(Signature for Band in Bands for Signature in Band[0])
+    
+    return SignatureSequence, Count, Orders
+
+def _RefinedCandidates(Grid, Group: SymmetryGroup):
+    
+    '''
+    Candidate transforms for the full group. Only the transforms that put the line signatures
+    in their smallest order can give the minimal grid, which usually leaves very few of the
+    millions of transforms in the group.
+    '''
+    
+    Orientations = []
+    for Transpose in ([False, True] if Group.AllowTranspose else [False]):
+        RowSigs, ColSigs = _LineSignatures(Grid, Transpose)
+        RowSequence, RowCount, RowOrders = _LineOrders(RowSigs, Group.OrderRow)
+        ColSequence, ColCount, ColOrders = _LineOrders(ColSigs, Group.OrderCol)
+        Orientations.append(((RowSequence, ColSequence), Transpose, RowCount*ColCount, RowOrders, ColOrders))
+    
+    BestKey = min(Orientation[0] for Orientation in Orientations)
+    Orientations = [Orientation for Orientation in Orientations if Orientation[0] == BestKey]
+    
+    if sum(Orientation[2] for Orientation in Orientations) > MaxCanonicalCandidates:
+        return None
+    
+    return [
+        (Transpose, RowOrder, ColOrder)
+        for _, Transpose, _, RowOrders, ColOrders in Orientations
+        for RowOrder in RowOrders()
+        for ColOrder in ColOrders()
+    ]
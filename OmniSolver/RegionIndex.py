@@ -0,0 +1,50 @@
+'''
+Cells of the regions of a region map (killer cages, custom subgrids, region sums, ...).
+
+A region map is a 2D array holding the ID of the region of every cell, 0 for cells outside
+every region. The cells are grouped in one pass with NumPy, instead of scanning the whole
+grid once per region, and the regions are listed in the order of their IDs so that the
+clues given per region (eg: KillerCageSums) line up with them.
+'''
+
+import numpy as np
+
+class RegionIndex:
+    
+    def __init__(self, Map):
+        
+        Map = np.asarray(Map)
+        Flat = Map.ravel()
+        
+        # A stable sort keeps the cells of a region in row major order
+        Order = np.argsort(Flat, kind="stable")
+        UIDs, Starts = np.unique(Flat[Order], return_index=True)
+        Rows, Cols = np.unravel_index(Order, Map.shape)
+        
+        self.Regions = {}
+        for UID, Start, End in zip(UIDs.tolist(), Starts.tolist(), Starts[1:].tolist() + [len(Flat)]):
+            if UID != 0:
+                self.Regions[UID] = list(zip(Rows[Start:End].tolist(), Cols[Start:End].tolist()))
+        
+        # Region IDs in increasing order, without 0
+        self.UIDs = list(self.Regions)
+    
+    def __iter__(self):
+        
+        return iter(self.UIDs)
+    
+    def __len__(self):
+        
+        return len(self.UIDs)
+    
+    def Positions(self, UID):
+        
+        return self.Regions.get(UID, [])
+    
+    def Cells(self, Cells, UID):
+        
+        '''
+        The variables of the region, from the Cells matrix of the solver.
+        '''
+        
+        return [Cells[i][j] for i, j in self.Regions.get(UID, [])]
@@ -0,0 +1,122 @@
+'''
+Digit combinations of sum constraints (killer cages, little killers, region sums and arrows).
+
+Which digits can make up a cage only depends on the digit range, the number of cells, the
+total and whether the digits must be distinct, so the answers are computed once per process
+and cached. The constraint functions use them to cut the cell domains before the search
+starts (eg: a 2 cell cage of 3 can only hold 1 and 2), to give sum variables their exact
+domain, and for small cages to add the allowed permutations as a table.
+'''
+
+import itertools
+from functools import lru_cache
+from ortools.sat.python import cp_model
+from OmniSolver import CellDomains
+import SolverConfig
+
+@lru_cache(maxsize=None)
+def Combinations(Low, High, Count, Total):
+    
+    '''
+    The sets of Count distinct digits in [Low, High] adding up to Total, as sorted tuples.
+    '''
+    
+    Found = []
+    
+    def Extend(Start, Chosen, Remaining):
+        
+        Left = Count - len(Chosen)
+        if Left == 0:
+            if Remaining == 0:
+                Found.append(tuple(Chosen))
+            return
+        
+        for Digit in range(Start, High - Left + 2):
+            # The smallest and the largest sums of the cells still to fill
+            Smallest = Digit*Left + Left*(Left - 1)//2
+            Largest = Digit + (Left - 1)*High - (Left - 1)*(Left - 2)//2
+            if Smallest > Remaining:
+                break
+            if Largest < Remaining:
+                continue
+            Extend(Digit + 1, Chosen + [Digit], Remaining - Digit)
+    
+    Extend(Low, [], Total)
+    
+    return tuple(Found)
+
+@lru_cache(maxsize=None)
+def CellDigits(Low, High, Count, Total, Unique=True):
+    
+    '''
+    The digits a cell of a Count cell cage adding up to Total can hold. Without Unique, the
+    digits may repeat and only the sum bounds the other cells.
+    '''
+    
+    if Unique:
+        return tuple(sorted({Digit for Combination in Combinations(Low, High, Count, Total) for Digit in Combination}))
+    
+    return tuple(
+        Digit for Digit in range(Low, High + 1)
+        if (Count - 1)*Low <= Total - Digit <= (Count - 1)*High
+    )
+
+@lru_cache(maxsize=None)
+def PossibleTotals(Low, High, Count, Unique=True):
+    
+    '''
+    The totals a cage of Count cells can add up to.
+    '''
+    
+    if Count == 0:
+        return (0,)
+    
+    if Unique:
+        if Count > High - Low + 1:
+            return ()
+        return tuple(range(sum(range(Low, Low + Count)), sum(range(High - Count + 1, High + 1)) + 1))
+    
+    return tuple(range(Count*Low, Count*High + 1))
+
+@lru_cache(maxsize=1024)
+def CageTable(Low, High, Count, Total):
+    
+    '''
+    Every ordering of every combination of Count distinct digits adding up to Total, for
+    AddAllowedAssignments.
+    '''
+    
+    return [list(Permutation) for Combination in Combinations(Low, High, Count, Total)
+            for Permutation in itertools.permutations(Combination)]
+
+def RestrictDomain(Model, Expression, Values, Low, High):
+    
+    '''
+    Limit Expression to Values, unless they still cover all of [Low, High]. A single variable
+    gets its domain cut instead of a constraint.
+    '''
+    
+    if Values and len(Values) < High - Low + 1:
+        if isinstance(Expression, cp_model.IntVar):
+            CellDomains.RestrictValues(Model, Expression, Values)
+        else:
+            Model.AddLinearExpressionInDomain(Expression, cp_model.Domain.FromValues(list(Values)))
+
+def AddCageSum(Model, Cells, Total, Low, High, Unique=True):
+    
+    '''
+    sum(Cells) == Total, with the cell domains cut to the digits that can take part in the
+    sum. Cages of distinct digits with at most SOLVER_CAGE_TABLE_MAX_CELLS cells also get
+    the table of their allowed permutations.
+    '''
+    
+    Count = len(Cells)
+    Digits = CellDigits(Low, High, Count, Total, Unique)
+    
+    for Cell in Cells:
+        RestrictDomain(Model, Cell, Digits, Low, High)
+    
+    if Unique and 1 < Count <= SolverConfig.SOLVER_CAGE_TABLE_MAX_CELLS and Digits:
+        Model.AddAllowedAssignments(Cells, CageTable(Low, High, Count, Total))
+    
+    Model.Add(sum(Cells) == Total)
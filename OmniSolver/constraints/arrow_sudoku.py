@@ -1,3 +1,8 @@
+from OmniSolver.SumCombinations import PossibleTotals, RestrictDomain
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def ArrowAverage(self, arrow_circles, arrow_bodies):
         
     """
@@ -25,16 +30,16 @@ def ArrowAverage(self, arrow_circles, arrow_bodies):
         Cell_of_Arrow_Circle = self.Cells[r][c]
         
         # Debug information
-        print(f"Processing Arrow {arrow_id + 1}: Circle at {arrow_circle}, Body length = {len(Cells_of_Arrow)}")
+        Log.debug("Processing Arrow %s: Circle at %s, Body length = %s", arrow_id + 1, arrow_circle, len(Cells_of_Arrow))
 
         # Place the average condition
         # average of all the cells of the arrow = cell value of the arrow circle
         # This can be written as sum = n*average
         if len(Cells_of_Arrow) > 0:
             self.Model.Add(sum(Cells_of_Arrow) == len(Cells_of_Arrow) * Cell_of_Arrow_Circle)
-            print(f"Arrow Average Condition {arrow_id + 1} added for circle {arrow_circle}")
+            Log.debug("Arrow Average Condition %s added for circle %s", arrow_id + 1, arrow_circle)
         else:
-            print(f"Warning: Arrow {arrow_id + 1} has no body cells. Skipping.")
+            Log.warning("Arrow %s has no body cells. Skipping.", arrow_id + 1)
 
 def ArrowSum(self, arrow_circles, arrow_bodies):
     
@@ -62,16 +67,20 @@ def ArrowSum(self, arrow_circles, arrow_bodies):
         Cell_of_Arrow_Circle = self.Cells[r][c]
         
         # Debug information
-        print(f"Processing Arrow {arrow_id + 1}: Circle at {arrow_circle}, Body length = {len(Cells_of_Arrow)}")
-        print(f"Arrow Body: {arrow_body}")
+        Log.debug("Processing Arrow %s: Circle at %s, Body length = %s", arrow_id + 1, arrow_circle, len(Cells_of_Arrow))
+        Log.debug("Arrow Body: %s", arrow_body)
 
         # Place the average condition
         # Sum of cells in arrow = value in arrow circle
         if len(Cells_of_Arrow) > 0:
+            # Digits may repeat along the body, so the circle is at least len(body)*LowerBound
+            Totals = PossibleTotals(self.LowerBound, self.UpperBound, len(Cells_of_Arrow), Unique=False)
+            RestrictDomain(self.Model, Cell_of_Arrow_Circle, [Total for Total in Totals if self.LowerBound <= Total <= self.UpperBound],
+                           self.LowerBound, self.UpperBound)
             self.Model.Add(sum(Cells_of_Arrow) == Cell_of_Arrow_Circle)
-            print(f"Arrow Sum Condition {arrow_id + 1} added for circle {arrow_circle}")
+            Log.debug("Arrow Sum Condition %s added for circle %s", arrow_id + 1, arrow_circle)
         else:
-            print(f"Warning: Arrow {arrow_id + 1} has no body cells. Skipping.")
+            Log.warning("Arrow %s has no body cells. Skipping.", arrow_id + 1)
 
 def TwoDigitArrowSum(self, arrow_circles1, arrow_circles2, arrow_bodies):
         
@@ -92,6 +101,10 @@ def TwoDigitArrowSum(self, arrow_circles1, arrow_circles2, arrow_bodies):
         # Place the average condition
         # Sum of cells in arrow = value in arrow circle
         if len(Cells_of_Arrow) > 0:
+            # The two digit number is one of the totals the body can add up to
+            Totals = PossibleTotals(self.LowerBound, self.UpperBound, len(Cells_of_Arrow), Unique=False)
+            RestrictDomain(self.Model, 10*Cell_of_Arrow_Circle1 + Cell_of_Arrow_Circle2, Totals,
+                           11*self.LowerBound, 11*self.UpperBound)
             self.Model.Add(sum(Cells_of_Arrow) == 10*Cell_of_Arrow_Circle1 + Cell_of_Arrow_Circle2)
         else:
-            print(f"Warning: Arrow {arrow_id + 1} has no body cells. Skipping.")
+            Log.warning("Arrow %s has no body cells. Skipping.", arrow_id + 1)
@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def OddEvenConstraints(self, OddEvenMap):
     
     '''
@@ -5,15 +9,18 @@ def OddEvenConstraints(self, OddEvenMap):
     0 - any, 1 - odd, 2 - even
     '''
     
+    Odd = range(self.LowerBound + (self.LowerBound + 1) % 2, self.UpperBound + 1, 2)
+    Even = range(self.LowerBound + self.LowerBound % 2, self.UpperBound + 1, 2)
+    
     for i in range(self.Rows):
         for j in range(self.Cols):
             parity = OddEvenMap[i, j]
             if parity == 1:
-                self.Model.AddModuloEquality(1, self.Cells[i][j], 2)
+                self.RestrictCellValues(self.Cells[i][j], Odd)
             elif parity == 2:
-                self.Model.AddModuloEquality(0, self.Cells[i][j], 2)
+                self.RestrictCellValues(self.Cells[i][j], Even)
     
-    print("Odd-Even Constraints added")
+    Log.debug("Odd-Even Constraints added")
 
 def OrthogonalNeighbouringSums(self, cells):
     
@@ -30,7 +37,7 @@ def OrthogonalNeighbouringSums(self, cells):
             if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
                 Neighbours.append(self.Cells[ni][nj])
         self.Model.Add(self.Cells[x][y] == sum(Neighbours))
-        print(f"Orthogonal Neighbouring Sum constaint added for cell {(x,y)}")
+        Log.debug("Orthogonal Neighbouring Sum constaint added for cell %s", (x, y))
 
 def RestrictedCellsConstraints(self, CellMap, CellValLists):
     
@@ -38,34 +45,18 @@ def RestrictedCellsConstraints(self, CellMap, CellValLists):
     Cells contain only specific values instead of all values.
     '''
     
-    # First, find all the unique entries in the Map
-    UIDs = set()
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            if CellMap[i, j] not in UIDs:
-                UIDs.add(CellMap[i, j])
-    
-    # Remove 0 so that cells with 0 are not clubbed together as another group
-    if 0 in UIDs:
-        UIDs.remove(0)
+    # The groups of the map in the order of their IDs, so that they line up with CellValLists.
+    # Cells with 0 are not clubbed together as another group.
+    Groups = self.Regions(CellMap)
     
     # Loop through all the restricted entry cells
-    for UID, CellValList in zip(UIDs, CellValLists):
+    for UID, CellValList in zip(Groups, CellValLists):
         # Get all the cells pertaining to a given condition
-        subgrid = [self.Cells[i][j] for i in range(self.Rows) for j in range(self.Cols) if UID == CellMap[i, j]]
-        for i, cell in enumerate(subgrid):
-            # Create a boolean value list
-            CellBoolList = []
-            for val in CellValList:
-                # Enforce a boolean condition that the cell has to be the value in the cellvalue list
-                CellBool = self.Model.NewBoolVar(f"Cell_{i}_UID_{UID}_isVal_{val}")
-                self.Model.Add(cell==val).OnlyEnforceIf(CellBool)
-                self.Model.Add(cell!=val).OnlyEnforceIf(CellBool.Not())
-                CellBoolList.append(CellBool)
-            # Ensure that atleast one of the boolean conditions should be true
-            self.Model.AddBoolOr(CellBoolList)
+        for cell in Groups.Cells(self.Cells, UID):
+            # The cell has to be one of the values in the cellvalue list
+            self.RestrictCellValues(cell, CellValList)
             
-        print(f"Restricted assignment for UID = {UID} with restricted values {CellValList} added")
+        Log.debug("Restricted assignment for UID = %s with restricted values %s added", UID, CellValList)
     
 def CloneRegions(self, Set1, Set2):
     '''
@@ -91,39 +82,22 @@ def SameSetRegions(self, Set1, Set2):
     Example Puzzle: https://www.youtube.com/watch?v=OkDyZvHDoiA
     '''
     
-    for idx, (region1, region2) in enumerate(zip(Set1, Set2)):
+    for region1, region2 in zip(Set1, Set2):
         
-        Cells1 = [self.Cells[i][j] for i, j in region1]
-        Cells2 = [self.Cells[i][j] for i, j in region2]
+        # Every cell of the regions is one-hot encoded: the occurrences of a number are
+        # counted with the literals of the cells being equal to it
+        OneHot1 = [self.ChannelOneHot(i, j) for i, j in region1]
+        OneHot2 = [self.ChannelOneHot(i, j) for i, j in region2]
         
         Region1_Counters = []
         Region2_Counters = []
         
-        # Run through all numbers 1-n
-        for num in range(self.LowerBound, self.UpperBound+1):
-            
-            # In each cell, check if the cell is equal to the number
-            Region1_numCounter = []
-            Region2_numCounter = []
-            
-            for i in range(len(Cells1)):
-                
-                # This variable checks if the cell in the given position is equal to the number
-                count_R1 = self.Model.NewBoolVar(f'count_R1_{num}_{idx}_pos_{i}')
-                count_R2 = self.Model.NewBoolVar(f'count_R2_{num}_{idx}_pos_{i}')
-                
-                self.Model.Add(Cells1[i] == num).OnlyEnforceIf(count_R1)
-                self.Model.Add(Cells1[i] != num).OnlyEnforceIf(count_R1.Not())
-                self.Model.Add(Cells2[i] == num).OnlyEnforceIf(count_R2)
-                self.Model.Add(Cells2[i] != num).OnlyEnforceIf(count_R2.Not())
-                
-                # This keeps record of all the occurrences of a number "num" in the cell
-                Region1_numCounter.append(count_R1)
-                Region2_numCounter.append(count_R2)
+        # Run through all numbers 1-n, k being the index of the number in the one-hot literals
+        for k in range(self.UpperBound - self.LowerBound + 1):
             
-            # Count the number of occurrences of a number "num" in the regions.
-            Region1_Counters.append(sum(Region1_numCounter))
-            Region2_Counters.append(sum(Region2_numCounter))
+            # Count the number of occurrences of the number in the regions.
+            Region1_Counters.append(sum(Literals[k] for Literals in OneHot1))
+            Region2_Counters.append(sum(Literals[k] for Literals in OneHot2))
             
         # Enforce equality of counts
         # That is, for two regions to have the same numbers - regardless of order
@@ -131,4 +105,4 @@ def SameSetRegions(self, Set1, Set2):
         for var1, var2 in zip(Region1_Counters, Region2_Counters):
             self.Model.Add(var1 == var2)
     
-    print("Same Set Region Constraint added.")
+    Log.debug("Same Set Region Constraint added.")
@@ -1,4 +1,7 @@
 import numpy as np
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
 
 def ClassicSudokuConstraints(self):
         
@@ -10,7 +13,7 @@ def ClassicSudokuConstraints(self):
     self.SudokuSubGridConstraints()
     self.InitializeGivenEntries()
     
-    print("Classic Constraints added.")
+    Log.debug("Classic Constraints added.")
     
 def SudokuRowConstraints(self):
     
@@ -27,7 +30,9 @@ def SudokuRowConstraints(self):
         
         self.Model.AddAllDifferent(RowCollection)
     
-    print("Row constraints added.")
+    self.AllDifferentMaps.append(np.repeat(np.arange(1, self.Rows + 1)[:, None], self.Cols, axis=1))
+    
+    Log.debug("Row constraints added.")
     
 def SudokuColConstraints(self):
     
@@ -44,7 +49,9 @@ def SudokuColConstraints(self):
         
         self.Model.AddAllDifferent(ColCollection)
     
-    print("Column constraints added.")
+    self.AllDifferentMaps.append(np.repeat(np.arange(1, self.Cols + 1)[None, :], self.Rows, axis=0))
+    
+    Log.debug("Column constraints added.")
 
 def LatinSquares(self):
     
@@ -56,7 +63,7 @@ def LatinSquares(self):
     self.SudokuColConstraints()
     self.InitializeGivenEntries()
     
-    print("Latin Squares Constraints added.")
+    Log.debug("Latin Squares Constraints added.")
 
 def GenerateClassicSubgridMap(self):
     
@@ -85,8 +92,9 @@ def SudokuSubGridConstraints(self):
             self.Model.AddAllDifferent(subgrid)
     
     self.SubgridMap = self.GenerateClassicSubgridMap()
+    self.AllDifferentMaps.append(self.SubgridMap)
     
-    print("SubGrid constraints added.")
+    Log.debug("SubGrid constraints added.")
 
 def SudokuCustomGridConstraints(self, SubGridMap):
     
@@ -100,34 +108,32 @@ def SudokuCustomGridConstraints(self, SubGridMap):
     0 is used to mark free cells - cells that do not belong to any subgrid/region
     '''
     
-    # First, find all the unique entries in the SubGridMap
-    UIDs = set()
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            if SubGridMap[i, j] not in UIDs:
-                UIDs.add(SubGridMap[i, j])
-    
-    # Remove 0 so that cells with 0 are not clubbed together as another group
-    if 0 in UIDs:
-        UIDs.remove(0)
+    # The subgrids of the map, without the free cells marked 0
+    Regions = self.Regions(SubGridMap)
     
-    for entry in UIDs:
-        subgrid = [ self.Cells[i][j] for i in range(self.Rows) 
-                    for j in range(self.Cols) if entry == SubGridMap[i, j]]
+    for entry in Regions:
+        subgrid = Regions.Cells(self.Cells, entry)
         self.Model.AddAllDifferent(subgrid)
-        print(f"Custom Subgrid with UID {entry} added.")
+        Log.debug("Custom Subgrid with UID %s added.", entry)
     
     self.SubgridMap = SubGridMap
+    self.AllDifferentMaps.append(np.asarray(SubGridMap))
     
-    print("Custom SubGrid constraints added.")
+    Log.debug("Custom SubGrid constraints added.")
 
 def InitializeGivenEntries(self):
         
     '''
     Initial Value Constraints: Add the givens into the sudoku.
     '''
+    
+    # Givens are added to the clone of a model template, not to the template itself
+    if self.DeferGivenEntries:
+        self.GivenEntriesRequested = True
+        return
+    
     # Add the Sudoku Problem Givens
     for i in range(self.Rows):
         for j in range(self.Cols):
             if self.InputMatrix[i, j] != 0:
-                self.Model.Add(self.Cells[i][j] == self.InputMatrix[i, j])
\ No newline at end of file
+                self.RestrictCellValues(self.Cells[i][j], [int(self.InputMatrix[i, j])])
\ No newline at end of file
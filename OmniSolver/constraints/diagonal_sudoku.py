@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def TLBR_DiagonalConstraint(self):
         
     '''
@@ -8,7 +12,7 @@ def TLBR_DiagonalConstraint(self):
     diagonal = [self.Cells[i][i] for i in range(self.Rows)]
     self.Model.AddAllDifferent(diagonal)
     
-    print("TLBR Diagonal constraint added.")
+    Log.debug("TLBR Diagonal constraint added.")
 
 def TRBL_DiagonalConstraint(self):
     
@@ -20,4 +24,4 @@ def TRBL_DiagonalConstraint(self):
     diagonal = [self.Cells[i][self.Rows - 1 - i] for i in range(self.Rows)]
     self.Model.AddAllDifferent(diagonal)
 
-    print("TRBL Diagonal constraint added.")
\ No newline at end of file
+    Log.debug("TRBL Diagonal constraint added.")
\ No newline at end of file
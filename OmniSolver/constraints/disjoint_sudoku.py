@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def DisjointConstraints(self):
     """
     Adds the Disjoint or SuperWindoku constraints to the model. Each of the 9 SuperWindoku
@@ -26,4 +30,4 @@ def DisjointConstraints(self):
         # Add a constraint to ensure all values in the region are distinct
         self.Model.AddAllDifferent(cells)
 
-        print(f"Disjoint/Super Windoku region {region_id + 1} added.")
+        Log.debug("Disjoint/Super Windoku region %s added.", region_id + 1)
@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def KakurasuRowConstraints(self, RowSums):
         
     '''
@@ -12,7 +16,7 @@ def KakurasuRowConstraints(self, RowSums):
             continue
         Weights = [self.Cells[i][j] * (j + 1) for j in range(self.Cols)]
         self.Model.Add(sum(Weights) == rowsum)
-    print("Kakurasu Row Constraints added")
+    Log.debug("Kakurasu Row Constraints added")
     
 def KakurasuColConstraints(self, ColSums):
     
@@ -28,7 +32,7 @@ def KakurasuColConstraints(self, ColSums):
             continue
         Weights = [self.Cells[i][j] * (i + 1) for i in range(self.Rows)]
         self.Model.Add(sum(Weights) == colsum)
-    print("Kakurasu Column Constraints added")
+    Log.debug("Kakurasu Column Constraints added")
 
 def ClassicKakurasuConstraints(self, RowSums, ColSums):
     
@@ -40,4 +44,4 @@ def ClassicKakurasuConstraints(self, RowSums, ColSums):
     self.KakurasuColConstraints(ColSums)
     self.KakurasuRowConstraints(RowSums)
     
-    print("Classic Kakurasu Constraints added.")
\ No newline at end of file
+    Log.debug("Classic Kakurasu Constraints added.")
\ No newline at end of file
@@ -1,4 +1,8 @@
-from itertools import combinations
+from ortools.sat.python import cp_model
+from OmniSolver.SumCombinations import AddCageSum, PossibleTotals
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
 
 def KillerSudokuConstraints(self, KillerCageSums, KillerCageMap):
     """
@@ -16,21 +20,13 @@ def KillerSudokuConstraints(self, KillerCageSums, KillerCageMap):
         KillerCageMap (array): A 2D map of all the cells belonging to a killer cage marked by unique numbers.
     """
     
-    # First, find all the unique entries in the Killer Cage Map
-    UIDs = set()
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            if KillerCageMap[i, j] not in UIDs:
-                UIDs.add(KillerCageMap[i, j])
-    
-    # Remove 0 so that cells with 0 are not clubbed together as another group
-    if 0 in UIDs:
-        UIDs.remove(0)
+    # The cages of the map in the order of their IDs, so that they line up with the sums.
+    # Cells with 0 are not clubbed together as another cage.
+    Cages = self.Regions(KillerCageMap)
     
-    for (entry, cage_sum) in zip(UIDs, KillerCageSums):
+    for (entry, cage_sum) in zip(Cages, KillerCageSums):
         
-        subgrid = [ self.Cells[i][j] for i in range(self.Rows) 
-                    for j in range(self.Cols) if entry == KillerCageMap[i, j]]
+        subgrid = Cages.Cells(self.Cells, entry)
         
         # Constraint saying the cells are unique
         self.Model.AddAllDifferent(subgrid)
@@ -38,11 +34,11 @@ def KillerSudokuConstraints(self, KillerCageSums, KillerCageMap):
         # This is used to tell if a cage sum is given or not
         # -1 implies cage sum is not given.
         if cage_sum != -1:
-            # Constraint equating the sum of the cells
-            self.Model.Add(sum(subgrid) == cage_sum)
-        print(f"Custom Subgrid with UID {entry} added.")
+            # Constraint equating the sum of the cells, with the digits the sum allows
+            AddCageSum(self.Model, subgrid, cage_sum, self.LowerBound, self.UpperBound)
+        Log.debug("Custom Subgrid with UID %s added.", entry)
     
-    print("Partial/Full Killer Cage Constraints added.")
+    Log.debug("Partial/Full Killer Cage Constraints added.")
 
 def LittleKillerSudokuConstraints(self, KillerCageSums, KillerCageMap):
     """
@@ -60,21 +56,13 @@ def LittleKillerSudokuConstraints(self, KillerCageSums, KillerCageMap):
         KillerCageMap (array): A 2D map of all the cells belonging to a little killer cage marked by unique numbers.
     """
     
-    # First, find all the unique entries in the Killer Cage Map
-    UIDs = set()
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            if KillerCageMap[i, j] not in UIDs:
-                UIDs.add(KillerCageMap[i, j])
+    # The cages of the map in the order of their IDs, so that they line up with the sums.
+    # Cells with 0 are not clubbed together as another cage.
+    Cages = self.Regions(KillerCageMap)
     
-    # Remove 0 so that cells with 0 are not clubbed together as another group
-    if 0 in UIDs:
-        UIDs.remove(0)
-    
-    for (entry, cage_sum) in zip(UIDs, KillerCageSums):
+    for (entry, cage_sum) in zip(Cages, KillerCageSums):
         
-        subgrid = [ self.Cells[i][j] for i in range(self.Rows) 
-                    for j in range(self.Cols) if entry == KillerCageMap[i, j]]
+        subgrid = Cages.Cells(self.Cells, entry)
         
         # Constraint saying the cells are unique
         # self.Model.AddAllDifferent(subgrid)
@@ -82,23 +70,25 @@ def LittleKillerSudokuConstraints(self, KillerCageSums, KillerCageMap):
         # This is used to tell if a cage sum is given or not
         # None implies cage sum is not given.
         if cage_sum != None:
-            # Constraint equating the sum of the cells
-            self.Model.Add(sum(subgrid) == cage_sum)
-        print(f"Custom Subgrid with UID {entry} added.")
+            # Constraint equating the sum of the cells. Digits may repeat along a little killer.
+            AddCageSum(self.Model, subgrid, cage_sum, self.LowerBound, self.UpperBound, Unique=False)
+        Log.debug("Custom Subgrid with UID %s added.", entry)
     
-    print("Little Killer Cage Constraints added.")
+    Log.debug("Little Killer Cage Constraints added.")
 
 def KillerCageConstraintsWithUnknownSums(self, KillerCageMap, UnknownSums=False,
                                              SumOfAllCagesGiven=False, SumOfAllCages=0,
                                              SameSumCageGroups=False, SameSumCageGroupIDs=None,
                                              UniqueCageGroupSums=False, EqualSumCages=False):
         
+        Cages = self.Regions(KillerCageMap)
+        
         # Helper function to get cells for a given cage ID
         def get_cage_cells(cage_id):
-            return [self.Cells[i][j] for i in range(self.Rows) for j in range(self.Cols) if KillerCageMap[i, j] == cage_id]
+            return Cages.Cells(self.Cells, cage_id)
     
         # Unique cage IDs, excluding 0
-        UIDs = {KillerCageMap[i, j] for i in range(self.Rows) for j in range(self.Cols)} - {0}
+        UIDs = Cages.UIDs
         
         # The sums of killer cages not given. So, only apply the uniqueness condition.
         # example: https://www.youtube.com/watch?v=M7H0mpeYW00
@@ -108,7 +98,7 @@ def KillerCageConstraintsWithUnknownSums(self, KillerCageMap, UnknownSums=False,
                 
                 # Constraint saying the cells are unique
                 self.Model.AddAllDifferent(subgrid)
-                print(f"Custom Subgrid with UID {entry} added.")
+                Log.debug("Custom Subgrid with UID %s added.", entry)
         
         # The sum of all cages is given
         # example: https://www.youtube.com/watch?v=PaRzV3EAa44
@@ -116,34 +106,49 @@ def KillerCageConstraintsWithUnknownSums(self, KillerCageMap, UnknownSums=False,
             all_cells = [cell for entry in UIDs for cell in get_cage_cells(entry)]
             self.Model.Add(sum(all_cells) == SumOfAllCages)
         
+        # Sum variables shared by the cages of a group with the same sum, so that a group of
+        # n cages needs n equalities instead of one for every pair of cages. The domain is the
+        # set of totals every cage of the group can add up to.
+        group_sum_vars = {}
+        def get_group_sum_var(group):
+            group = tuple(group)
+            if group not in group_sum_vars:
+                totals = None
+                for cage_id in group:
+                    cage_totals = set(PossibleTotals(self.LowerBound, self.UpperBound, len(get_cage_cells(cage_id)), UnknownSums))
+                    totals = cage_totals if totals is None else totals & cage_totals
+                
+                # Without a possible total the cages are already infeasible on their own
+                if not totals:
+                    totals = {0}
+                
+                group_sum_var = self.Model.NewIntVarFromDomain(cp_model.Domain.FromValues(sorted(totals)), self.VarName("GroupSum_{}", group[0]))
+                for cage_id in group:
+                    self.Model.Add(sum(get_cage_cells(cage_id)) == group_sum_var)
+                group_sum_vars[group] = group_sum_var
+            return group_sum_vars[group]
+        
         # There are groups of cages having the same sum
         # example: https://www.youtube.com/watch?v=M7H0mpeYW00
         if SameSumCageGroups:
             for group in map(tuple, SameSumCageGroupIDs):  # Ensure groups are tuples
-                for ID1, ID2 in combinations(group, 2):
-                    self.Model.Add(sum(get_cage_cells(ID1)) == sum(get_cage_cells(ID2)))
+                get_group_sum_var(group)
         
         # There are groups of killer cages having unique sums
         # That is, there are many cages separated into different groups
         # based on same sums. However, all the groups have unique sums
         # example: https://www.youtube.com/watch?v=M7H0mpeYW00
         if UniqueCageGroupSums:
-            group_sum_vars = []
-            for group in SameSumCageGroupIDs:
-                first_cage_id = group[0]  # Pick one cage ID from the group
-                cage_cells = get_cage_cells(first_cage_id)
-                group_sum_var = self.Model.NewIntVar(1, self.SumOfNumbers, f"GroupSum_{first_cage_id}")  # Adjust range if needed
-                self.Model.Add(group_sum_var == sum(cage_cells))
-                group_sum_vars.append(group_sum_var)
-
+            # Without SameSumCageGroups, the sum of a group is the sum of its first cage
+            groups = map(tuple, SameSumCageGroupIDs) if SameSumCageGroups else ((group[0],) for group in SameSumCageGroupIDs)
+            
             # Enforce all group sums are unique
-            self.Model.AddAllDifferent(group_sum_vars)
+            self.Model.AddAllDifferent([get_group_sum_var(group) for group in groups])
         
         # Equal Sum Cages
         # All the cages have the same sum - sum unknown
         # eg: https://www.youtube.com/watch?v=le1pe4WMGZY
         if EqualSumCages:
-            for ID1, ID2 in combinations(UIDs, 2):
-                self.Model.Add(sum(get_cage_cells(ID1)) == sum(get_cage_cells(ID2)))
+            get_group_sum_var(UIDs)
                 
-        print("Partial/Full Killer Cage with unknown sums Constraints added.")
+        Log.debug("Partial/Full Killer Cage with unknown sums Constraints added.")
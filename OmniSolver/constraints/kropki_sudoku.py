@@ -1,3 +1,8 @@
+from OmniSolver.NeighbourGraph import OrthogonalMoves
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def KropkiRatioConstraints(self, numerator, denominator):
     """
     Adds the Kropki constraint that two orthogonally adjacent cells 
@@ -7,19 +12,12 @@ def KropkiRatioConstraints(self, numerator, denominator):
         numerator (int): The numerator of the ratio.
         denominator (int): The denominator of the ratio.
     """
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            # Check right (if within bounds)
-            if j + 1 < self.Cols:
-                self.Model.Add(self.Cells[i][j] != numerator * self.Cells[i][j + 1])  # A = numerator * B
-                self.Model.Add(self.Cells[i][j + 1] != denominator * self.Cells[i][j])  # B = denominator * A
-
-            # Check down (if within bounds)
-            if i + 1 < self.Rows:
-                self.Model.Add(self.Cells[i][j] != numerator * self.Cells[i + 1][j])  # A = numerator * B
-                self.Model.Add(self.Cells[i + 1][j] != denominator * self.Cells[i][j])  # B = denominator * A
+    # Every pair of orthogonal neighbours, with A the left/top cell and B the right/bottom one
+    for (i, j), (ni, nj) in self.NeighbourEdges(OrthogonalMoves):
+        self.Model.Add(self.Cells[i][j] != numerator * self.Cells[ni][nj])  # A = numerator * B
+        self.Model.Add(self.Cells[ni][nj] != denominator * self.Cells[i][j])  # B = denominator * A
 
-    print(f"Kropki {numerator}:{denominator} ratio constraints added.")
+    Log.debug("Kropki %s:%s ratio constraints added.", numerator, denominator)
 
 def KropkiOrthogonalAntiSumConstraints(self, kropki_sum, PairExceptions=None):
     """
@@ -37,7 +35,7 @@ def KropkiOrthogonalAntiSumConstraints(self, kropki_sum, PairExceptions=None):
             if PairExceptions is not None:
                 for pair1, pair2 in PairExceptions:
                     if ((i, j) == pair1 and (i, j + 1) == pair2) or ((i, j) == pair1 and (i + 1, j) == pair2):
-                        print(f"Found a conflicting exception {pair1} and {pair2}. Excluding it")
+                        Log.warning("Found a conflicting exception %s and %s. Excluding it", pair1, pair2)
                         ExceptionFound = True
                         break
             
@@ -50,4 +48,4 @@ def KropkiOrthogonalAntiSumConstraints(self, kropki_sum, PairExceptions=None):
                 if i + 1 < self.Rows:
                     self.Model.Add(self.Cells[i][j] + self.Cells[i + 1][j] != kropki_sum)
 
-    print(f"Kropki Anti-Sum condition of {kropki_sum} constraints added.")
+    Log.debug("Kropki Anti-Sum condition of %s constraints added.", kropki_sum)
@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def LineDifferences(self, differences, difference_conditions, lines, linecolour=None, loop=False):
         
     '''
@@ -40,8 +44,8 @@ def LineDifferences(self, differences, difference_conditions, lines, linecolour=
             
             # Create boolean variables for the two possible conditions
             # Forward difference and Reverse Difference
-            condition1 = self.Model.NewBoolVar(f"condition1_difference_{idx}_{r1}_{c1}")
-            condition2 = self.Model.NewBoolVar(f"condition2_difference_{idx}_{r1}_{c1}")
+            condition1 = self.Model.NewBoolVar(self.VarName("condition1_difference_{}_{}_{}", idx, r1, c1))
+            condition2 = self.Model.NewBoolVar(self.VarName("condition2_difference_{}_{}_{}", idx, r1, c1))
             
             # Add enforce constraints for both conditions
             if diff_con == 1:
@@ -57,9 +61,9 @@ def LineDifferences(self, differences, difference_conditions, lines, linecolour=
             # At least one of the conditions must hold
             self.Model.AddBoolOr([condition1, condition2])
             
-        print(f"Line Difference condition {idx + 1} with difference {diff_string} {diff} added.")
+        Log.debug("Line Difference condition %s with difference %s %s added.", idx + 1, diff_string, diff)
 
-def RenbanLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCells=False):
+def RenbanLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCells=False, Encoding="minmax"):
     
     '''
     Renban Sudoku Conditions.
@@ -67,8 +71,47 @@ def RenbanLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCell
     Cells along the given lines must be consecutive and non-repeating in any order
     
     Example Puzzle: https://www.youtube.com/watch?v=DtZRGc9ej3w
+    
+    Encoding "minmax" makes the cells of a line distinct with max - min = length - 1, which
+    grows linearly with the length of the line. "pairwise" is the original encoding with two
+    booleans for every pair of cells of a line.
+    '''
+    
+    if Encoding == "pairwise":
+        PairwiseRenbanLinesConstraints(self, lines, linecolour, loop, TreatAsCells)
+        return
+    
+    if Encoding != "minmax":
+        raise ValueError(f"Unknown renban encoding {Encoding}. Use minmax or pairwise")
+    
+    for I, line in enumerate(lines):
+        
+        UniqueCells = list(set([(i, j) for i, j in line]))
+        Cells = [self.Cells[i][j] for i, j in UniqueCells]
+        
+        # Distinct digits spanning exactly len(Cells) values are consecutive
+        self.Model.AddAllDifferent(Cells)
+        
+        Low, High = RenbanBounds(self, Cells, f"Renban{I}")
+        self.Model.Add(High - Low == len(Cells) - 1)
+    
+    Log.debug("Renban Conditions Added")
+
+def RenbanBounds(self, Cells, Name):
+    
+    '''
+    Variables holding the smallest and the largest digit of Cells.
     '''
     
+    Low = self.Model.NewIntVar(self.LowerBound, self.UpperBound, self.VarName("{}_Min", Name))
+    High = self.Model.NewIntVar(self.LowerBound, self.UpperBound, self.VarName("{}_Max", Name))
+    self.Model.AddMinEquality(Low, Cells)
+    self.Model.AddMaxEquality(High, Cells)
+    
+    return Low, High
+
+def PairwiseRenbanLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCells=False):
+    
     for I, line in enumerate(lines):
         
         UniqueCells = list(set([(i, j) for i, j in line]))
@@ -80,17 +123,17 @@ def RenbanLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCell
         PairDifferences = []
         for i in range(len(Cells)):
             for j in range(len(Cells)):
-                RenbanDiffForward = self.Model.NewBoolVar(f"RenbanDiff_Forward{I}_{i}_{j}")
-                RenbanDiffBackward = self.Model.NewBoolVar(f"RenbanDiff_Backward{I}_{i}_{j}")
+                RenbanDiffForward = self.Model.NewBoolVar(self.VarName("RenbanDiff_Forward{}_{}_{}", I, i, j))
+                RenbanDiffBackward = self.Model.NewBoolVar(self.VarName("RenbanDiff_Backward{}_{}_{}", I, i, j))
                 self.Model.Add(Cells[i] == Cells[j] + 1).OnlyEnforceIf(RenbanDiffForward)
                 self.Model.Add(Cells[j] == Cells[i] + 1).OnlyEnforceIf(RenbanDiffBackward)
                 PairDifferences.append(RenbanDiffForward)
                 PairDifferences.append(RenbanDiffBackward)
         self.Model.Add(sum(PairDifferences) == 2*len(Cells) - 2)
         
-    print("Renban Conditions Added")
+    Log.debug("Renban Conditions Added")
 
-def WarpingRenbanLinesConstraints(self, LineSet1, LineSet2, linecolour=None):
+def WarpingRenbanLinesConstraints(self, LineSet1, LineSet2, linecolour=None, Encoding="minmax"):
     
     '''
     Warping Renban Lines
@@ -99,8 +142,84 @@ def WarpingRenbanLinesConstraints(self, LineSet1, LineSet2, linecolour=None):
     line pair to form a bigger line that obeys renban condition
     
     Example Puzzle: https://www.youtube.com/watch?v=SYSS_GD-vaU
+    
+    Encoding "minmax" reifies the renban condition of each line on its min/max, and of the
+    combined line on the min/max of the two lines, so its size grows linearly with the length
+    of the lines. "pairwise" is the original encoding with two booleans for every pair of
+    cells of each of the three lines. Both encodings fix every literal they add from the
+    digits of the lines.
     '''
     
+    if Encoding == "pairwise":
+        PairwiseWarpingRenbanLinesConstraints(self, LineSet1, LineSet2, linecolour)
+        return
+    
+    if Encoding != "minmax":
+        raise ValueError(f"Unknown renban encoding {Encoding}. Use minmax or pairwise")
+    
+    for I, (line1, line2) in enumerate(zip(LineSet1, LineSet2)):
+        
+        UniqueCells1 = list(set([(i, j) for i, j in line1]))
+        Cells1 = [self.Cells[i][j] for i, j in UniqueCells1]
+        
+        UniqueCells2 = list(set([(i, j) for i, j in line2]))
+        Cells2 = [self.Cells[i][j] for i, j in UniqueCells2]
+        
+        Cells3 = Cells1 + Cells2
+        
+        # Each line has distinct digits, whether it is a renban or part of the combined one
+        self.Model.AddAllDifferent(Cells1)
+        self.Model.AddAllDifferent(Cells2)
+        
+        Low1, High1 = RenbanBounds(self, Cells1, f"WarpingRenban1_{I}")
+        Low2, High2 = RenbanBounds(self, Cells2, f"WarpingRenban2_{I}")
+        
+        # The bounds of the combined line come from the bounds of the two lines
+        Low3, High3 = RenbanBounds(self, [Low1, Low2, High1, High2], f"WarpingRenban3_{I}")
+        
+        WarpingRenbanLine1 = self.Model.NewBoolVar(self.VarName("WarpingRenbanSet1_{}", I))
+        WarpingRenbanLine2 = self.Model.NewBoolVar(self.VarName("WarpingRenbanSet2_{}", I))
+        
+        # A line of distinct digits is a renban exactly when it spans len(Cells) values. The
+        # literals are fixed by the digits so that enumerations do not repeat grids
+        for Cells, Low, High, IsRenban in ((Cells1, Low1, High1, WarpingRenbanLine1),
+                                           (Cells2, Low2, High2, WarpingRenbanLine2)):
+            self.Model.Add(High - Low == len(Cells) - 1).OnlyEnforceIf(IsRenban)
+            self.Model.Add(High - Low >= len(Cells)).OnlyEnforceIf(IsRenban.Not())
+        
+        DoubleRenban = self.Model.NewBoolVar(self.VarName("WarpingDoubleRenban_{}", I))
+        self.Model.AddBoolAnd([WarpingRenbanLine1, WarpingRenbanLine2]).OnlyEnforceIf(DoubleRenban)
+        self.Model.AddBoolOr([WarpingRenbanLine1.Not(), WarpingRenbanLine2.Not()]).OnlyEnforceIf(DoubleRenban.Not())
+        
+        # Line 1 or Line 2 or both are not Renbans -> Line 3 must be a Renban
+        self.Model.AddAllDifferent(Cells3).OnlyEnforceIf(DoubleRenban.Not())
+        self.Model.Add(High3 - Low3 == len(Cells3) - 1).OnlyEnforceIf(DoubleRenban.Not())
+    
+    Log.debug("Warping Renban Line Constraints Added")
+
+def PairwiseRenbanDifferences(self, Cells, Name, I):
+    
+    '''
+    Booleans that are True exactly when a cell of Cells is one more than another one. Cells
+    of distinct digits form a renban when 2*len(Cells) - 2 of them are True.
+    '''
+    
+    PairDifferences = []
+    for i in range(len(Cells)):
+        for j in range(len(Cells)):
+            RenbanDiffForward = self.Model.NewBoolVar(self.VarName(Name + "_Forward{}_{}_{}", I, i, j))
+            RenbanDiffBackward = self.Model.NewBoolVar(self.VarName(Name + "_Backward{}_{}_{}", I, i, j))
+            self.Model.Add(Cells[i] == Cells[j] + 1).OnlyEnforceIf(RenbanDiffForward)
+            self.Model.Add(Cells[i] != Cells[j] + 1).OnlyEnforceIf(RenbanDiffForward.Not())
+            self.Model.Add(Cells[j] == Cells[i] + 1).OnlyEnforceIf(RenbanDiffBackward)
+            self.Model.Add(Cells[j] != Cells[i] + 1).OnlyEnforceIf(RenbanDiffBackward.Not())
+            PairDifferences.append(RenbanDiffForward)
+            PairDifferences.append(RenbanDiffBackward)
+    
+    return PairDifferences
+
+def PairwiseWarpingRenbanLinesConstraints(self, LineSet1, LineSet2, linecolour=None):
+    
     for I, (line1, line2) in enumerate(zip(LineSet1, LineSet2)):
         
         UniqueCells1 = list(set([(i, j) for i, j in line1]))
@@ -113,74 +232,39 @@ def WarpingRenbanLinesConstraints(self, LineSet1, LineSet2, linecolour=None):
         
         # Add the Uniqueness condition for each line - regardless of
         # being a standalone renban line, they have distinct numbers
-        # self.Model.AddAllDifferent(Cells1)
-        # self.Model.AddAllDifferent(Cells2)
+        self.Model.AddAllDifferent(Cells1)
+        self.Model.AddAllDifferent(Cells2)
         
         # Run Renban Test for line 1
-        PairDifferences1 = []
-        WarpingRenbanLine1 = self.Model.NewBoolVar(f"WarpingRenbanSet1_{I}")
-        
-        for i in range(len(Cells1)):
-            for j in range(len(Cells1)):
-                RenbanDiffForward = self.Model.NewBoolVar(f"WarpingRenbanDiff1_Forward{I}_{i}_{j}")
-                RenbanDiffBackward = self.Model.NewBoolVar(f"WarpingRenbanDiff1_Backward{I}_{i}_{j}")
-                self.Model.Add(Cells1[i] == Cells1[j] + 1).OnlyEnforceIf(RenbanDiffForward)
-                self.Model.Add(Cells1[j] == Cells1[i] + 1).OnlyEnforceIf(RenbanDiffBackward)
-                PairDifferences1.append(RenbanDiffForward)
-                PairDifferences1.append(RenbanDiffBackward)
-        
-        # enforce the renban condition on the line if WarpingRenbanLine1 is True
-        self.Model.AddAllDifferent(Cells1).OnlyEnforceIf(WarpingRenbanLine1)
+        PairDifferences1 = PairwiseRenbanDifferences(self, Cells1, "WarpingRenbanDiff1", I)
+        WarpingRenbanLine1 = self.Model.NewBoolVar(self.VarName("WarpingRenbanSet1_{}", I))
+        
+        # WarpingRenbanLine1 is True exactly when line 1 is a renban
         self.Model.Add(sum(PairDifferences1) == 2*len(Cells1) - 2).OnlyEnforceIf(WarpingRenbanLine1)
+        self.Model.Add(sum(PairDifferences1) != 2*len(Cells1) - 2).OnlyEnforceIf(WarpingRenbanLine1.Not())
         
         # Run Renban Test for line 2
-        PairDifferences2 = []
-        WarpingRenbanLine2 = self.Model.NewBoolVar(f"WarpingRenbanSet2_{I}")
-        
-        for i in range(len(Cells2)):
-            for j in range(len(Cells2)):
-                RenbanDiffForward = self.Model.NewBoolVar(f"WarpingRenbanDiff2_Forward{I}_{i}_{j}")
-                RenbanDiffBackward = self.Model.NewBoolVar(f"WarpingRenbanDiff2_Backward{I}_{i}_{j}")
-                self.Model.Add(Cells2[i] == Cells2[j] + 1).OnlyEnforceIf(RenbanDiffForward)
-                # self.Model.Add(Cells2[i] != Cells2[j] + 1).OnlyEnforceIf(RenbanDiffForward.Not())
-                self.Model.Add(Cells2[j] == Cells2[i] + 1).OnlyEnforceIf(RenbanDiffBackward)
-                # self.Model.Add(Cells2[j] != Cells2[i] + 1).OnlyEnforceIf(RenbanDiffBackward.Not())
-                PairDifferences2.append(RenbanDiffForward)
-                PairDifferences2.append(RenbanDiffBackward)
-        
-        # enforce the renban condition on the line if WarpingRenbanLine3 is True
-        self.Model.AddAllDifferent(Cells2).OnlyEnforceIf(WarpingRenbanLine2)
+        PairDifferences2 = PairwiseRenbanDifferences(self, Cells2, "WarpingRenbanDiff2", I)
+        WarpingRenbanLine2 = self.Model.NewBoolVar(self.VarName("WarpingRenbanSet2_{}", I))
+        
         self.Model.Add(sum(PairDifferences2) == 2*len(Cells2) - 2).OnlyEnforceIf(WarpingRenbanLine2)
+        self.Model.Add(sum(PairDifferences2) != 2*len(Cells2) - 2).OnlyEnforceIf(WarpingRenbanLine2.Not())
         
         # Run Renban Test for line 3 - the combined line 1 and 2
-        PairDifferences3 = []
-        
-        for i in range(len(Cells3)):
-            for j in range(len(Cells3)):
-                RenbanDiffForward = self.Model.NewBoolVar(f"WarpingRenbanDiff3_Forward{I}_{i}_{j}")
-                RenbanDiffBackward = self.Model.NewBoolVar(f"WarpingRenbanDiff3_Backward{I}_{i}_{j}")
-                self.Model.Add(Cells3[i] == Cells3[j] + 1).OnlyEnforceIf(RenbanDiffForward)
-                # self.Model.Add(Cells3[i] != Cells3[j] + 1).OnlyEnforceIf(RenbanDiffForward.Not())
-                self.Model.Add(Cells3[j] == Cells3[i] + 1).OnlyEnforceIf(RenbanDiffBackward)
-                # self.Model.Add(Cells3[j] != Cells3[i] + 1).OnlyEnforceIf(RenbanDiffBackward.Not())
-                PairDifferences3.append(RenbanDiffForward)
-                PairDifferences3.append(RenbanDiffBackward)
-                            
+        PairDifferences3 = PairwiseRenbanDifferences(self, Cells3, "WarpingRenbanDiff3", I)
+        
         # Check if both the lines are Renban or not
-        DoubleRenban = self.Model.NewBoolVar(f"WarpingDoubleRenban_{I}")
+        DoubleRenban = self.Model.NewBoolVar(self.VarName("WarpingDoubleRenban_{}", I))
         self.Model.AddBoolAnd([WarpingRenbanLine1, WarpingRenbanLine2]).OnlyEnforceIf(DoubleRenban)
-        
-        # Condition for Line 3 to be a Renban - Both the unique entries and difference condtions must be valid
-        RenbanLine3Condition = self.Model.NewBoolVar(f"WarpingRenbanLine3_Condition{I}")
-        self.Model.Add(sum(PairDifferences3) == 2*len(Cells3) - 2).OnlyEnforceIf(RenbanLine3Condition)
-        self.Model.AddAllDifferent(Cells3).OnlyEnforceIf(RenbanLine3Condition)
+        self.Model.AddBoolOr([WarpingRenbanLine1.Not(), WarpingRenbanLine2.Not()]).OnlyEnforceIf(DoubleRenban.Not())
         
         # Condition for Warped Renban:
         # Line 1 or Line 2 or both are not Renbans -> Line 3 must be a Renban
         # Both lines are Renbans -> Line 3 might not be a Renban
-        self.Model.Add(sum([RenbanLine3Condition, DoubleRenban]) >=1)
+        self.Model.Add(sum(PairDifferences3) == 2*len(Cells3) - 2).OnlyEnforceIf(DoubleRenban.Not())
+        self.Model.AddAllDifferent(Cells3).OnlyEnforceIf(DoubleRenban.Not())
     
-    print("Warping Renban Line Constraints Added")
+    Log.debug("Warping Renban Line Constraints Added")
 
 def NabnerLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCells=False):
     
@@ -203,8 +287,8 @@ def NabnerLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCell
         PairDifferences = []
         for i in range(len(Cells)):
             for j in range(len(Cells)):
-                NabnerDiffForward = self.Model.NewBoolVar(f"NabnerDiff_Forward{I}_{i}_{j}")
-                NabnerDiffBackward = self.Model.NewBoolVar(f"NabnerDiff_Backward{I}_{i}_{j}")
+                NabnerDiffForward = self.Model.NewBoolVar(self.VarName("NabnerDiff_Forward{}_{}_{}", I, i, j))
+                NabnerDiffBackward = self.Model.NewBoolVar(self.VarName("NabnerDiff_Backward{}_{}_{}", I, i, j))
                 self.Model.Add(Cells[i] == Cells[j] + 1).OnlyEnforceIf(NabnerDiffForward)
                 self.Model.Add(Cells[i] != Cells[j] + 1).OnlyEnforceIf(NabnerDiffForward.Not())
                 self.Model.Add(Cells[j] == Cells[i] + 1).OnlyEnforceIf(NabnerDiffBackward)
@@ -213,7 +297,7 @@ def NabnerLinesConstraints(self, lines, linecolour=None, loop=False, TreatAsCell
                 PairDifferences.append(NabnerDiffBackward)
         self.Model.Add(sum(PairDifferences) == 0)
         
-    print("Nabner Conditions Added")
+    Log.debug("Nabner Conditions Added")
 
 def PalindromeLineConstraints(self, Lines):
         
@@ -236,5 +320,5 @@ def PalindromeLineConstraints(self, Lines):
         for i in range(MidRangeValue):
             self.Model.Add(Cells[i] == Cells[-i-1])
 
-    print("Palindrome Line Constraint added")
+    Log.debug("Palindrome Line Constraint added")
 
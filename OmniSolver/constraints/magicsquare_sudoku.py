@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def MagicSquareConstraints(self, magic_square_list):
     """
     Adds multiple magic square constraints to the Sudoku model.
@@ -45,4 +49,4 @@ def MagicSquareConstraints(self, magic_square_list):
         # Ensure all numbers in the magic square are unique
         self.Model.AddAllDifferent(cells)
 
-        print(f"Magic square {square_id + 1} added with magic constant {magic_constant}.")
+        Log.debug("Magic square %s added with magic constant %s.", square_id + 1, magic_constant)
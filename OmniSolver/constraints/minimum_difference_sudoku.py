@@ -1,3 +1,9 @@
+from ortools.sat.python import cp_model
+from OmniSolver.NeighbourGraph import OrthogonalMoves, DiagonalMoves
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def OrthogonalMinDifferenceConstraints(self, min_diff=2):
         
     """
@@ -7,20 +13,15 @@ def OrthogonalMinDifferenceConstraints(self, min_diff=2):
     Args:
         min_diff (int): Minimum absolute difference between orthogonal neighbors.
     """
-    # Loop through all cells
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            # Check all orthogonal neighbors of the current cell
-            for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # orthogonal directions
-                ni, nj = i + di, j + dj
-                # Ensure indices are within bounds
-                if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
-                    # Enforce the absolute difference condition
-                    abs_diff = self.Model.NewIntVar(0, self.FullOrder - 1, f"orthogonal_abs_diff_{i}_{j}_{ni}_{nj}")
-                    self.Model.AddAbsEquality(abs_diff, self.Cells[i][j] - self.Cells[ni][nj])
-                    self.Model.Add(abs_diff >= min_diff)
+    # The difference of every pair of orthogonal neighbours is at most -min_diff or at least
+    # min_diff. A single constraint per pair, with no absolute value variable.
+    Range = self.UpperBound - self.LowerBound
+    FarEnough = cp_model.Domain.FromIntervals([[-Range, -min_diff], [min_diff, Range]])
+    
+    for (i, j), (ni, nj) in self.NeighbourEdges(OrthogonalMoves):
+        self.Model.AddLinearExpressionInDomain(self.Cells[i][j] - self.Cells[ni][nj], FarEnough)
 
-    print(f"Orthogonal min-difference constraints added with min_diff = {min_diff}.")
+    Log.debug("Orthogonal min-difference constraints added with min_diff = %s.", min_diff)
 
 def DiagonalMinDifferenceConstraints(self, min_diff=2):
     """
@@ -30,17 +31,12 @@ def DiagonalMinDifferenceConstraints(self, min_diff=2):
     Args:
         min_diff (int): Minimum absolute difference between diagonal neighbors.
     """
-    # Loop through all cells
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            # Check all diagonal neighbors of the current cell
-            for di, dj in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:  # Diagonal directions
-                ni, nj = i + di, j + dj
-                # Ensure indices are within bounds
-                if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
-                    # Enforce the absolute difference condition
-                    abs_diff = self.Model.NewIntVar(0, self.FullOrder - 1, f"diagonal_abs_diff_{i}_{j}_{ni}_{nj}")
-                    self.Model.AddAbsEquality(abs_diff, self.Cells[i][j] - self.Cells[ni][nj])
-                    self.Model.Add(abs_diff >= min_diff)
+    # The difference of every pair of diagonal neighbours is at most -min_diff or at least
+    # min_diff. A single constraint per pair, with no absolute value variable.
+    Range = self.UpperBound - self.LowerBound
+    FarEnough = cp_model.Domain.FromIntervals([[-Range, -min_diff], [min_diff, Range]])
+    
+    for (i, j), (ni, nj) in self.NeighbourEdges(DiagonalMoves):
+        self.Model.AddLinearExpressionInDomain(self.Cells[i][j] - self.Cells[ni][nj], FarEnough)
 
-    print(f"Diagonal min-difference constraints added with min_diff = {min_diff}.")
+    Log.debug("Diagonal min-difference constraints added with min_diff = %s.", min_diff)
@@ -1,3 +1,21 @@
+from ortools.sat.python import cp_model
+from OmniSolver.NeighbourGraph import OrthogonalMoves, DiagonalMoves
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
+def NonConsecutivePairs(self, Edges):
+    
+    '''
+    The two cells of every edge are not consecutive: their difference is neither 1 nor -1.
+    '''
+    
+    Range = self.UpperBound - self.LowerBound
+    NotConsecutive = cp_model.Domain.FromIntervals([[-Range, -2], [0, 0], [2, Range]])
+    
+    for (i, j), (ni, nj) in Edges:
+        self.Model.AddLinearExpressionInDomain(self.Cells[i][j] - self.Cells[ni][nj], NotConsecutive)
+
 def DiagonalNonConsecConstraints(self):
         
     '''
@@ -6,15 +24,9 @@ def DiagonalNonConsecConstraints(self):
     '''
     
     # Add non-consecutive constraints
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            for di, dj in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:  # Diagonally adjacent cells
-                ni, nj = i + di, j + dj
-                if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] + 1)
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] - 1)
-    
-    print("Diagonal Non-Consecutive constraints added.")
+    self.NonConsecutivePairs(self.NeighbourEdges(DiagonalMoves))
+    
+    Log.debug("Diagonal Non-Consecutive constraints added.")
 
 def DiagonalNonConsecCells(self, cells):
     
@@ -22,12 +34,8 @@ def DiagonalNonConsecCells(self, cells):
     Diagonal Non-Consecutive Cells: Cells constrained such that none of the diagonally
     adjacent neighbours are consecutive
     '''
-    for i, j in cells:
-        for di, dj in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:  # Diagonally adjacent cells
-                ni, nj = i + di, j + dj
-                if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] + 1)
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] - 1)
+    cells = set(map(tuple, cells))
+    self.NonConsecutivePairs([Edge for Edge in self.NeighbourEdges(DiagonalMoves) if Edge[0] in cells or Edge[1] in cells])
 
 def OrthogonalNonConsecConstraints(self):
     
@@ -37,15 +45,9 @@ def OrthogonalNonConsecConstraints(self):
     '''
     
     # Add non-consecutive constraints
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # Orthogonally adjacent cells
-                ni, nj = i + di, j + dj
-                if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] + 1)
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] - 1)
-    
-    print("Orthogonal Non-Consecutive constraints added.")
+    self.NonConsecutivePairs(self.NeighbourEdges(OrthogonalMoves))
+    
+    Log.debug("Orthogonal Non-Consecutive constraints added.")
 
 def OrthogonalNonConsecCells(self, cells):
     
@@ -53,9 +55,5 @@ def OrthogonalNonConsecCells(self, cells):
     Orthogonal Non-Consecutive Cells: Cells constrained such that none of the orthogonally
     adjacent neighbours are consecutive
     '''
-    for i, j in cells:
-        for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]:  # Orthogonally adjacent cells
-                ni, nj = i + di, j + dj
-                if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] + 1)
-                    self.Model.Add(self.Cells[i][j] != self.Cells[ni][nj] - 1)
\ No newline at end of file
+    cells = set(map(tuple, cells))
+    self.NonConsecutivePairs([Edge for Edge in self.NeighbourEdges(OrthogonalMoves) if Edge[0] in cells or Edge[1] in cells])
\ No newline at end of file
@@ -1,3 +1,8 @@
+from OmniSolver.NeighbourGraph import KingMoves
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def RowCountConstraint(self, count=2):
         
     '''
@@ -35,7 +40,7 @@ def ClassicNoriNoriConstraints(self):
     self.GridCountConstraints()
     self.NoriNoriAdjacencyConstraint()
     
-    print("NoriNori Constraints Added!")
+    Log.debug("NoriNori Constraints Added!")
 
 def ClassicStarBattleConstraints(self, stars=2):
     
@@ -44,7 +49,7 @@ def ClassicStarBattleConstraints(self, stars=2):
     self.GridCountConstraints(stars)
     self.StarBattleAdjacencyConstraint()
     
-    print("Star Battle Constraints Added!")
+    Log.debug("Star Battle Constraints Added!")
 
 def GridCountConstraints(self, count=2):
     
@@ -52,22 +57,13 @@ def GridCountConstraints(self, count=2):
     Grid/Region Constraints. Every Region can only have x Norinori/Starbattle cells.
     '''
     
-    # First, find all the unique entries in the SubGridMap
-    UIDs = set()
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            if self.InputMatrix[i, j] not in UIDs:
-                UIDs.add(self.InputMatrix[i, j])
-    
-    # Remove 0 so that cells with 0 are not clubbed together as another group
-    if 0 in UIDs:
-        UIDs.remove(0)
+    # The regions are marked in the input matrix, without the cells marked 0
+    Regions = self.Regions(self.InputMatrix)
     
-    for entry in UIDs:
-        subgrid = [ self.Cells[i][j] for i in range(self.Rows) 
-                    for j in range(self.Cols) if entry == self.InputMatrix[i, j]]
+    for entry in Regions:
+        subgrid = Regions.Cells(self.Cells, entry)
         self.Model.Add(sum(subgrid) == count)
-        print(f"Custom Subgrid with UID {entry} added.")
+        Log.debug("Custom Subgrid with UID %s added.", entry)
     
     self.GridBoxBoundaryMaker()
 
@@ -86,16 +82,13 @@ def NoriNoriAdjacencyConstraint(self):
                 if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
                     Neighbours.append(self.Cells[ni][nj])
 
-            IsNoriNori = self.Model.NewBoolVar(f"cell_{i}_{j}_is_norinori")
-            
-            # Add equivalence for `self.Cells[i][j] == 1` to `is_norinori`
-            self.Model.Add(self.Cells[i][j] == 1).OnlyEnforceIf(IsNoriNori)
-            self.Model.Add(self.Cells[i][j] != 1).OnlyEnforceIf(IsNoriNori.Not())
+            # `self.Cells[i][j] == 1`, the cell is a NoriNori cell
+            IsNoriNori = self.ValueLiteral(i, j, 1)
 
             # If the cell is a NoriNori cell, enforce exactly one neighbor is a NoriNori cell
             self.Model.Add(sum(Neighbours) == 1).OnlyEnforceIf(IsNoriNori)
             
-    print("NoriNori Companion Cell Constraint Added")
+    Log.debug("NoriNori Companion Cell Constraint Added")
 
 def StarBattleAdjacencyConstraint(self):
     
@@ -104,30 +97,28 @@ def StarBattleAdjacencyConstraint(self):
     adjacent cells must be another star
     '''
     
-    # Define neighbour's moves
-    neighbour_moves = [
-        (-1, -1), (-1, 0), (-1, 1),
-        (0, -1),           (0, 1),
-        (1, -1), (1, 0), (1, 1)
-    ]
-
+    # With 0/1 cells, two adjacent cells cannot both be stars: one constraint per pair
+    if self.LowerBound == 0 and self.UpperBound == 1:
+        for (i, j), (ni, nj) in self.NeighbourEdges(KingMoves):
+            self.Model.Add(self.Cells[i][j] + self.Cells[ni][nj] <= 1)
+        
+        Log.debug("Star Battle Star Cell Constraint Added")
+        return
+    
     # Anti-king constraints
     for i in range(self.Rows):
         for j in range(self.Cols):
             Neighbours = []
-            for move in neighbour_moves:
+            for move in KingMoves:
                 ni, nj = i + move[0], j + move[1]
                 if 0 <= ni < self.Rows and 0 <= nj < self.Cols:
                     Neighbours.append(self.Cells[ni][nj])
 
-            IsStar = self.Model.NewBoolVar(f"cell_{i}_{j}_is_star")
-            
-            # Add equivalence for `self.Cells[i][j] == 1` to `is_star`
-            self.Model.Add(self.Cells[i][j] == 1).OnlyEnforceIf(IsStar)
-            self.Model.Add(self.Cells[i][j] != 1).OnlyEnforceIf(IsStar.Not())
+            # `self.Cells[i][j] == 1`, the cell is a star
+            IsStar = self.ValueLiteral(i, j, 1)
 
             # If the cell is a star cell, enforce none of the neighbours (orthogonal and adjacent)
             # are stars
             self.Model.Add(sum(Neighbours) == 0).OnlyEnforceIf(IsStar)
             
-    print("Star Battle Star Cell Constraint Added")
+    Log.debug("Star Battle Star Cell Constraint Added")
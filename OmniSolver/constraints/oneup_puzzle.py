@@ -1,12 +1,16 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def OneUpRowConstraints(self, RowGroupMap):
         
     # Collect all the  unique row-groups across the puzzle
     # Mark group of cells that are to be ignored as 0 in the UID
-    UIDs = set([RowGroupMap[i, j] for i in range(self.Rows) for j in range(self.Cols)]) - {0}
-    for UID in UIDs:
+    Groups = self.Regions(RowGroupMap)
+    for UID in Groups:
         
         # Collect all the cells in each group marked by a UID
-        Cells = [self.Cells[i][j] for i in range(self.Rows) for j in range(self.Cols) if RowGroupMap[i, j] == UID]
+        Cells = Groups.Cells(self.Cells, UID)
         
         # Say that all the entries in a group must be different
         self.Model.AddAllDifferent(Cells)
@@ -15,19 +19,19 @@ def OneUpRowConstraints(self, RowGroupMap):
         # must be the number of cells in the group and all cells
         # must be less than or equal to this number.
         for Cell in Cells:
-            self.Model.Add(Cell <= len(Cells))
+            self.RestrictCellValues(Cell, range(self.LowerBound, len(Cells) + 1))
         
-    print("One-up Row Groups Added!")
+    Log.debug("One-up Row Groups Added!")
 
 def OneUpColConstraints(self, ColGroupMap):
     
     # Collect all the  unique column-groups across the puzzle
     # Mark group of cells that are to be ignored as 0 in the UID
-    UIDs = set([ColGroupMap[i, j] for i in range(self.Rows) for j in range(self.Cols)]) - {0}
-    for UID in UIDs:
+    Groups = self.Regions(ColGroupMap)
+    for UID in Groups:
         
         # Collect all the cells in each group marked by a UID
-        Cells = [self.Cells[i][j] for i in range(self.Rows) for j in range(self.Cols) if ColGroupMap[i, j] == UID]
+        Cells = Groups.Cells(self.Cells, UID)
         
         # Say that all the entries in a group must be different
         self.Model.AddAllDifferent(Cells)
@@ -36,9 +40,9 @@ def OneUpColConstraints(self, ColGroupMap):
         # must be the number of cells in the group and all cells
         # must be less than or equal to this number.
         for Cell in Cells:
-            self.Model.Add(Cell <= len(Cells))
+            self.RestrictCellValues(Cell, range(self.LowerBound, len(Cells) + 1))
         
-    print("One-up Row Groups Added!")
+    Log.debug("One-up Row Groups Added!")
 
 def ClassicOneUpConstraints(self, RowGroups, ColGroups):
     
@@ -46,4 +50,4 @@ def ClassicOneUpConstraints(self, RowGroups, ColGroups):
     self.OneUpRowConstraints(RowGroups)
     self.InitializeGivenEntries()
     
-    print("One-up All Constraints Added!")
\ No newline at end of file
+    Log.debug("One-up All Constraints Added!")
\ No newline at end of file
@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def RatioPairs(self, numerators, denominators, pairs):
     """
     Adds constraints to enforce specific ratios between pairs of cells in either direction.
@@ -24,12 +28,12 @@ def RatioPairs(self, numerators, denominators, pairs):
         cell2 = self.Cells[row2][col2]
 
         # Debug information
-        print(f"Adding ratio constraint {idx + 1}: "
-            f"Cell ({row1}, {col1}) and Cell ({row2}, {col2}) with ratio {numerator}/{denominator}")
+        Log.debug("Adding ratio constraint %s: Cell (%s, %s) and Cell (%s, %s) with ratio %s/%s",
+                  idx + 1, row1, col1, row2, col2, numerator, denominator)
         
         # Create boolean variables for the two possible conditions
-        condition1 = self.Model.NewBoolVar(f"condition1_ratio_{idx}")
-        condition2 = self.Model.NewBoolVar(f"condition2_ratio_{idx}")
+        condition1 = self.Model.NewBoolVar(self.VarName("condition1_ratio_{}", idx))
+        condition2 = self.Model.NewBoolVar(self.VarName("condition2_ratio_{}", idx))
 
         # Add ratio constraints for both conditions
         self.Model.Add(numerator * cell2 == denominator * cell1).OnlyEnforceIf(condition1)
@@ -39,8 +43,8 @@ def RatioPairs(self, numerators, denominators, pairs):
         self.Model.AddBoolOr([condition1, condition2])
 
         # Debug each condition explicitly
-        print(f"Condition 1: {numerator} * Cell({row2}, {col2}) == {denominator} * Cell({row1}, {col1})")
-        print(f"Condition 2: {numerator} * Cell({row1}, {col1}) == {denominator} * Cell({row2}, {col2})")
+        Log.debug("Condition 1: %s * Cell(%s, %s) == %s * Cell(%s, %s)", numerator, row2, col2, denominator, row1, col1)
+        Log.debug("Condition 2: %s * Cell(%s, %s) == %s * Cell(%s, %s)", numerator, row1, col1, denominator, row2, col2)
 
 def DifferencePairs(self, differences, pairs):
     """
@@ -65,12 +69,12 @@ def DifferencePairs(self, differences, pairs):
         cell2 = self.Cells[row2][col2]
 
         # Debug information
-        print(f"Adding Difference constraint {idx + 1}: "
-            f"|Cell ({row1}, {col1}) - Cell ({row2}, {col2}) = {difference}|")
+        Log.debug("Adding Difference constraint %s: |Cell (%s, %s) - Cell (%s, %s) = %s|",
+                  idx + 1, row1, col1, row2, col2, difference)
         
         # Create boolean variables for the two possible conditions
-        condition1 = self.Model.NewBoolVar(f"condition1_difference_{idx}")
-        condition2 = self.Model.NewBoolVar(f"condition2_difference_{idx}")
+        condition1 = self.Model.NewBoolVar(self.VarName("condition1_difference_{}", idx))
+        condition2 = self.Model.NewBoolVar(self.VarName("condition2_difference_{}", idx))
 
         # Add enforce constraints for both conditions
         self.Model.Add(cell1 - cell2 == difference).OnlyEnforceIf(condition1)
@@ -79,7 +83,7 @@ def DifferencePairs(self, differences, pairs):
         # At least one of the conditions must hold
         self.Model.AddBoolOr([condition1, condition2])
 
-    print(f"Total {len(pairs)} difference constraints added.")
+    Log.debug("Total %s difference constraints added.", len(pairs))
 
 def AdditionPairs(self, sums, pairs):
     """
@@ -104,9 +108,9 @@ def AdditionPairs(self, sums, pairs):
         # Add enforce constraint for the condition
         self.Model.Add(cell1 + cell2 == addition)
         
-        print(f"Addition constraint {idx + 1} for {(row1, col1)} + {(row2, col2)} = {addition} added.")
+        Log.debug("Addition constraint %s for %s + %s = %s added.", idx + 1, (row1, col1), (row2, col2), addition)
 
-    print(f"Total {len(pairs)} addition pair constraints added.")
+    Log.debug("Total %s addition pair constraints added.", len(pairs))
 
 def MultiAdditionPairs(self, sums, pairs):
     
@@ -123,7 +127,7 @@ def MultiAdditionPairs(self, sums, pairs):
         # For each possible sum the pair can have, create a boolean that checks if the addition is valid
         Addition_Conditions = []
         for addition_sum in addition_sums:
-            condition = self.Model.NewBoolVar(f"Multi_Addition_Sum_{addition_sum}_{idx}")
+            condition = self.Model.NewBoolVar(self.VarName("Multi_Addition_Sum_{}_{}", addition_sum, idx))
             # Add enforce constraint for the condition
             self.Model.Add(cell1 + cell2 == addition_sum).OnlyEnforceIf(condition)
             Addition_Conditions.append(condition)
@@ -131,7 +135,7 @@ def MultiAdditionPairs(self, sums, pairs):
         # Ensure that the sums of the cells matches exactly one sum
         self.Model.AddBoolOr(Addition_Conditions)
 
-    print(f"Total {len(pairs)} Multi-Addition-Sum constraints added.")  
+    Log.debug("Total %s Multi-Addition-Sum constraints added.", len(pairs))
     
 def RatioPairsOrDifferencePairs(self, numerators, denominators, differences, pairs):
     
@@ -152,20 +156,20 @@ def RatioPairsOrDifferencePairs(self, numerators, denominators, differences, pai
         cell2 = self.Cells[row2][col2]
 
         # Debug information
-        print(f"Adding Difference constraint {idx + 1}: "
-            f"|Cell ({row1}, {col1}) - Cell ({row2}, {col2}) = {difference}|")
+        Log.debug("Adding Difference constraint %s: |Cell (%s, %s) - Cell (%s, %s) = %s|",
+                  idx + 1, row1, col1, row2, col2, difference)
         
         # Create boolean variables for the two possible conditions
-        condition1 = self.Model.NewBoolVar(f"condition1_difference_{idx}")
-        condition2 = self.Model.NewBoolVar(f"condition2_difference_{idx}")
+        condition1 = self.Model.NewBoolVar(self.VarName("condition1_difference_{}", idx))
+        condition2 = self.Model.NewBoolVar(self.VarName("condition2_difference_{}", idx))
 
         # Add enforce constraints for both conditions
         self.Model.Add(cell1 - cell2 == difference).OnlyEnforceIf(condition1)
         self.Model.Add(cell2 - cell1 == difference).OnlyEnforceIf(condition2)
         
         # Create boolean variables for the two possible conditions
-        condition3 = self.Model.NewBoolVar(f"condition1_ratio_{idx}")
-        condition4 = self.Model.NewBoolVar(f"condition2_ratio_{idx}")
+        condition3 = self.Model.NewBoolVar(self.VarName("condition1_ratio_{}", idx))
+        condition4 = self.Model.NewBoolVar(self.VarName("condition2_ratio_{}", idx))
 
         # Add enforce constraints for both conditions
         self.Model.Add(numerator * cell2 == denominator * cell1).OnlyEnforceIf(condition3)
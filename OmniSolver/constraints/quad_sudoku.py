@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def QuadsConstraints(self, QuadsIDs, QuadsVals):
     '''
     Quadruple or Quad sudoku. Upto 4 given numbers must be present atleast once in the quaduple
@@ -18,11 +22,8 @@ def QuadsConstraints(self, QuadsIDs, QuadsVals):
             ValInQuad_list = []
             # Take a value and check if it is present in a cell.
             for i, j in quads:
-                ValInQuad = self.Model.NewBoolVar(f"val_{val}_in_{i}_{j}_{k}")
-                self.Model.Add(self.Cells[i][j] == val).OnlyEnforceIf(ValInQuad)
-                self.Model.Add(self.Cells[i][j] != val).OnlyEnforceIf(ValInQuad.Not())
-                ValInQuad_list.append(ValInQuad)
+                ValInQuad_list.append(self.ValueLiteral(i, j, val))
             # the given value must be present in atleast 1 cell
             self.Model.AddBoolOr(ValInQuad_list)
                 
-    print("Quad/Quadruple Sudoku Constraints added")
+    Log.debug("Quad/Quadruple Sudoku Constraints added")
@@ -1,3 +1,8 @@
+from OmniSolver.SumCombinations import AddCageSum
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def RegionSumConstraints(self, RegionSums, RegionMap, RegionUniqueness):
         
     '''
@@ -9,25 +14,14 @@ def RegionSumConstraints(self, RegionSums, RegionMap, RegionUniqueness):
     eg: https://www.youtube.com/watch?v=Bhczfz8WGik
     '''
     
-    # First, find all the unique entries in the Killer Cage Map
-    UIDs = set()
-    for i in range(self.Rows):
-        for j in range(self.Cols):
-            if RegionMap[i, j] not in UIDs:
-                UIDs.add(RegionMap[i, j])
-    
-    # Remove 0 so that cells with 0 are not clubbed together as another group
-    if 0 in UIDs:
-        UIDs.remove(0)
+    # The regions of the map in the order of their IDs, so that they line up with the sums.
+    # Cells with 0 are not clubbed together as another region.
+    Regions = self.Regions(RegionMap)
         
-    for (entry, region_sum, region_uniqueness) in zip(UIDs, RegionSums,
+    for (entry, region_sum, region_uniqueness) in zip(Regions, RegionSums,
                                                                 RegionUniqueness):
         
-        region = [ self.Cells[i][j] for i in range(self.Rows) 
-                    for j in range(self.Cols) if entry == RegionMap[i, j]]
-        
-        regionIDs = [(i, j) for i in range(self.Rows) 
-                    for j in range(self.Cols) if entry == RegionMap[i, j]]
+        region = Regions.Cells(self.Cells, entry)
         
         # Constraint saying the cells are unique - 1 means unique
         if region_uniqueness == 1:
@@ -37,6 +31,7 @@ def RegionSumConstraints(self, RegionSums, RegionMap, RegionUniqueness):
         # -1 implies cage sum is not given.
         if region_sum != -1:
             # Constraint equating the sum of the cells
-            self.Model.Add(sum(region) == region_sum)
+            AddCageSum(self.Model, region, region_sum, self.LowerBound, self.UpperBound,
+                       Unique=region_uniqueness == 1)
         
-        print(f"Custom Region with UID {entry} added.")
+        Log.debug("Custom Region with UID %s added.", entry)
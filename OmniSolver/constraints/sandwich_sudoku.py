@@ -1,5 +1,100 @@
-def SandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9):
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
+def SandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9, Encoding="compact"):
+    
+    """
+    Sandwich Sudoku. The clue of a row/column is the sum of the digits between its
+    LowNumber and its HighNumber.
+    
+    Args:
+        RowSums (list): Clue of each row, None for rows without a clue.
+        ColSums (list): Clue of each column, None for columns without a clue.
+        LowNumber (int): Digit on one side of the sandwich.
+        HighNumber (int): Digit on the other side of the sandwich.
+        Encoding (str): "compact" adds O(N) literals per clue. "pairwise" is the original
+                        encoding with a condition for every pair of end cells, O(N^2) per clue.
+    """
+    
+    if Encoding == "compact":
+        CompactSandwichConstraints(self, RowSums, ColSums, LowNumber, HighNumber)
+    elif Encoding == "pairwise":
+        PairwiseSandwichConstraints(self, RowSums, ColSums, LowNumber, HighNumber)
+    else:
+        raise ValueError(f"Unknown sandwich encoding {Encoding}. Use compact or pairwise")
+
+def CompactSandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9):
+    
+    """
+    Sandwich constraints with O(N) literals per clue. Each line holds exactly one LowNumber
+    and one HighNumber, so walking along the line, the sandwich is open after the first of
+    them and closed again after the second. Open[p] = Open[p - 1] XOR (cell p is LowNumber or
+    HighNumber), and a cell is inside the sandwich when the sandwich is open on both sides of
+    it. The clue is the sum of the cells inside.
+    
+    The (cell == LowNumber/HighNumber) literals are the shared ValueLiterals of the solver.
+    """
+    
+    def AddSandwich(Positions, Clue, Name):
+        
+        Lows = [self.ValueLiteral(i, j, LowNumber) for i, j in Positions]
+        Highs = [self.ValueLiteral(i, j, HighNumber) for i, j in Positions]
+        
+        self.Model.AddExactlyOne(Lows)
+        self.Model.AddExactlyOne(Highs)
+        
+        Contributions = []
+        Previous = None
+        
+        for p, (i, j) in enumerate(Positions):
+            
+            Open = self.Model.NewBoolVar(self.VarName("SandwichOpen_{}_{}", Name, p))
+            
+            if Previous is None:
+                self.Model.AddBoolOr([Lows[p], Highs[p]]).OnlyEnforceIf(Open)
+                self.Model.AddImplication(Lows[p], Open)
+                self.Model.AddImplication(Highs[p], Open)
+            else:
+                # Low and high are never the same cell, so this is Open[p - 1] XOR Low XOR High
+                self.Model.AddBoolXOr([Previous, Lows[p], Highs[p], Open.Not()])
+                
+                # A cell is inside the sandwich when it is open on both sides of it
+                Inside = self.Model.NewBoolVar(self.VarName("SandwichInside_{}_{}", Name, p))
+                self.Model.AddBoolAnd([Previous, Open]).OnlyEnforceIf(Inside)
+                self.Model.AddBoolOr([Previous.Not(), Open.Not()]).OnlyEnforceIf(Inside.Not())
+                
+                Contribution = self.Model.NewIntVar(
+                    min(self.LowerBound, 0), max(self.UpperBound, 0), self.VarName("SandwichValue_{}_{}", Name, p)
+                )
+                self.Model.Add(Contribution == self.Cells[i][j]).OnlyEnforceIf(Inside)
+                self.Model.Add(Contribution == 0).OnlyEnforceIf(Inside.Not())
+                Contributions.append(Contribution)
             
+            Previous = Open
+        
+        # Both ends are seen by the end of the line
+        self.Model.Add(Previous == 0)
+        self.Model.Add(sum(Contributions) == Clue)
+    
+    for i, RowSum in enumerate(RowSums):
+        
+        if RowSum is None:
+            continue
+        
+        AddSandwich([(i, j) for j in range(self.Cols)], RowSum, f"Row{i}")
+        Log.debug("Sandwich Row Condition for Row %s with sum %s added", i, RowSum)
+    
+    for j, ColSum in enumerate(ColSums):
+        
+        if ColSum is None:
+            continue
+        
+        AddSandwich([(i, j) for i in range(self.Rows)], ColSum, f"Col{j}")
+        Log.debug("Sandwich Column Condition for Column %s with sum %s added", j, ColSum)
+
+def PairwiseSandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9):
+    
     # Sandwich constraints along a Row
     # Scan through each row one-by-one
     for i, RowSum in enumerate(RowSums):
@@ -12,47 +107,31 @@ def SandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9):
         # Scan left-to-right for the left cell containing LowNumber/HighNumber
         for j in range(self.Cols - 1):
             
-            LeftCell = self.Cells[i][j]
-            
-            # Condition to see if the left cell is a high value in cell (i,j)
-            LeftCellHighCondition = self.Model.NewBoolVar(f"SandwichLeftValHigh_Row_{i}_{j}")
-            
-            # Condition to see if the left cell is a low value in cell (i,j)
-            LeftCellLowCondition = self.Model.NewBoolVar(f"SandwichLeftValLow_Row_{i}_{j}")
-            
-            # Only enforce this if the left cell is a high/Low value
-            self.Model.Add(LeftCell == HighNumber).OnlyEnforceIf(LeftCellHighCondition)
-            self.Model.Add(LeftCell == LowNumber).OnlyEnforceIf(LeftCellLowCondition)
+            # Conditions to see if the left cell is a high/low value (shared literals)
+            LeftCellHighCondition = self.ValueLiteral(i, j, HighNumber)
+            LeftCellLowCondition = self.ValueLiteral(i, j, LowNumber)
             
             # Scan left-to-right for the right cell containing LowNumber/HighNumber
             for k in range(j + 1, self.Cols):
                 
-                RightCell = self.Cells[i][k]
-            
-                # Condition to see if the right cell is a high value in cell (i,j)
-                RightCellHighCondition = self.Model.NewBoolVar(f"SandwichRightValHigh_Row_{i}_{k}")
-                
-                # Condition to see if the right cell is a low value in cell (i,j)
-                RightCellLowCondition = self.Model.NewBoolVar(f"SandwichRightValLow_Row_{i}_{k}")
-                
-                # Only enforce this if the right cell is a high/Low value
-                self.Model.Add(RightCell == HighNumber).OnlyEnforceIf(RightCellHighCondition)
-                self.Model.Add(RightCell == LowNumber).OnlyEnforceIf(RightCellLowCondition)
+                # Conditions to see if the right cell is a high/low value (shared literals)
+                RightCellHighCondition = self.ValueLiteral(i, k, HighNumber)
+                RightCellLowCondition = self.ValueLiteral(i, k, LowNumber)
                 
                 # Add all the cells inbetween the potential low-high cells
                 CellsBetween = self.Cells[i][j+1:k]
                 
                 # Boolean to keep track of sandwich sum
-                SandwichSumCondition = self.Model.NewBoolVar(f"SandwichCondition_Row_{i}_{j}_{k}")
+                SandwichSumCondition = self.Model.NewBoolVar(self.VarName("SandwichCondition_Row_{}_{}_{}", i, j, k))
 
                 # Enforce that sum of numbers between the bounds equals RowSum
                 self.Model.Add(sum(CellsBetween) == RowSum).OnlyEnforceIf(SandwichSumCondition)
                 
                 # Define conditions for the SandwichSumCondition
-                LeftLow_RightHigh = self.Model.NewBoolVar(f"LeftLow_RightHigh_Row_{i}_{j}_{k}")
+                LeftLow_RightHigh = self.Model.NewBoolVar(self.VarName("LeftLow_RightHigh_Row_{}_{}_{}", i, j, k))
                 self.Model.AddBoolAnd([LeftCellLowCondition, RightCellHighCondition]).OnlyEnforceIf(LeftLow_RightHigh)
 
-                LeftHigh_RightLow = self.Model.NewBoolVar(f"LeftHigh_RightLow_Row_{i}_{j}_{k}")
+                LeftHigh_RightLow = self.Model.NewBoolVar(self.VarName("LeftHigh_RightLow_Row_{}_{}_{}", i, j, k))
                 self.Model.AddBoolAnd([LeftCellHighCondition, RightCellLowCondition]).OnlyEnforceIf(LeftHigh_RightLow)
                 
                 # Combine both into the SandwichSumCondition
@@ -64,7 +143,7 @@ def SandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9):
         # Among all the permutations possible, atleast one condition must be true
         self.Model.AddBoolOr(MasterConditions)
         
-        print(f"Sandwich Row Condition for Row {i} with sum {RowSum} added")
+        Log.debug("Sandwich Row Condition for Row %s with sum %s added", i, RowSum)
     
     # Scan through each column one-by-one
     for i, ColSum in enumerate(ColSums):
@@ -77,47 +156,31 @@ def SandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9):
         # Scan top-to-bottom for the top cell containing LowNumber/HighNumber
         for j in range(self.Rows - 1):
             
-            TopCell = self.Cells[j][i]
-            
-            # Condition to see if the Top cell is a high value in cell (j,i)
-            TopCellHighCondition = self.Model.NewBoolVar(f"SandwichTopValHigh_Col_{j}_{i}")
-            
-            # Condition to see if the Top cell is a low value in cell (j,i)
-            TopCellLowCondition = self.Model.NewBoolVar(f"SandwichTopValLow_Col_{j}_{i}")
-            
-            # Only enforce this if the top cell is a high/Low value
-            self.Model.Add(TopCell == HighNumber).OnlyEnforceIf(TopCellHighCondition)
-            self.Model.Add(TopCell == LowNumber).OnlyEnforceIf(TopCellLowCondition)
+            # Conditions to see if the top cell is a high/low value (shared literals)
+            TopCellHighCondition = self.ValueLiteral(j, i, HighNumber)
+            TopCellLowCondition = self.ValueLiteral(j, i, LowNumber)
             
             # Scan top-to-bottom for the bottom cell containing LowNumber/HighNumber
             for k in range(j + 1, self.Rows):
                 
-                BottomCell = self.Cells[k][i]
-            
-                # Condition to see if the bottom cell is a high value in cell (k,i)
-                BottomCellHighCondition = self.Model.NewBoolVar(f"SandwichBottomValHigh_Col_{k}_{i}")
-                
-                # Condition to see if the bottom cell is a low value in cell (k,i)
-                BottomCellLowCondition = self.Model.NewBoolVar(f"SandwichBottomValLow_Col_{k}_{i}")
-                
-                # Only enforce this if the bottom cell is a high/Low value
-                self.Model.Add(BottomCell == HighNumber).OnlyEnforceIf(BottomCellHighCondition)
-                self.Model.Add(BottomCell == LowNumber).OnlyEnforceIf(BottomCellLowCondition)
+                # Conditions to see if the bottom cell is a high/low value (shared literals)
+                BottomCellHighCondition = self.ValueLiteral(k, i, HighNumber)
+                BottomCellLowCondition = self.ValueLiteral(k, i, LowNumber)
                 
                 # Add all the cells inbetween the potential low-high cells
                 CellsBetween = [self.Cells[row][i] for row in range(j+1, k)]
                 
                 # Boolean to keep track of sandwich sum
-                SandwichSumCondition = self.Model.NewBoolVar(f"SandwichCondition_Col_{i}_{j}_{k}")
+                SandwichSumCondition = self.Model.NewBoolVar(self.VarName("SandwichCondition_Col_{}_{}_{}", i, j, k))
 
                 # Enforce that sum of numbers between the bounds equals RowSum
                 self.Model.Add(sum(CellsBetween) == ColSum).OnlyEnforceIf(SandwichSumCondition)
                 
                 # Define conditions for the SandwichSumCondition
-                TopLow_BottomHigh = self.Model.NewBoolVar(f"TopLow_BottomHigh_Col_{i}_{j}_{k}")
+                TopLow_BottomHigh = self.Model.NewBoolVar(self.VarName("TopLow_BottomHigh_Col_{}_{}_{}", i, j, k))
                 self.Model.AddBoolAnd([TopCellLowCondition, BottomCellHighCondition]).OnlyEnforceIf(TopLow_BottomHigh)
 
-                TopHigh_BottomLow = self.Model.NewBoolVar(f"TopHigh_BottomLow_Col_{i}_{j}_{k}")
+                TopHigh_BottomLow = self.Model.NewBoolVar(self.VarName("TopHigh_BottomLow_Col_{}_{}_{}", i, j, k))
                 self.Model.AddBoolAnd([TopCellHighCondition, BottomCellLowCondition]).OnlyEnforceIf(TopHigh_BottomLow)
                 
                 # Combine both into the SandwichSumCondition
@@ -129,4 +192,4 @@ def SandwichConstraints(self, RowSums, ColSums, LowNumber=1, HighNumber=9):
         # Among all the permutations possible, atleast one condition must be true
         self.Model.AddBoolOr(MasterConditions)
         
-        print(f"Sandwich Column Condition for Column {i} with sum {ColSum} added")
+        Log.debug("Sandwich Column Condition for Column %s with sum %s added", i, ColSum)
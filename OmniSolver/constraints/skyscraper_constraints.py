@@ -1,10 +1,177 @@
-def SkyscraperConstraints(self, LeftSkyScrapers=None, RightSkyScrapers=None, TopSkyScrapers=None, BottomSkyScrapers=None):
+import itertools
+from functools import lru_cache
+import SolverConfig
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
+def SkyscraperConstraints(self, LeftSkyScrapers=None, RightSkyScrapers=None, TopSkyScrapers=None, BottomSkyScrapers=None, Encoding="auto"):
     """
     Apply skyscraper constraints for all edges (left, right, top, bottom).
     :param LeftSkyScrapers: Clues for the left side of rows.
     :param RightSkyScrapers: Clues for the right side of rows.
     :param TopSkyScrapers: Clues for the top side of columns.
     :param BottomSkyScrapers: Clues for the bottom side of columns.
+    :param Encoding: "table" allows only the permutations of a line that satisfy its two clues,
+                     "chain" counts the visible cells along a running maximum, O(N) per clue.
+                     "auto" uses the table for lines of up to SOLVER_SKYSCRAPER_TABLE_MAX_ORDER
+                     cells and the chain above. "pairwise" is the original encoding, with a
+                     maximum over every prefix of the line, O(N^2) per clue.
+    
+    The table only holds permutations, so it is only used for the lines that are already
+    all different (a row or column of the AllDifferentMaps, eg: added by LatinSquares or
+    ClassicSudokuConstraints before this call). The other lines use the chain, with
+    either encoding.
+    """
+    
+    if Encoding not in ("auto", "table", "chain", "pairwise"):
+        raise ValueError(f"Unknown skyscraper encoding {Encoding}. Use auto, table, chain or pairwise")
+    
+    # A table has N! rows to build for a line of N cells
+    if Encoding == "table" and max(self.Rows, self.Cols) > SolverConfig.SOLVER_SKYSCRAPER_TABLE_MAX_ORDER:
+        raise ValueError(f"The table encoding handles lines of upto {SolverConfig.SOLVER_SKYSCRAPER_TABLE_MAX_ORDER} "
+                         "cells (SOLVER_SKYSCRAPER_TABLE_MAX_ORDER). Use auto or chain")
+    
+    if Encoding == "pairwise":
+        PairwiseSkyscraperConstraints(self, LeftSkyScrapers, RightSkyScrapers, TopSkyScrapers, BottomSkyScrapers)
+        return
+    
+    if TopSkyScrapers is not None:
+        self.TopRowNums = TopSkyScrapers
+    if BottomSkyScrapers is not None:
+        self.BottomRowNums = BottomSkyScrapers
+    if LeftSkyScrapers is not None:
+        self.LeftColumnNums = LeftSkyScrapers
+    if RightSkyScrapers is not None:
+        self.RightColumnNums = RightSkyScrapers
+    
+    Values = tuple(range(self.LowerBound, self.UpperBound + 1))
+    
+    def ApplyLine(Positions, Front, Back, Name):
+        
+        if Front is None and Back is None:
+            return
+        
+        Line = [self.Cells[i][j] for i, j in Positions]
+        
+        # The table assumes the line is a permutation of the digits
+        UseTable = (
+            Encoding in ("table", "auto") and len(Line) <= SolverConfig.SOLVER_SKYSCRAPER_TABLE_MAX_ORDER
+            and len(Line) == len(Values) and _AllDifferentLine(self, Positions)
+        )
+        
+        if UseTable:
+            Table = SkyscraperTable(Values, Front, Back)
+            Log.debug("Skyscraper line %s: %d allowed permutation(s)", Name, len(Table))
+            self.Model.AddAllowedAssignments(Line, Table)
+            return
+        
+        if Front is not None:
+            SkyscraperChain(self, Line, Front, f"{Name}_front")
+        if Back is not None:
+            SkyscraperChain(self, Line[::-1], Back, f"{Name}_back")
+    
+    for i in range(self.Rows):
+        ApplyLine(
+            [(i, j) for j in range(self.Cols)],
+            LeftSkyScrapers[i] if LeftSkyScrapers is not None else None,
+            RightSkyScrapers[i] if RightSkyScrapers is not None else None,
+            f"row{i}"
+        )
+    
+    for j in range(self.Cols):
+        ApplyLine(
+            [(i, j) for i in range(self.Rows)],
+            TopSkyScrapers[j] if TopSkyScrapers is not None else None,
+            BottomSkyScrapers[j] if BottomSkyScrapers is not None else None,
+            f"col{j}"
+        )
+
+def SkyscraperChain(self, Line, Clue, Name):
+    
+    """
+    Exactly Clue cells of the line are visible from its start. Peak[j] is the tallest cell in
+    Line[:j+1], built from Peak[j - 1] and Line[j] alone, and a cell is visible when it is at
+    least as tall as every cell before it.
+    """
+    
+    MaxDigit = self.FullOrder
+    
+    # The first cell hides at least Clue - 1 taller ones and the tallest cannot be before Clue - 1
+    self.RestrictCellValues(Line[0], range(self.LowerBound, MaxDigit - Clue + 2))
+    for j in range(min(Clue - 1, len(Line))):
+        self.RestrictCellValues(Line[j], [Value for Value in range(self.LowerBound, self.UpperBound + 1) if Value != MaxDigit])
+    
+    Visible = [1]
+    Peak = Line[0]
+    
+    for j in range(1, len(Line)):
+        
+        IsVisible = self.Model.NewBoolVar(self.VarName("SkyscraperVisible_{}_{}", Name, j))
+        self.Model.Add(Line[j] >= Peak).OnlyEnforceIf(IsVisible)
+        self.Model.Add(Line[j] < Peak).OnlyEnforceIf(IsVisible.Not())
+        Visible.append(IsVisible)
+        
+        if j < len(Line) - 1:
+            NextPeak = self.Model.NewIntVar(self.LowerBound, self.UpperBound, self.VarName("SkyscraperPeak_{}_{}", Name, j))
+            self.Model.AddMaxEquality(NextPeak, [Peak, Line[j]])
+            Peak = NextPeak
+    
+    self.Model.Add(sum(Visible) == Clue)
+
+def _AllDifferentLine(self, Positions):
+    
+    """
+    Whether the cells at Positions are all in one region of an AllDifferent group map.
+    """
+    
+    for Map in self.AllDifferentMaps:
+        Regions = {int(Map[i, j]) for i, j in Positions}
+        if len(Regions) == 1 and 0 not in Regions:
+            return True
+    
+    return False
+
+# Only lines of upto SOLVER_SKYSCRAPER_TABLE_MAX_ORDER cells get here, usually of one or two sizes
+@lru_cache(maxsize=4)
+def _VisibleCounts(Values):
+    
+    """
+    Every permutation of Values with the number of cells visible from its start and its end.
+    """
+    
+    def Visible(Permutation):
+        
+        Count, Peak = 0, None
+        for Value in Permutation:
+            if Peak is None or Value > Peak:
+                Count, Peak = Count + 1, Value
+        
+        return Count
+    
+    return [(Permutation, Visible(Permutation), Visible(Permutation[::-1])) for Permutation in itertools.permutations(Values)]
+
+@lru_cache(maxsize=256)
+def SkyscraperTable(Values, Front, Back):
+    
+    """
+    The permutations of Values with Front cells visible from the start and Back from the end
+    (None for no clue). Cached for the life of the process, so every request with the same
+    clue pair reuses the table.
+    """
+    
+    return [
+        list(Permutation) for Permutation, FrontCount, BackCount in _VisibleCounts(Values)
+        if (Front is None or FrontCount == Front) and (Back is None or BackCount == Back)
+    ]
+
+def PairwiseSkyscraperConstraints(self, LeftSkyScrapers=None, RightSkyScrapers=None, TopSkyScrapers=None, BottomSkyScrapers=None):
+    """
+    Skyscraper constraints with a maximum over every prefix of the line, O(N^2) per clue.
+    :param LeftSkyScrapers: Clues for the left side of rows.
+    :param RightSkyScrapers: Clues for the right side of rows.
+    :param TopSkyScrapers: Clues for the top side of columns.
+    :param BottomSkyScrapers: Clues for the bottom side of columns.
     """
 
     def apply_constraints(clues, is_row, reverse=False, direction=""):
@@ -20,9 +187,10 @@ def SkyscraperConstraints(self, LeftSkyScrapers=None, RightSkyScrapers=None, Top
                 continue
 
             # Define the line of cells
-            line = self.Cells[i] if is_row else [self.Cells[j][i] for j in range(self.Rows)]
+            positions = [(i, j) for j in range(self.Cols)] if is_row else [(j, i) for j in range(self.Rows)]
             if reverse:
-                line = line[::-1]
+                positions = positions[::-1]
+            line = [self.Cells[r][c] for r, c in positions]
 
             size = len(line)
             MaxDigit = self.FullOrder
@@ -30,27 +198,20 @@ def SkyscraperConstraints(self, LeftSkyScrapers=None, RightSkyScrapers=None, Top
             # Constraint 1: Upper bound on the first cell
             self.Model.Add(line[0] <= MaxDigit - v + 1)
 
-            # Constraint 2: MaxDigit must appear in positions [v-1, size-1]
-            is_max_digit = [self.Model.NewBoolVar(f'is_max_digit_{direction}_{i}_{j}') for j in range(size)]
-            for j in range(size):
-                if j < v - 1 or j >= size:
-                    # Positions outside the valid range cannot be MaxDigit
-                    self.Model.Add(is_max_digit[j] == 0)
-                else:
-                    # Enforce that line[j] == MaxDigit only when is_max_digit[j] is true
-                    self.Model.Add(line[j] == MaxDigit).OnlyEnforceIf(is_max_digit[j])
-                    self.Model.Add(line[j] != MaxDigit).OnlyEnforceIf(is_max_digit[j].Not())
+            # Constraint 2: MaxDigit must appear in positions [v-1, size-1]. The literals of
+            # line[j] == MaxDigit are shared with the clue on the other side of the line.
+            is_max_digit = [self.ValueLiteral(r, c, MaxDigit) for r, c in positions[v - 1:]]
 
             # Ensure exactly one MaxDigit position is true
             self.Model.Add(sum(is_max_digit) == 1)
 
             # Constraint 3: Enforce visibility using AddMaxEquality
-            is_peak = [self.Model.NewBoolVar(f'is_peak_{direction}_{i}_{j}') for j in range(size)]
+            is_peak = [self.Model.NewBoolVar(self.VarName('is_peak_{}_{}_{}', direction, i, j)) for j in range(size)]
             self.Model.Add(is_peak[0] == 1)  # First skyscraper is always visible
 
             for j in range(1, size):
                 # max_peak_in_direction[j] represents the max height in line[:j+1]
-                max_peak_in_direction = self.Model.NewIntVar(1, MaxDigit, f'max_peak_in_direction_{direction}_{i}_{j}')
+                max_peak_in_direction = self.Model.NewIntVar(1, MaxDigit, self.VarName('max_peak_in_direction_{}_{}_{}', direction, i, j))
                 self.Model.AddMaxEquality(max_peak_in_direction, line[:j+1])
 
                 # A skyscraper at j is a peak if it matches the max height
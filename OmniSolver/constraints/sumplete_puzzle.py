@@ -1,4 +1,7 @@
 import numpy as np
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
 
 def SumpleteRowConstraints(self, RowSums):
     '''
@@ -13,7 +16,7 @@ def SumpleteRowConstraints(self, RowSums):
         RowProduct = [self.Cells[i][j]*self.InputMatrix[i, j] for j in range(self.Cols)]
         self.Model.Add(sum(RowProduct) == rowsum)
     
-    print("Sumplete Row Constraints Added")
+    Log.debug("Sumplete Row Constraints Added")
 
 def SumpleteColConstraints(self, ColSums):
     
@@ -29,7 +32,7 @@ def SumpleteColConstraints(self, ColSums):
         RowProduct = [self.Cells[i][j]*self.InputMatrix[i, j] for i in range(self.Rows)]
         self.Model.Add(sum(RowProduct) == colsum)
     
-    print("Sumplete Column Constraints Added")
+    Log.debug("Sumplete Column Constraints Added")
 
 def ClassicSumpleteConstraints(self, RowSums, ColSums):
     
@@ -41,4 +44,4 @@ def ClassicSumpleteConstraints(self, RowSums, ColSums):
     self.SumpleteRowConstraints(RowSums)
     self.SumpleteColConstraints(ColSums)
     
-    print("Sumplete Constraints Added")
\ No newline at end of file
+    Log.debug("Sumplete Constraints Added")
\ No newline at end of file
@@ -1,3 +1,7 @@
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
+
 def ThermometerConstraints(self, thermometer_IDs):
     """
     Adds thermometer constraints to the model.
@@ -12,11 +16,15 @@ def ThermometerConstraints(self, thermometer_IDs):
         # Extract the cells for this thermometer
         cells = [self.Cells[row][col] for row, col in thermo_cells]
 
+        # The i-th cell has i smaller cells before it and len(cells) - 1 - i larger ones after it
+        for i, cell in enumerate(cells):
+            self.RestrictCellValues(cell, range(self.LowerBound + i, self.UpperBound - (len(cells) - 1 - i) + 1))
+
         # Add increasing constraints along the thermometer
         for i in range(len(cells) - 1):
             self.Model.Add(cells[i] < cells[i + 1])
 
-        print(f"Thermometer {thermo_id + 1} constraints added.")
+        Log.debug("Thermometer %s constraints added.", thermo_id + 1)
 
 def SlowThermometerConstraints(self, thermometer_IDs):
     """
@@ -37,4 +45,4 @@ def SlowThermometerConstraints(self, thermometer_IDs):
         for i in range(len(cells) - 1):
             self.Model.Add(cells[i] <= cells[i + 1])
 
-        print(f"Slow Thermometer {thermo_id + 1} constraints added.")
\ No newline at end of file
+        Log.debug("Slow Thermometer %s constraints added.", thermo_id + 1)
\ No newline at end of file
@@ -1,4 +1,7 @@
 from itertools import product
+from SolverLog import GetLogger
+
+Log = GetLogger(__name__)
 
 def WindokuConstraints(self, visualize=True):
     """
@@ -26,4 +29,4 @@ def WindokuConstraints(self, visualize=True):
         # Add a constraint to ensure all values in the region are distinct
         self.Model.AddAllDifferent(cells)
 
-        print(f"Windoku region {region_id + 1} added.")
\ No newline at end of file
+        Log.debug("Windoku region %s added.", region_id + 1)
\ No newline at end of file
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import time
+
+from pydantic import ValidationError
+
+import SolverConfig
+from SolverPool import PoolSaturated
+
+class BatchTooLarge(Exception):
+    
+    '''
+    Raised when a batch has more items than SOLVER_BATCH_MAX_ITEMS or a body larger than
+    SOLVER_BATCH_MAX_BYTES.
+    '''
+
+async def ReadBody(request, MaxBytes=None):
+    
+    '''
+    Read the body of a batch request, upto MaxBytes. The declared Content-Length is checked
+    before reading, and the size of the chunks as they arrive, so that an oversized body
+    is never held in memory whether its length is declared or not.
+    '''
+    
+    MaxBytes = SolverConfig.SOLVER_BATCH_MAX_BYTES if MaxBytes is None else MaxBytes
+    Message = f"Batch body is larger than the limit of {MaxBytes} bytes"
+    
+    Length = request.headers.get("content-length", "")
+    if Length.isdigit() and int(Length) > MaxBytes:
+        raise BatchTooLarge(Message)
+    
+    Chunks = []
+    Size = 0
+    
+    async for Chunk in request.stream():
+        Size += len(Chunk)
+        if Size > MaxBytes:
+            raise BatchTooLarge(Message)
+        Chunks.append(Chunk)
+    
+    return b"".join(Chunks)
+
+async def ReadBatch(request, Model):
+    
+    '''
+    Read and parse the items of a batch request (see ParseBatch). Parsing and validating
+    upto SOLVER_BATCH_MAX_ITEMS payloads takes a while, so it runs on a thread to keep the
+    event loop serving the other requests.
+    '''
+    
+    Body = await ReadBody(request)
+    
+    return await asyncio.get_running_loop().run_in_executor(None, ParseBatch, Body, Model)
+
+def ParseBatch(Body: bytes, Model, MaxItems=None):
+    
+    '''
+    Split the body of a batch request into its items. The body is either a JSON array of
+    payloads or one payload per line (JSONL). Every item is validated against Model and is
+    returned as the validated payload, or as an error message when it is not valid.
+    '''
+    
+    MaxItems = SolverConfig.SOLVER_BATCH_MAX_ITEMS if MaxItems is None else MaxItems
+    Text = Body.decode("utf-8", errors="replace")
+    
+    try:
+        Payloads = json.loads(Text)
+        if not isinstance(Payloads, list):
+            Payloads = [Payloads]
+    except json.JSONDecodeError:
+        Payloads = []
+        for Line in Text.splitlines():
+            if not Line.strip():
+                continue
+            try:
+                Payloads.append(json.loads(Line))
+            except json.JSONDecodeError as e:
+                Payloads.append(ValueError(f"Invalid JSON: {e.msg}"))
+    
+    if len(Payloads) > MaxItems:
+        raise BatchTooLarge(f"Batch has {len(Payloads)} items, the limit is {MaxItems}")
+    
+    Items = []
+    for Payload in Payloads:
+        if isinstance(Payload, ValueError):
+            Items.append(str(Payload))
+            continue
+        
+        try:
+            Items.append(Model.model_validate(Payload))
+        except ValidationError as e:
+            Errors = [
+                f"{'.'.join(str(Part) for Part in Error['loc']) or 'payload'}: {Error['msg']}"
+                for Error in e.errors()
+            ]
+            Items.append("Invalid payload: " + "; ".join(Errors))
+    
+    return Items
+
+def BatchKeys(Items, CacheKey):
+    
+    '''
+    The (cache key, transform) of every item of a batch, None for the invalid items.
+    '''
+    
+    return [None if isinstance(Item, str) else CacheKey(Item) for Item in Items]
+
+def BatchOutcome(Solutions, Details):
+    
+    if Solutions is None:
+        return "error"
+    
+    if Solutions:
+        return "solved"
+    
+    return "timed_out" if Details.get("timed_out") else "no_solution"
+
+async def RunBatch(Items, Pool, BatchManager, CacheKey, CachedResult, CacheResult, Response,
+                   Order="input", ChunkSize=None, Deadline=None):
+    
+    '''
+    Solve the items of a batch on the solver pool and yield a result record per item, in
+    input order or in the order the items finish, followed by a summary record.
+    
+    Cached items are answered straight away. The other items are grouped by cache key, so
+    that repeated (or equivalent) puzzles are solved once, and the groups are sent to the
+    pool in chunks of ChunkSize puzzles. All the batches share the slots of
+    Pool.BatchSlots, and wait for a free slot instead of being rejected when the pool is
+    busy, upto Deadline seconds (SOLVER_BATCH_DEADLINE) after the batch started. The
+    items still waiting then are reported as errors.
+    
+    CacheKey, CachedResult, CacheResult and Response are the cache and response helpers
+    of the matching single puzzle endpoint.
+    '''
+    
+    ChunkSize = max(SolverConfig.SOLVER_BATCH_CHUNK_SIZE if ChunkSize is None else ChunkSize, 1)
+    Deadline = SolverConfig.SOLVER_BATCH_DEADLINE if Deadline is None else Deadline
+    StartTime = time.time()
+    DeadlineTime = time.monotonic() + Deadline
+    
+    Finished = asyncio.Queue()
+    
+    def Finish(Index, Solutions, Details):
+        
+        Record = {"type": "result", "index": Index, "outcome": BatchOutcome(Solutions, Details)}
+        
+        if Solutions is None:
+            Record.update({"success": False, "solutions": [], "message": Details})
+        else:
+            Record.update(Response(Solutions, Details))
+        
+        Finished.put_nowait(Record)
+    
+    # CacheKey -> [(Index, Transform)] of the items that share the key
+    Groups = {}
+    Cached = 0
+    
+    # CacheKey -> puzzle that is solved for the group
+    Puzzles = {}
+    
+    # Canonicalizing and fingerprinting every item runs on a thread, like the parsing
+    ItemKeys = await asyncio.get_running_loop().run_in_executor(None, BatchKeys, Items, CacheKey)
+    
+    for Index, (Item, ItemKey) in enumerate(zip(Items, ItemKeys)):
+        
+        if isinstance(Item, str):
+            Finished.put_nowait({
+                "type": "result",
+                "index": Index,
+                "outcome": "invalid",
+                "success": False,
+                "solutions": [],
+                "message": Item
+            })
+            continue
+        
+        Key, Transform = ItemKey
+        
+        if Key not in Groups:
+            Result = CachedResult(Key, Transform)
+            if Result is not None:
+                Finish(Index, *Result)
+                Cached += 1
+                continue
+            
+            Groups[Key] = []
+            Puzzles[Key] = Item
+        
+        Groups[Key].append((Index, Transform))
+    
+    def FinishGroup(Key, Solutions, Details):
+        
+        Members = Groups[Key]
+        
+        if Solutions is None:
+            for Index, Transform in Members:
+                Finish(Index, None, Details)
+            return
+        
+        # The solutions are found in the frame of the first item of the group and are
+        # mapped to the other items through the canonical frame
+        SolvedTransform = Members[0][1]
+        CacheResult(Key, SolvedTransform, Solutions, Details)
+        
+        if SolvedTransform is not None:
+            Solutions = [SolvedTransform.Apply(Solution) for Solution in Solutions]
+        
+        for Index, Transform in Members:
+            if Transform is not None:
+                Finish(Index, [Transform.Invert(Solution) for Solution in Solutions], Details)
+            else:
+                Finish(Index, Solutions, Details)
+    
+    Slots = Pool.BatchSlots()
+    Expired = f"Batch deadline of {Deadline:g} seconds reached before the puzzle was solved"
+    
+    async def SolveChunk(Keys):
+        
+        Results = [(None, Expired)]*len(Keys)
+        
+        try:
+            await asyncio.wait_for(Slots.acquire(), max(DeadlineTime - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            pass
+        else:
+            try:
+                while True:
+                    try:
+                        Results = await Pool.Run(BatchManager, [Puzzles[Key] for Key in Keys], Pool.SearchWorkerCeiling())
+                        break
+                    except PoolSaturated as e:
+                        if time.monotonic() + e.RetryAfter > DeadlineTime:
+                            break
+                        await asyncio.sleep(e.RetryAfter)
+                    except Exception as e:
+                        Results = [(None, f"Error solving puzzle: {str(e)}")]*len(Keys)
+                        break
+            finally:
+                Slots.release()
+        
+        for Key, (Solutions, Details) in zip(Keys, Results):
+            FinishGroup(Key, Solutions, Details)
+    
+    Keys = list(Groups)
+    Tasks = [
+        asyncio.create_task(SolveChunk(Keys[Start:Start + ChunkSize]))
+        for Start in range(0, len(Keys), ChunkSize)
+    ]
+    
+    Outcomes = {}
+    Buffered = {}
+    NextIndex = 0
+    
+    try:
+        for _ in range(len(Items)):
+            Record = await Finished.get()
+            Outcomes[Record["outcome"]] = Outcomes.get(Record["outcome"], 0) + 1
+            
+            if Order == "completion":
+                yield Record
+                continue
+            
+            # Records that finish early wait for the items before them
+            Buffered[Record["index"]] = Record
+            while NextIndex in Buffered:
+                yield Buffered.pop(NextIndex)
+                NextIndex += 1
+        
+        yield {
+            "type": "summary",
+            "items": len(Items),
+            "cached": Cached,
+            "solves": len(Groups),
+            "outcomes": Outcomes,
+            "elapsed": time.time() - StartTime
+        }
+    finally:
+        for Task in Tasks:
+            Task.cancel()
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+class ResultCache:
+    
+    '''
+    In-process cache of solved puzzles with LRU + TTL eviction.
+    
+    Entries are keyed by a stable fingerprint of the validated request payload. The cache is
+    bounded by the number of entries and by the approximate memory used by the results,
+    measured as the size of their JSON encoding.
+    '''
+    
+    def __init__(self, MaxEntries=4096, MaxBytes=64*1024*1024, TTL=3600.0):
+        
+        self.MaxEntries = MaxEntries
+        self.MaxBytes = MaxBytes
+        self.TTL = TTL
+        
+        # Key -> (Result, Size, ExpiryTime)
+        self.Entries = OrderedDict()
+        self.TotalBytes = 0
+        
+        self.Hits = 0
+        self.Misses = 0
+        self.Evictions = 0
+        
+        self._Lock = threading.Lock()
+    
+    @staticmethod
+    def Fingerprint(puzzle: BaseModel, Exclude=None):
+        
+        '''
+        Stable hash of a validated payload. Fields are serialised with sorted keys so that the
+        fingerprint does not depend on the order in which the client sent them.
+        '''
+        
+        Payload = puzzle.model_dump(exclude=Exclude)
+        Encoded = json.dumps(Payload, sort_keys=True, separators=(",", ":"))
+        
+        return f"{type(puzzle).__name__}:" + hashlib.sha256(Encoded.encode()).hexdigest()
+    
+    def Get(self, Key):
+        
+        with self._Lock:
+            Entry = self.Entries.get(Key)
+            
+            if Entry is None:
+                self.Misses += 1
+                return None
+            
+            Result, Size, ExpiryTime = Entry
+            if ExpiryTime < time.monotonic():
+                self._Remove(Key)
+                self.Misses += 1
+                return None
+            
+            self.Entries.move_to_end(Key)
+            self.Hits += 1
+            return Result
+    
+    def Put(self, Key, Result):
+        
+        Size = len(json.dumps(Result, separators=(",", ":")))
+        
+        # Results that can never fit are not cached
+        if Size > self.MaxBytes:
+            return
+        
+        with self._Lock:
+            if Key in self.Entries:
+                self._Remove(Key)
+            
+            self.Entries[Key] = (Result, Size, time.monotonic() + self.TTL)
+            self.TotalBytes += Size
+            
+            # Evict the least recently used results until the cache fits its bounds
+            while len(self.Entries) > self.MaxEntries or self.TotalBytes > self.MaxBytes:
+                OldestKey = next(iter(self.Entries))
+                self._Remove(OldestKey)
+                self.Evictions += 1
+    
+    def _Remove(self, Key):
+        
+        Result, Size, ExpiryTime = self.Entries.pop(Key)
+        self.TotalBytes -= Size
+    
+    def Clear(self):
+        
+        with self._Lock:
+            self.Entries.clear()
+            self.TotalBytes = 0
+    
+    def Stats(self):
+        
+        with self._Lock:
+            Lookups = self.Hits + self.Misses
+            return {
+                "entries": len(self.Entries),
+                "bytes": self.TotalBytes,
+                "hits": self.Hits,
+                "misses": self.Misses,
+                "evictions": self.Evictions,
+                "hit_ratio": self.Hits / Lookups if Lookups else 0.0,
+            }
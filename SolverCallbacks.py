@@ -0,0 +1,101 @@
+import time
+from ortools.sat.python import cp_model
+import SolverLog
+
+Log = SolverLog.GetLogger(__name__)
+
+class SolutionCollector(cp_model.CpSolverSolutionCallback):
+    
+    '''
+    Collects the values of a grid of cell variables for every solution found during a single
+    CP-SAT search (enumerate_all_solutions). The search is stopped once MaxSolutions
+    solutions have been found.
+    
+    CP-SAT enumerates the assignments of every variable of the model, so a grid comes back
+    once for each assignment of the auxiliary literals it leaves free. Only the first of
+    them is counted.
+    
+    If OnSolution is given, every solution is handed to it as soon as it is found instead of
+    being kept in Solutions, so that streamed enumerations do not hold all the solutions.
+    '''
+    
+    def __init__(self, Cells, MaxSolutions=None, OnSolution=None):
+        
+        super().__init__()
+        
+        self.Cells = Cells
+        self.MaxSolutions = MaxSolutions
+        self.OnSolution = OnSolution
+        
+        self.Solutions = []
+        self.Seen = set()
+        self.SolutionCount = 0
+        self.Capped = False
+    
+    def OnSolutionCallback(self):
+        
+        solution = [[self.Value(Cell) for Cell in Row] for Row in self.Cells]
+        
+        Key = tuple(map(tuple, solution))
+        if Key in self.Seen:
+            return
+        self.Seen.add(Key)
+        self.SolutionCount += 1
+        
+        if self.OnSolution is not None:
+            self.OnSolution(solution)
+        else:
+            self.Solutions.append(solution)
+        
+        if self.MaxSolutions is not None and self.SolutionCount >= self.MaxSolutions:
+            self.Capped = True
+            self.StopSearch()
+    
+    # Newer OR-Tools versions call the snake case name
+    on_solution_callback = OnSolutionCallback
+
+def EnumerateSolutions(Puzzle, MaxSolutions=None, TimeLimit=None, OnSolution=None):
+    
+    '''
+    Enumerate the distinct grids of a CP-SAT puzzle solver (Cells, Model, Solver and
+    OutputMatrix) in a single search, for its MultiSolutionSolve. The model is not
+    modified. The search stops after MaxSolutions grids or TimeLimit seconds, and
+    ModelStatus, SolveTime, SolutionCount, SolutionsCapped, Exhaustive and TimedOut are
+    set on the puzzle solver.
+    
+    If OnSolution is given, each solution is passed to it as soon as it is found and
+    is not included in the returned list.
+    '''
+    
+    StartTime = time.time()
+    
+    Collector = SolutionCollector(Puzzle.Cells, MaxSolutions, OnSolution)
+    
+    # Solutions can only be enumerated by a single search worker
+    Puzzle.Solver.parameters.enumerate_all_solutions = True
+    Puzzle.Solver.parameters.num_search_workers = 1
+    if TimeLimit is not None:
+        Puzzle.Solver.parameters.max_time_in_seconds = TimeLimit
+    
+    Puzzle.ModelStatus = Puzzle.Solver.Solve(Puzzle.Model, Collector)
+    Puzzle.SolveTime = time.time() - StartTime
+    
+    solutions = Collector.Solutions
+    Puzzle.SolutionCount = Collector.SolutionCount
+    Puzzle.SolutionsCapped = Collector.Capped
+    Puzzle.Exhaustive = Puzzle.ModelStatus == cp_model.OPTIMAL or Puzzle.ModelStatus == cp_model.INFEASIBLE
+    Puzzle.TimedOut = not Puzzle.Exhaustive and not Puzzle.SolutionsCapped
+    
+    if solutions:
+        Puzzle.OutputMatrix[:, :] = solutions[-1]
+    
+    if Puzzle.SolutionCount == 0:
+        Log.info("Houston, we don't have a solution")
+    elif Puzzle.Exhaustive:
+        Log.info("No more solutions. Total solutions found: %s", Puzzle.SolutionCount)
+    else:
+        Log.info("Search stopped. Solutions found: %s", Puzzle.SolutionCount)
+    
+    Log.info("Analysis Done in %.2f second(s)", time.time() - StartTime)
+    
+    return solutions
@@ -0,0 +1,98 @@
+'''
+Server settings for the solver API. Every setting can be overridden with an environment
+variable of the same name.
+'''
+
+import os
+
+def _EnvInt(Name, Default):
+    
+    Value = os.environ.get(Name)
+    return int(Value) if Value not in (None, "") else Default
+
+def _EnvStr(Name, Default):
+    
+    Value = os.environ.get(Name)
+    return Value if Value not in (None, "") else Default
+
+# Number of solver processes. The default 0 runs the solves on threads of the API process,
+# which works everywhere, including serverless platforms (eg: the Vercel deployment) that
+# do not run the lifespan hook or allow child processes. Set it (eg: to the number of
+# cores) on a long running server to solve on a pool of processes.
+SOLVER_WORKERS = _EnvInt("SOLVER_WORKERS", 0)
+
+# Number of solves that may wait for a free worker before new requests are rejected
+SOLVER_QUEUE_SIZE = _EnvInt("SOLVER_QUEUE_SIZE", 4 * max(SOLVER_WORKERS, 1))
+
+# Seconds a rejected client is asked to wait before retrying (Retry-After header)
+SOLVER_RETRY_AFTER = _EnvInt("SOLVER_RETRY_AFTER", 1)
+
+# How the solver processes are started: spawn, forkserver or fork
+SOLVER_START_METHOD = _EnvStr("SOLVER_START_METHOD", "spawn")
+
+# Largest number of CP-SAT search workers a single solve may use, including per-request overrides
+SOLVER_MAX_SEARCH_WORKERS = _EnvInt("SOLVER_MAX_SEARCH_WORKERS", min(os.cpu_count() or 1, 8))
+
+# Models with fewer variables + constraints than this (and no variant constraints) are
+# solved single-threaded. Every multiple of this size doubles the search workers.
+SOLVER_PARALLEL_MODEL_SIZE = _EnvInt("SOLVER_PARALLEL_MODEL_SIZE", 5000)
+
+# Time budget in seconds for a solve when the request does not set TimeLimit
+SOLVER_DEFAULT_TIME_LIMIT = float(_EnvStr("SOLVER_DEFAULT_TIME_LIMIT", "30"))
+
+# Hard limit in seconds on the time budget of any solve, including per-request TimeLimit
+SOLVER_MAX_TIME_LIMIT = float(_EnvStr("SOLVER_MAX_TIME_LIMIT", "120"))
+
+# Largest number of puzzles accepted by a batch request
+SOLVER_BATCH_MAX_ITEMS = _EnvInt("SOLVER_BATCH_MAX_ITEMS", 10000)
+
+# Largest body in bytes accepted by a batch request. Larger bodies are rejected before
+# they are read in full.
+SOLVER_BATCH_MAX_BYTES = _EnvInt("SOLVER_BATCH_MAX_BYTES", 32*1024*1024)
+
+# Number of batch items sent to a solver process at once
+SOLVER_BATCH_CHUNK_SIZE = _EnvInt("SOLVER_BATCH_CHUNK_SIZE", 16)
+
+# Seconds a batch may wait for the solver pool. Items that have not been sent to a worker by
+# then are reported as errors instead of waiting for a free slot any longer.
+SOLVER_BATCH_DEADLINE = float(_EnvStr("SOLVER_BATCH_DEADLINE", "600"))
+
+# Classic sudokus/latin squares upto this order (with only the chess and orthogonal
+# non-consecutive variants) are solved by the bitmask backtracking solver. 0 disables it.
+SOLVER_BITMASK_MAX_ORDER = _EnvInt("SOLVER_BITMASK_MAX_ORDER", 16)
+
+# Guesses the bitmask solver may make before the puzzle is handed to CP-SAT
+SOLVER_BITMASK_NODE_LIMIT = _EnvInt("SOLVER_BITMASK_NODE_LIMIT", 2000)
+
+# Largest number of solutions returned when enumerating solutions (Mode = "all")
+SOLVER_MAX_SOLUTIONS = _EnvInt("SOLVER_MAX_SOLUTIONS", 1000)
+
+# Time budget in seconds for enumerating solutions when the request does not set TimeLimit
+SOLVER_ENUMERATION_TIME_LIMIT = float(_EnvStr("SOLVER_ENUMERATION_TIME_LIMIT", "10"))
+
+
+# 1 measures the build of every CP-SAT model (time, variables and constraints added by each
+# constraint function) and reports it in the server log. Requests with Debug set are always
+# measured and also get the breakdown in their response.
+SOLVER_PROFILE_CONSTRAINTS = bool(_EnvInt("SOLVER_PROFILE_CONSTRAINTS", 0))
+
+# Level of the solver log: DEBUG, INFO, WARNING or ERROR. DEBUG adds the progress messages
+# of every constraint function and the request payloads.
+SOLVER_LOG_LEVEL = _EnvStr("SOLVER_LOG_LEVEL", "INFO")
+
+# Format of the solver log records: text or json (one JSON object per line)
+SOLVER_LOG_FORMAT = _EnvStr("SOLVER_LOG_FORMAT", "text")
+
+# 1 gives the model variables human readable names (eg: "x(0, 1)"), 0 leaves them unnamed.
+# auto only names them when SOLVER_LOG_LEVEL is DEBUG.
+SOLVER_VARIABLE_NAMES = _EnvStr("SOLVER_VARIABLE_NAMES", "auto")
+
+# Longest line whose skyscraper clues are encoded as a table of the permutations that satisfy
+# them. A line of N cells has N! permutations to filter, so longer lines use the max chain
+# and an explicit table encoding is rejected above it.
+SOLVER_SKYSCRAPER_TABLE_MAX_ORDER = _EnvInt("SOLVER_SKYSCRAPER_TABLE_MAX_ORDER", 7)
+
+# Largest killer cage (of distinct digits) that also gets the table of its allowed
+# permutations. A cage of N cells has up to N! orderings of each digit combination. 0 turns
+# the tables off: with the cell domains already cut, they slowed the benchmark cases down.
+SOLVER_CAGE_TABLE_MAX_CELLS = _EnvInt("SOLVER_CAGE_TABLE_MAX_CELLS", 0)
\ No newline at end of file
@@ -0,0 +1,91 @@
+'''
+Logging for the solvers and the API.
+
+Every module logs through a child of the "PuzzleSolverSuite" logger to stderr, at the level
+set by SOLVER_LOG_LEVEL. Messages are formatted lazily (Log.debug("Row %d added", i)), so the
+per-element progress messages of the constraint functions cost a level check when DEBUG is
+off. SOLVER_LOG_FORMAT=json writes one JSON object per record for log pipelines.
+'''
+
+import json
+import logging
+import sys
+
+import SolverConfig
+
+RootLoggerName = "PuzzleSolverSuite"
+
+# Human readable names (eg: "x(0, 1)") for the model variables. Only worth building when
+# the model is inspected, so they follow the DEBUG level unless set explicitly.
+if SolverConfig.SOLVER_VARIABLE_NAMES == "auto":
+    VariableNames = SolverConfig.SOLVER_LOG_LEVEL.upper() == "DEBUG"
+else:
+    VariableNames = SolverConfig.SOLVER_VARIABLE_NAMES not in ("0", "false", "False")
+
+class StderrHandler(logging.StreamHandler):
+    
+    '''
+    Writes to the current sys.stderr, so that the log follows a redirected stderr (eg: when
+    captured by a test runner). Standard output is left to the results of the tools.
+    '''
+    
+    @property
+    def stream(self):
+        return sys.stderr
+    
+    @stream.setter
+    def stream(self, Value):
+        pass
+
+class JSONFormatter(logging.Formatter):
+    
+    def format(self, record):
+        
+        Record = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        
+        if record.exc_info:
+            Record["exception"] = self.formatException(record.exc_info)
+        
+        return json.dumps(Record)
+
+def GetLogger(Name):
+    
+    return logging.getLogger(f"{RootLoggerName}.{Name}")
+
+def SetLevel(Level):
+    
+    logging.getLogger(RootLoggerName).setLevel(Level.upper() if isinstance(Level, str) else Level)
+
+def RaiseLevel(Level):
+    
+    '''
+    Set the level of the solver log to at least Level. Eg: RaiseLevel("WARNING") hides the
+    progress messages of the solvers and keeps their warnings and errors.
+    '''
+    
+    Logger = logging.getLogger(RootLoggerName)
+    Logger.setLevel(max(Logger.level, logging.getLevelName(Level.upper())))
+
+def _ConfigureRootLogger():
+    
+    Logger = logging.getLogger(RootLoggerName)
+    
+    if Logger.handlers:
+        return
+    
+    Handler = StderrHandler()
+    if SolverConfig.SOLVER_LOG_FORMAT == "json":
+        Handler.setFormatter(JSONFormatter())
+    else:
+        Handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    Logger.addHandler(Handler)
+    Logger.propagate = False
+    SetLevel(SolverConfig.SOLVER_LOG_LEVEL)
+
+_ConfigureRootLogger()
@@ -1,33 +1,146 @@
+import time
+import threading
+from itertools import count
+from ortools.sat import cp_model_pb2
 from OmniSolver.OmniPuzzleSolver import OmniPuzzleSolver
+from OmniSolver.BitmaskSudokuSolver import BitmaskSudokuSolver
 from NQueens.NQueensSolver import NQueens
 from PocketCube.PocketCubeSolver import PocketCubeSolver
 
 from InputJSONClass import Omni, Chess, PocketCube
+from SolverPolicy import ApplySearchWorkerPolicy, ChooseTimeLimit
+from SolverLog import GetLogger
+import SolverConfig
 
-def OmniSolverManager(puzzle: Omni):
-    
-    print(f"Inside OmniSolverManager with data {puzzle}")
+Log = GetLogger(__name__)
+
+# Omni fields that decide which constraints are added to the model.
+# Together with the puzzle shape and bounds, they identify a model template.
+OmniConstraintFlags = ("Sudoku", "LatinSquare", "AntiKing", "AntiKnight", "OrthogonalNonConsec")
+
+# Chess fields that decide which constraints are added to the model
+ChessConstraintFlags = ("NQueens", "NRooks", "NBishops", "NBishopsRowConstraint")
+
+# Omni fields of the base grid: a sudoku, or a latin square without the boxes
+GridConstraintFlags = ("Sudoku", "LatinSquare")
+
+# Omni fields handled by BitmaskSudokuSolver, on top of the grid constraints
+BitmaskConstraintFlags = ("AntiKing", "AntiKnight", "OrthogonalNonConsec")
+
+def OmniTemplateKey(Solver: OmniPuzzleSolver, puzzle: Omni):
     
-    Solver = OmniPuzzleSolver(puzzle)
+    return (Solver.Rows, Solver.Cols, Solver.OrderRow, Solver.OrderCol,
+            Solver.LowerBound, Solver.UpperBound,
+            tuple(getattr(puzzle, Flag) for Flag in OmniConstraintFlags))
+
+def OmniConstraintsBuilder(puzzle: Omni):
     
-    if puzzle.Sudoku:
-        Solver.ClassicSudokuConstraints()
+    def Builder(Solver: OmniPuzzleSolver):
+        
+        if puzzle.Sudoku:
+            Solver.ClassicSudokuConstraints()
+        elif puzzle.LatinSquare:
+            Solver.LatinSquares()
+        
+        if puzzle.AntiKing:
+            Solver.AntiKingConstraints()
         
-    if puzzle.AntiKing:
-        Solver.AntiKingConstraints()
+        if puzzle.AntiKnight:
+            Solver.AntiKnightConstraints()
+        
+        if puzzle.OrthogonalNonConsec:
+            Solver.OrthogonalNonConsecConstraints()
+    
+    return Builder
+
+def OmniSolverManager(puzzle: Omni, SearchWorkerCeiling=None):
     
-    if puzzle.AntiKnight:
-        Solver.AntiKnightConstraints()
+    Log.debug("Inside OmniSolverManager with data %s", puzzle)
     
-    if puzzle.OrthogonalNonConsec:
-        Solver.OrthogonalNonConsecConstraints()
+    # Most requests are classic sudokus that a plain backtracking search solves faster
+    # than it takes to build a CP-SAT model
+    if BitmaskEligible(puzzle):
+        
+        StartTime = time.perf_counter()
+        Solver = BitmaskSudokuSolver(puzzle, Boxes=puzzle.Sudoku,
+                                     NodeLimit=SolverConfig.SOLVER_BITMASK_NODE_LIMIT)
+        BuildTime = time.perf_counter() - StartTime
+        
+        Solutions, Details = RunSolver(Solver, puzzle)
         
-    # Solutions = Solver.MultiSolutionSolve()
-    Solutions = Solver.Solve()
+        if not Solver.GaveUp:
+            Details.update({"engine": "bitmask", "build_time": BuildTime})
+            return Solutions, Details
+        
+        Log.info("Bitmask search gave up after %s guesses. Falling back to CP-SAT", Solver.Nodes)
+    
+    StartTime = time.perf_counter()
+    Solver = BuildOmniSolver(puzzle, SearchWorkerCeiling)
+    BuildTime = time.perf_counter() - StartTime
+    
+    Solutions, Details = RunSolver(Solver, puzzle)
+    Details.update({"engine": "cp-sat", "build_time": BuildTime})
+    
+    return Solutions, Details
+
+def BitmaskEligible(puzzle: Omni):
+    
+    '''
+    Whether a puzzle only uses constraints handled by BitmaskSudokuSolver.
+    '''
+    
+    if not (puzzle.Sudoku or puzzle.LatinSquare) or len(puzzle.Matrix) > SolverConfig.SOLVER_BITMASK_MAX_ORDER:
+        return False
+    
+    for Flag in OmniConstraintFlags:
+        if Flag not in GridConstraintFlags and getattr(puzzle, Flag) and Flag not in BitmaskConstraintFlags:
+            return False
+    
+    return BitmaskSudokuSolver.CanSolve(puzzle, Boxes=puzzle.Sudoku)
+
+def OmniStreamManager(puzzle: Omni, SearchWorkerCeiling, SolutionQueue, StopEvent):
+    
+    Solver = BuildOmniSolver(puzzle, SearchWorkerCeiling)
+    
+    return StreamSolver(Solver, puzzle, SolutionQueue, StopEvent)
+
+def BuildOmniSolver(puzzle: Omni, SearchWorkerCeiling=None):
+    
+    Solver = OmniPuzzleSolver(puzzle)
+    
+    if Solver.ConstraintProfile is not None:
+        # A model cloned from a template has no build to measure
+        OmniConstraintsBuilder(puzzle)(Solver)
+        Solver.ConstraintProfile.Report(Solver.Model)
+    else:
+        # Only the givens change between most requests, so the rest of the model
+        # is cloned from a cached template
+        Solver.BuildModelFromTemplate(OmniTemplateKey(Solver, puzzle), OmniConstraintsBuilder(puzzle))
+    
+    # Every variant constraint on top of the grid rules makes the search harder
+    Variants = sum(bool(getattr(puzzle, Flag)) for Flag in OmniConstraintFlags if Flag not in GridConstraintFlags)
+    ApplySearchWorkerPolicy(Solver, Variants, puzzle.SearchWorkers, SearchWorkerCeiling)
+    
+    return Solver
+
+def ChessSolverManager(puzzle: Chess, SearchWorkerCeiling=None):
+    
+    StartTime = time.perf_counter()
+    Solver = BuildChessSolver(puzzle, SearchWorkerCeiling)
+    BuildTime = time.perf_counter() - StartTime
+    
+    Solutions, Details = RunSolver(Solver, puzzle)
+    Details["build_time"] = BuildTime
+    
+    return Solutions, Details
+
+def ChessStreamManager(puzzle: Chess, SearchWorkerCeiling, SolutionQueue, StopEvent):
+    
+    Solver = BuildChessSolver(puzzle, SearchWorkerCeiling)
     
-    return Solutions
+    return StreamSolver(Solver, puzzle, SolutionQueue, StopEvent)
 
-def ChessSolverManager(puzzle: Chess):
+def BuildChessSolver(puzzle: Chess, SearchWorkerCeiling=None):
     
     Solver = NQueens(puzzle)
     
@@ -40,9 +153,152 @@ def ChessSolverManager(puzzle: Chess):
     if puzzle.NQueens:
         Solver.NQueensConstraint()
     
-    Solutions = Solver.Solve()
+    ApplySearchWorkerPolicy(Solver, 0, puzzle.SearchWorkers, SearchWorkerCeiling)
+    
+    return Solver
+
+def OmniBatchManager(puzzles, SearchWorkerCeiling=None):
+    
+    '''
+    Solve a chunk of a batch on one worker, so that its items share the loaded constraint
+    modules and model templates of the worker. A failing item does not fail the chunk.
+    '''
+    
+    return [SolveBatchItem(OmniSolverManager, puzzle, SearchWorkerCeiling) for puzzle in puzzles]
+
+def ChessBatchManager(puzzles, SearchWorkerCeiling=None):
+    
+    return [SolveBatchItem(ChessSolverManager, puzzle, SearchWorkerCeiling) for puzzle in puzzles]
+
+def SolveBatchItem(Manager, puzzle, SearchWorkerCeiling):
+    
+    # Returns (Solutions, Details), or (None, error message) if the solve failed
+    try:
+        return Manager(puzzle, SearchWorkerCeiling)
+    except Exception as e:
+        return None, f"Error solving puzzle: {str(e)}"
+
+def EnumerationLimit(puzzle):
+    
+    # Enumerations are capped by the server limits
+    MaxSolutions = SolverConfig.SOLVER_MAX_SOLUTIONS
+    if puzzle.MaxSolutions is not None:
+        MaxSolutions = min(max(puzzle.MaxSolutions, 1), MaxSolutions)
+    
+    return MaxSolutions
+
+def EnumerationTimeLimit(puzzle):
+    
+    return ChooseTimeLimit(puzzle.TimeLimit, SolverConfig.SOLVER_ENUMERATION_TIME_LIMIT)
+
+def RunSolver(Solver, puzzle):
+    
+    '''
+    Solve the model of an OmniPuzzleSolver/NQueens solver in the mode requested by the puzzle.
+    Returns the solutions and the details of the solve that are added to the response.
+    '''
+    
+    if puzzle.Mode == "all":
+        
+        Solutions = Solver.MultiSolutionSolve(EnumerationLimit(puzzle), EnumerationTimeLimit(puzzle))
+        
+        Details = {
+            "count": len(Solutions),
+            "exhaustive": Solver.Exhaustive,
+            "capped": Solver.SolutionsCapped
+        }
+    elif puzzle.Mode == "unique":
+        
+        # A second grid is enough to tell that the puzzle is not unique, so both grids come
+        # from a single search that stops as soon as it finds the second distinct one
+        Solutions = Solver.MultiSolutionSolve(2, EnumerationTimeLimit(puzzle))
+        
+        Details = {
+            "verdict": UniquenessVerdict(Solver),
+            "exhaustive": Solver.Exhaustive or Solver.SolutionsCapped
+        }
+    else:
+        Solutions = Solver.Solve(ChooseTimeLimit(puzzle.TimeLimit))
+        Details = {}
+    
+    # Lets the client tell an infeasible puzzle from a solve that ran out of time
+    Details.update({
+        "status": cp_model_pb2.CpSolverStatus.Name(Solver.ModelStatus),
+        "timed_out": Solver.TimedOut,
+        "elapsed": Solver.SolveTime
+    })
+    
+    if getattr(puzzle, "Debug", False) and getattr(Solver, "ConstraintProfile", None) is not None:
+        Details["profile"] = Solver.ConstraintProfile.Summary(Solver.Model)
+    
+    return Solutions, Details
+
+def UniquenessVerdict(Solver):
+    
+    '''
+    Verdict of a uniqueness check: "unique", "multiple", "none", or "unknown" when the
+    search ran out of time before it could decide. SolutionCount only counts distinct
+    grids, so auxiliary literals left free by the constraints do not make a puzzle multiple.
+    '''
+    
+    if Solver.SolutionCount >= 2:
+        return "multiple"
+    
+    if not Solver.Exhaustive:
+        return "unknown"
+    
+    return "unique" if Solver.SolutionCount == 1 else "none"
+
+def StreamSolver(Solver, puzzle, SolutionQueue, StopEvent):
+    
+    '''
+    Enumerate the solutions of a solver and put each one on SolutionQueue as soon as it is
+    found, followed by a summary record. Setting StopEvent (eg: when the client disconnects)
+    stops the search.
+    '''
+    
+    StartTime = time.time()
+    SearchDone = threading.Event()
+    SolutionIndex = count()
+    
+    def StopWatcher():
+        # StopEvent may belong to another process, so it is polled
+        while not SearchDone.is_set():
+            if StopEvent.wait(0.1):
+                Solver.Solver.StopSearch()
+                return
+    
+    def OnSolution(solution):
+        SolutionQueue.put({
+            "type": "solution",
+            "index": next(SolutionIndex),
+            "solution": solution
+        })
+    
+    Watcher = threading.Thread(target=StopWatcher, daemon=True)
+    Watcher.start()
+    
+    try:
+        Solver.MultiSolutionSolve(EnumerationLimit(puzzle), EnumerationTimeLimit(puzzle), OnSolution)
+    finally:
+        SearchDone.set()
+    
+    Summary = {
+        "type": "summary",
+        "count": Solver.SolutionCount,
+        "elapsed": time.time() - StartTime,
+        "exhaustive": Solver.Exhaustive,
+        "capped": Solver.SolutionsCapped,
+        "cancelled": StopEvent.is_set(),
+        "timed_out": Solver.TimedOut and not StopEvent.is_set()
+    }
+    
+    if getattr(puzzle, "Debug", False) and getattr(Solver, "ConstraintProfile", None) is not None:
+        Summary["profile"] = Solver.ConstraintProfile.Summary(Solver.Model)
+    
+    SolutionQueue.put(Summary)
     
-    return Solutions
+    return Summary
 
 # def PocketCubeSolverManager(puzzle: PocketCube):
     
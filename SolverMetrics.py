@@ -0,0 +1,181 @@
+'''
+In-process metrics of the API, rendered in the Prometheus text format by /metrics.
+
+Counters and histograms are updated with a dict lookup and a few additions under a lock,
+so they are cheap enough to leave on at full traffic. Gauges (eg: the cache and pool
+statistics) are read from their owners when the metrics are scraped.
+'''
+
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, from a cached response to a solve that uses its full time limit
+DefaultBuckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                  1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def EscapeLabelValue(Value):
+    
+    return str(Value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def FormatLabels(LabelNames, LabelValues, Extra=None):
+    
+    Pairs = [f'{Name}="{EscapeLabelValue(Value)}"' for Name, Value in zip(LabelNames, LabelValues)]
+    if Extra is not None:
+        Pairs.append(f'{Extra[0]}="{EscapeLabelValue(Extra[1])}"')
+    
+    return "{" + ",".join(Pairs) + "}" if Pairs else ""
+
+def FormatValue(Value):
+    
+    if Value == float("inf"):
+        return "+Inf"
+    
+    return repr(float(Value)) if isinstance(Value, float) else str(Value)
+
+class Counter:
+    
+    def __init__(self, Name, Help, LabelNames=()):
+        
+        self.Name = Name
+        self.Help = Help
+        self.LabelNames = tuple(LabelNames)
+        self.Values = {}
+        self._Lock = threading.Lock()
+    
+    def Inc(self, *LabelValues, Amount=1):
+        
+        with self._Lock:
+            self.Values[LabelValues] = self.Values.get(LabelValues, 0) + Amount
+    
+    def Render(self):
+        
+        Lines = [f"# HELP {self.Name} {self.Help}", f"# TYPE {self.Name} counter"]
+        
+        with self._Lock:
+            for LabelValues, Value in self.Values.items():
+                Lines.append(f"{self.Name}{FormatLabels(self.LabelNames, LabelValues)} {FormatValue(Value)}")
+        
+        return Lines
+
+class Histogram:
+    
+    def __init__(self, Name, Help, LabelNames=(), Buckets=DefaultBuckets):
+        
+        self.Name = Name
+        self.Help = Help
+        self.LabelNames = tuple(LabelNames)
+        self.Buckets = tuple(sorted(Buckets))
+        
+        # LabelValues -> [Count of each bucket (not cumulative) and +Inf, Sum, Count]
+        self.Values = {}
+        self._Lock = threading.Lock()
+    
+    def Observe(self, Value, *LabelValues):
+        
+        Bucket = bisect_left(self.Buckets, Value)
+        
+        with self._Lock:
+            Entry = self.Values.get(LabelValues)
+            if Entry is None:
+                Entry = self.Values[LabelValues] = [[0]*(len(self.Buckets) + 1), 0.0, 0]
+            
+            Entry[0][Bucket] += 1
+            Entry[1] += Value
+            Entry[2] += 1
+    
+    def Render(self):
+        
+        Lines = [f"# HELP {self.Name} {self.Help}", f"# TYPE {self.Name} histogram"]
+        
+        with self._Lock:
+            for LabelValues, (BucketCounts, Sum, Count) in self.Values.items():
+                Cumulative = 0
+                for Bound, BucketCount in zip(self.Buckets + (float("inf"),), BucketCounts):
+                    Cumulative += BucketCount
+                    Labels = FormatLabels(self.LabelNames, LabelValues, ("le", FormatValue(Bound)))
+                    Lines.append(f"{self.Name}_bucket{Labels} {Cumulative}")
+                
+                Labels = FormatLabels(self.LabelNames, LabelValues)
+                Lines.append(f"{self.Name}_sum{Labels} {FormatValue(Sum)}")
+                Lines.append(f"{self.Name}_count{Labels} {Count}")
+        
+        return Lines
+
+class Gauge:
+    
+    '''
+    Gauge read when the metrics are rendered. Callback returns the value, or a list of
+    (LabelValues, Value) for a labelled gauge.
+    '''
+    
+    def __init__(self, Name, Help, Callback, LabelNames=(), Type="gauge"):
+        
+        self.Name = Name
+        self.Help = Help
+        self.Callback = Callback
+        self.LabelNames = tuple(LabelNames)
+        self.Type = Type
+    
+    def Render(self):
+        
+        Lines = [f"# HELP {self.Name} {self.Help}", f"# TYPE {self.Name} {self.Type}"]
+        
+        Values = self.Callback()
+        if not isinstance(Values, list):
+            Values = [((), Values)]
+        
+        for LabelValues, Value in Values:
+            Lines.append(f"{self.Name}{FormatLabels(self.LabelNames, LabelValues)} {FormatValue(Value)}")
+        
+        return Lines
+
+class MetricsRegistry:
+    
+    def __init__(self):
+        
+        self.Metrics = []
+    
+    def Counter(self, Name, Help, LabelNames=()):
+        
+        Metric = Counter(Name, Help, LabelNames)
+        self.Metrics.append(Metric)
+        return Metric
+    
+    def Histogram(self, Name, Help, LabelNames=(), Buckets=DefaultBuckets):
+        
+        Metric = Histogram(Name, Help, LabelNames, Buckets)
+        self.Metrics.append(Metric)
+        return Metric
+    
+    def Gauge(self, Name, Help, Callback, LabelNames=(), Type="gauge"):
+        
+        Metric = Gauge(Name, Help, Callback, LabelNames, Type)
+        self.Metrics.append(Metric)
+        return Metric
+    
+    def Render(self):
+        
+        Lines = []
+        for Metric in self.Metrics:
+            Lines.extend(Metric.Render())
+        
+        return "\n".join(Lines) + "\n"
+
+class RequestTimer:
+    
+    '''
+    ASGI middleware that records when each HTTP request arrived (request.state.RequestStart),
+    so that an endpoint can tell how long reading and validating its payload took.
+    '''
+    
+    def __init__(self, app):
+        
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["RequestStart"] = time.perf_counter()
+        
+        await self.app(scope, receive, send)
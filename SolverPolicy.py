@@ -0,0 +1,54 @@
+import SolverConfig
+
+def ChooseSearchWorkers(Model, Variants=0, Requested=None, Ceiling=None):
+    
+    '''
+    Number of CP-SAT search workers for a solve.
+    
+    A requested worker count is honoured up to SOLVER_MAX_SEARCH_WORKERS. Otherwise, small
+    classic puzzles stay single-threaded so that throughput stays high, and the portfolio is
+    doubled for every enabled variant constraint and for every SOLVER_PARALLEL_MODEL_SIZE
+    variables + constraints in the model. Ceiling caps the automatic choice, based on the
+    load of the solver pool.
+    '''
+    
+    MaxWorkers = max(SolverConfig.SOLVER_MAX_SEARCH_WORKERS, 1)
+    
+    if Requested is not None:
+        return min(max(Requested, 1), MaxWorkers)
+    
+    Proto = Model.Proto()
+    ModelSize = len(Proto.variables) + len(Proto.constraints)
+    
+    Difficulty = Variants + ModelSize // max(SolverConfig.SOLVER_PARALLEL_MODEL_SIZE, 1)
+    Workers = 1 << min(Difficulty, MaxWorkers.bit_length())
+    
+    if Ceiling is not None:
+        Workers = min(Workers, Ceiling)
+    
+    return min(max(Workers, 1), MaxWorkers)
+
+def ApplySearchWorkerPolicy(Solver, Variants=0, Requested=None, Ceiling=None):
+    
+    '''
+    Set the search workers of an OmniPuzzleSolver/NQueens solver once its model is built.
+    '''
+    
+    Workers = ChooseSearchWorkers(Solver.Model, Variants, Requested, Ceiling)
+    Solver.Solver.parameters.num_search_workers = Workers
+    
+    return Workers
+
+def ChooseTimeLimit(Requested=None, Default=None):
+    
+    '''
+    Time budget in seconds for a solve. A requested budget is honoured up to
+    SOLVER_MAX_TIME_LIMIT, otherwise Default (SOLVER_DEFAULT_TIME_LIMIT) is used.
+    '''
+    
+    if Default is None:
+        Default = SolverConfig.SOLVER_DEFAULT_TIME_LIMIT
+    
+    TimeLimit = Requested if Requested is not None and Requested > 0 else Default
+    
+    return min(TimeLimit, SolverConfig.SOLVER_MAX_TIME_LIMIT)
@@ -0,0 +1,194 @@
+import asyncio
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import SolverConfig
+
+class PoolSaturated(Exception):
+    
+    '''
+    Raised when a solve is submitted while every worker is busy and the queue is full.
+    '''
+    
+    def __init__(self, RetryAfter):
+        
+        super().__init__("Solver queue is full, retry later")
+        self.RetryAfter = RetryAfter
+
+class SolverPool:
+    
+    '''
+    Bounded pool of solver processes with admission control.
+    
+    At most Workers solves run at once and at most QueueSize more wait for a worker. Any
+    solve submitted beyond that is rejected straight away with PoolSaturated so that the
+    API can shed load instead of piling up requests. Must be used from the event loop.
+    '''
+    
+    def __init__(self, Workers=None, QueueSize=None, RetryAfter=None, StartMethod=None):
+        
+        self.Workers = SolverConfig.SOLVER_WORKERS if Workers is None else Workers
+        self.QueueSize = SolverConfig.SOLVER_QUEUE_SIZE if QueueSize is None else QueueSize
+        self.RetryAfter = SolverConfig.SOLVER_RETRY_AFTER if RetryAfter is None else RetryAfter
+        self.StartMethod = SolverConfig.SOLVER_START_METHOD if StartMethod is None else StartMethod
+        
+        self.Executor = None
+        
+        # Carries streamed solutions from the worker processes, started on first use
+        self.StreamManager = None
+        
+        # Shared by all the batches, see BatchSlots
+        self._BatchSlots = None
+        
+        # Solves accepted and not yet finished (running + queued)
+        self.Pending = 0
+        self.Completed = 0
+        self.Rejected = 0
+    
+    def Start(self):
+        
+        # Workers = 0 runs the solves on the default thread pool of the event loop
+        if self.Executor is None and self.Workers > 0:
+            self.Executor = ProcessPoolExecutor(
+                max_workers=self.Workers,
+                mp_context=multiprocessing.get_context(self.StartMethod),
+                # Load the solvers (and their constraint registry) when a worker starts
+                initializer=importlib.import_module,
+                initargs=("SolverManager",),
+            )
+    
+    def Shutdown(self):
+        
+        if self.Executor is not None:
+            self.Executor.shutdown(wait=False, cancel_futures=True)
+            self.Executor = None
+        
+        if self.StreamManager is not None:
+            self.StreamManager.shutdown()
+            self.StreamManager = None
+    
+    def Capacity(self):
+        
+        return self.Workers + self.QueueSize
+    
+    def BatchSlots(self):
+        
+        '''
+        Semaphore that every batch takes before sending a chunk to the pool. Together the
+        batches use at most Workers - 1 workers, so one is always left for the single
+        puzzle requests.
+        '''
+        
+        if self._BatchSlots is None:
+            self._BatchSlots = asyncio.Semaphore(max(self.Workers - 1, 1))
+        
+        return self._BatchSlots
+    
+    def SearchWorkerCeiling(self):
+        
+        '''
+        Search workers a new solve may use without oversubscribing the machine: the cores are
+        shared between the solves that are already running and the new one.
+        '''
+        
+        Cores = os.cpu_count() or 1
+        Running = min(self.Pending, self.Workers) if self.Workers > 0 else self.Pending
+        
+        return max(Cores // (Running + 1), 1)
+    
+    async def Run(self, Function, *Args):
+        
+        '''
+        Run Function(*Args) on a worker and return its result.
+        Raises PoolSaturated if the queue is full.
+        '''
+        
+        if self.Pending >= self.Capacity():
+            self.Rejected += 1
+            raise PoolSaturated(self.RetryAfter)
+        
+        self.Start()
+        self.Pending += 1
+        
+        try:
+            Loop = asyncio.get_running_loop()
+            return await Loop.run_in_executor(self.Executor, Function, *Args)
+        finally:
+            self.Pending -= 1
+            self.Completed += 1
+    
+    def Stream(self, Function, *Args):
+        
+        '''
+        Run Function(*Args, SolutionQueue, StopEvent) on a worker and return an async iterator
+        over the records it puts on SolutionQueue. Function must put a record of type
+        "summary" last. Closing the iterator early (eg: the client disconnected) sets
+        StopEvent so that the worker stops searching.
+        Raises PoolSaturated straight away if the queue is full.
+        '''
+        
+        if self.Pending >= self.Capacity():
+            self.Rejected += 1
+            raise PoolSaturated(self.RetryAfter)
+        
+        self.Start()
+        
+        if self.Executor is not None:
+            if self.StreamManager is None:
+                self.StreamManager = multiprocessing.get_context(self.StartMethod).Manager()
+            SolutionQueue = self.StreamManager.Queue()
+            StopEvent = self.StreamManager.Event()
+        else:
+            SolutionQueue = queue.Queue()
+            StopEvent = threading.Event()
+        
+        Loop = asyncio.get_running_loop()
+        Future = Loop.run_in_executor(self.Executor, Function, *Args, SolutionQueue, StopEvent)
+        
+        # The worker is busy until the function returns, even if the stream is closed earlier
+        self.Pending += 1
+        Future.add_done_callback(self._StreamFinished)
+        
+        async def Records():
+            try:
+                while True:
+                    try:
+                        Record = await Loop.run_in_executor(None, SolutionQueue.get, True, 0.1)
+                    except queue.Empty:
+                        # Re-raise the error of a worker that failed before its summary
+                        if Future.done():
+                            Future.result()
+                            return
+                        continue
+                    
+                    yield Record
+                    
+                    if Record.get("type") == "summary":
+                        return
+            finally:
+                StopEvent.set()
+        
+        return Records()
+    
+    def _StreamFinished(self, Future):
+        
+        self.Pending -= 1
+        self.Completed += 1
+    
+    def Gauges(self):
+        
+        # Solves on the thread pool never wait for a worker
+        InFlight = min(self.Pending, self.Workers) if self.Workers > 0 else self.Pending
+        
+        return {
+            "workers": self.Workers,
+            "queue_size": self.QueueSize,
+            "in_flight": InFlight,
+            "queue_depth": self.Pending - InFlight,
+            "completed": self.Completed,
+            "rejected": self.Rejected,
+        }
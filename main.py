@@ -1,10 +1,66 @@
-from fastapi import FastAPI
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Literal
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from SolverManager import *
 from InputJSONClass import *
+from SolverCache import ResultCache
+from OmniSolver.PuzzleSymmetry import CanonicalOmniPuzzle
+from SolverPool import SolverPool, PoolSaturated
+from SolverBatch import ReadBatch, RunBatch, BatchTooLarge
+from SolverMetrics import MetricsRegistry, RequestTimer
+from SolverLog import GetLogger
 
-app = FastAPI()
+Log = GetLogger(__name__)
 
+# Solves run on a dedicated, bounded process pool instead of the API's thread pool
+Pool = SolverPool()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    Pool.Start()
+    yield
+    Pool.Shutdown()
+
+app = FastAPI(lifespan=lifespan)
+
+# Solved puzzles shared by /solve and /nqueens. Repeated puzzles are served from here
+# instead of running the solver again.
+SolveResults = ResultCache()
+
+# Request metrics, scraped from /metrics. The variant label is the set of enabled
+# constraint flags of the puzzle.
+Metrics = MetricsRegistry()
+RequestCount = Metrics.Counter("solver_requests_total", "Requests received", ("endpoint", "variant"))
+ErrorCount = Metrics.Counter("solver_errors_total", "Requests that failed", ("endpoint", "variant", "error"))
+StatusCount = Metrics.Counter("solver_status_total", "Solver status of the solves", ("endpoint", "variant", "status"))
+PhaseLatency = Metrics.Histogram(
+    "solver_phase_seconds",
+    "Time taken by each phase of a request: parse, build (model), solve and serialize",
+    ("endpoint", "variant", "phase")
+)
+Metrics.Gauge("solver_result_cache_hits_total", "Result cache hits", lambda: SolveResults.Hits, Type="counter")
+Metrics.Gauge("solver_result_cache_misses_total", "Result cache misses", lambda: SolveResults.Misses, Type="counter")
+Metrics.Gauge("solver_result_cache_hit_ratio", "Share of the result cache lookups that were hits",
+              lambda: SolveResults.Stats()["hit_ratio"])
+Metrics.Gauge("solver_result_cache_entries", "Solved puzzles in the result cache", lambda: len(SolveResults.Entries))
+Metrics.Gauge("solver_pool_in_flight", "Solves running on the solver pool", lambda: Pool.Gauges()["in_flight"])
+Metrics.Gauge("solver_pool_queue_depth", "Solves waiting for a solver process", lambda: Pool.Gauges()["queue_depth"])
+Metrics.Gauge("solver_pool_rejected_total", "Solves rejected by a full solver pool", lambda: Pool.Rejected, Type="counter")
+
+def omni_variant(puzzle: Omni):
+    return "+".join(Flag for Flag in OmniConstraintFlags if getattr(puzzle, Flag)) or "none"
+
+def chess_variant(puzzle: Chess):
+    return "+".join(Flag for Flag in ChessConstraintFlags if getattr(puzzle, Flag)) or "none"
+
+app.add_middleware(RequestTimer)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -25,60 +81,260 @@ app.add_middleware(
 async def health_check():
     return {"message": "OmniSolver API is running!"}
 
-@app.post("/solve")
-def solve_puzzle(puzzle: Omni):
+@app.get(path="/cache")
+async def cache_stats():
+    return SolveResults.Stats()
+
+@app.get(path="/pool")
+async def pool_stats():
+    return Pool.Gauges()
+
+@app.get(path="/metrics")
+async def metrics():
+    return PlainTextResponse(Metrics.Render(), media_type="text/plain; version=0.0.4")
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, e: RequestValidationError):
+    ErrorCount.Inc(request.url.path, "invalid", "validation")
+    return await request_validation_exception_handler(request, e)
+
+def saturated_response(e: PoolSaturated):
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(e.RetryAfter)},
+        content={
+            "success": False,
+            "solutions": [],
+            "message": str(e)
+        }
+    )
+
+def solve_response(Solutions, Details):
+    
+    # Check if solutions were found. Results served from the cache override "cached".
+    if Solutions and len(Solutions) > 0:
+        return {
+            "success": True,
+            "solutions": Solutions,
+            "cached": False,
+            **Details
+        }
+    else:
+        return {
+            "success": False,
+            "solutions": [],
+            "message": "Time limit reached before a solution was found" if Details.get("timed_out") else "No solutions found",
+            "cached": False,
+            **Details
+        }
+
+# Details that describe how a result was solved, left out of the results served from the cache
+SolveRunFields = {"elapsed", "build_time", "engine", "profile"}
+
+def is_cacheable(Details):
+    
+    # Solves and enumerations cut short by the time budget are not cached
+    if Details.get("timed_out", False):
+        return False
+    
+    return Details.get("exhaustive", True) or Details.get("capped", False)
+
+def omni_cache_key(puzzle: Omni):
+    
+    # Equivalent puzzles (relabelled digits, swapped bands, rotations, ...) share the
+    # cached solutions of their canonical puzzle
+    CanonicalPuzzle, Transform = CanonicalOmniPuzzle(puzzle)
+    
+    return SolveResults.Fingerprint(CanonicalPuzzle, Exclude=SolveSettingFields), Transform
+
+def chess_cache_key(puzzle: Chess):
+    
+    return SolveResults.Fingerprint(puzzle, Exclude=SolveSettingFields), None
+
+def cached_result(CacheKey, Transform):
+    
+    Result = SolveResults.Get(CacheKey)
+    if Result is None:
+        return None
+    
+    Solutions, Details = Result
     
-    print(f"Attempting to use OmniSolver with data {puzzle}")
+    if Transform is not None:
+        Solutions = [Transform.Invert(Solution) for Solution in Solutions]
+    
+    # The timings and engine belong to the solve that filled the cache, not to this request
+    Details = {Key: Value for Key, Value in Details.items() if Key not in SolveRunFields}
+    Details["cached"] = True
+    
+    return Solutions, Details
+
+def cache_result(CacheKey, Transform, Solutions, Details):
+    
+    if not is_cacheable(Details):
+        return
+    
+    # Solutions are cached in the frame of the canonical puzzle
+    if Transform is not None:
+        Solutions = [Transform.Apply(Solution) for Solution in Solutions]
+    
+    SolveResults.Put(CacheKey, (Solutions, Details))
+
+async def metered_solve(request: Request, puzzle, Endpoint, Variant, Manager, CacheKey):
+    
+    '''
+    Solve a single puzzle, served from the result cache when possible, and record the
+    request in the metrics.
+    '''
+    
+    RequestCount.Inc(Endpoint, Variant)
+    
+    # Reading and validating the payload happens before the endpoint is called
+    RequestStart = getattr(request.state, "RequestStart", None)
+    if RequestStart is not None:
+        PhaseLatency.Observe(time.perf_counter() - RequestStart, Endpoint, Variant, "parse")
     
     try:
-        Solutions = OmniSolverManager(puzzle)
+        Key, Transform = CacheKey(puzzle)
+        Result = cached_result(Key, Transform)
         
-        # Check if solutions were found
-        if Solutions and len(Solutions) > 0:
-            return {
-                "success": True,
-                "solutions": Solutions
-            }
-        else:
-            return {
-                "success": False,
-                "solutions": [],
-                "message": "No solutions found"
-            }
+        if Result is None:
+            Result = await Pool.Run(Manager, puzzle, Pool.SearchWorkerCeiling())
+            cache_result(Key, Transform, *Result)
             
+            Details = Result[1]
+            PhaseLatency.Observe(Details.get("build_time", 0.0), Endpoint, Variant, "build")
+            PhaseLatency.Observe(Details["elapsed"], Endpoint, Variant, "solve")
+            StatusCount.Inc(Endpoint, Variant, Details["status"])
+        
+        StartTime = time.perf_counter()
+        Response = JSONResponse(content=jsonable_encoder(solve_response(*Result)))
+        PhaseLatency.Observe(time.perf_counter() - StartTime, Endpoint, Variant, "serialize")
+        
+        return Response
+    
+    except PoolSaturated as e:
+        ErrorCount.Inc(Endpoint, Variant, "saturated")
+        return saturated_response(e)
+    
     except Exception as e:
+        ErrorCount.Inc(Endpoint, Variant, "solver")
         return {
             "success": False,
             "solutions": [],
             "message": f"Error solving puzzle: {str(e)}"
         }
 
+@app.post("/solve")
+async def solve_puzzle(puzzle: Omni, request: Request):
+    
+    Log.debug("Attempting to use OmniSolver with data %s", puzzle)
+    
+    return await metered_solve(request, puzzle, "/solve", omni_variant(puzzle), OmniSolverManager, omni_cache_key)
+
 @app.post("/nqueens")
-def solve_chess(puzzle: Chess):
+async def solve_chess(puzzle: Chess, request: Request):
     
-    try:
-        Solutions = ChessSolverManager(puzzle)
+    return await metered_solve(request, puzzle, "/nqueens", chess_variant(puzzle), ChessSolverManager, chess_cache_key)
         
-        # Check if solutions were found
-        if Solutions and len(Solutions) > 0:
-            return {
-                "success": True,
-                "solutions": Solutions
-            }
-        else:
-            return {
+def stream_response(request: Request, Records, format):
+    
+    '''
+    Stream the records of a solve as NDJSON (one JSON object per line) or as
+    Server-Sent Events. The solve is stopped when the client disconnects.
+    '''
+    
+    async def Body():
+        try:
+            async for Record in Records:
+                if await request.is_disconnected():
+                    break
+                
+                if format == "sse":
+                    yield f"event: {Record['type']}\ndata: {json.dumps(Record)}\n\n"
+                else:
+                    yield json.dumps(Record) + "\n"
+        except Exception as e:
+            Record = {"type": "error", "message": f"Error solving puzzle: {str(e)}"}
+            if format == "sse":
+                yield f"event: error\ndata: {json.dumps(Record)}\n\n"
+            else:
+                yield json.dumps(Record) + "\n"
+        finally:
+            await Records.aclose()
+    
+    MediaType = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    
+    return StreamingResponse(Body(), media_type=MediaType)
+
+@app.post("/solve/stream")
+async def solve_puzzle_stream(puzzle: Omni, request: Request, format: Literal["ndjson", "sse"] = "ndjson"):
+    
+    '''
+    Streaming variant of /solve. Solutions are sent as soon as they are found
+    (upto MaxSolutions), followed by a summary record.
+    '''
+    
+    RequestCount.Inc("/solve/stream", omni_variant(puzzle))
+    
+    try:
+        Records = Pool.Stream(OmniStreamManager, puzzle, Pool.SearchWorkerCeiling())
+    except PoolSaturated as e:
+        ErrorCount.Inc("/solve/stream", omni_variant(puzzle), "saturated")
+        return saturated_response(e)
+    
+    return stream_response(request, Records, format)
+
+@app.post("/nqueens/stream")
+async def solve_chess_stream(puzzle: Chess, request: Request, format: Literal["ndjson", "sse"] = "ndjson"):
+    
+    RequestCount.Inc("/nqueens/stream", chess_variant(puzzle))
+    
+    try:
+        Records = Pool.Stream(ChessStreamManager, puzzle, Pool.SearchWorkerCeiling())
+    except PoolSaturated as e:
+        ErrorCount.Inc("/nqueens/stream", chess_variant(puzzle), "saturated")
+        return saturated_response(e)
+    
+    return stream_response(request, Records, format)
+
+async def batch_response(request: Request, Model, BatchManager, CacheKey, order):
+    
+    # The items of a batch may use any constraints
+    RequestCount.Inc(request.url.path, "batch")
+    
+    try:
+        Items = await ReadBatch(request, Model)
+    except BatchTooLarge as e:
+        ErrorCount.Inc(request.url.path, "batch", "too_large")
+        return JSONResponse(
+            status_code=413,
+            content={
                 "success": False,
                 "solutions": [],
-                "message": "No solutions found"
+                "message": str(e)
             }
-            
-    except Exception as e:
-        return {
-            "success": False,
-            "solutions": [],
-            "message": f"Error solving puzzle: {str(e)}"
-        }
-        
+        )
+    
+    Records = RunBatch(Items, Pool, BatchManager, CacheKey, cached_result, cache_result, solve_response, order)
+    
+    return stream_response(request, Records, "ndjson")
+
+@app.post("/solve/batch")
+async def solve_puzzle_batch(request: Request, order: Literal["input", "completion"] = "input"):
+    
+    '''
+    Solve many puzzles in one request. The body is a JSON array of /solve payloads, or one
+    payload per line (JSONL). A result record with the outcome of each item is streamed
+    back as NDJSON, in input or completion order, followed by a summary record.
+    '''
+    
+    return await batch_response(request, Omni, OmniBatchManager, omni_cache_key, order)
+
+@app.post("/nqueens/batch")
+async def solve_chess_batch(request: Request, order: Literal["input", "completion"] = "input"):
+    
+    return await batch_response(request, Chess, ChessBatchManager, chess_cache_key, order)
+
 # @app.post("/pocketcube")
 # def solve_pocket_cube(puzzle: PocketCube):
     
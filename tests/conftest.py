@@ -0,0 +1,177 @@
+import os
+import sys
+import random
+import pytest
+
+# The modules of the API live at the top of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from InputJSONClass import Omni
+
+# Arto Inkala's "hardest sudoku" and its solution
+Inkala = [
+    [8, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 3, 6, 0, 0, 0, 0, 0],
+    [0, 7, 0, 0, 9, 0, 2, 0, 0],
+    [0, 5, 0, 0, 0, 7, 0, 0, 0],
+    [0, 0, 0, 0, 4, 5, 7, 0, 0],
+    [0, 0, 0, 1, 0, 0, 0, 3, 0],
+    [0, 0, 1, 0, 0, 0, 0, 6, 8],
+    [0, 0, 8, 5, 0, 0, 0, 1, 0],
+    [0, 9, 0, 0, 0, 0, 4, 0, 0],
+]
+InkalaSolution = [
+    [8, 1, 2, 7, 5, 3, 6, 4, 9],
+    [9, 4, 3, 6, 8, 2, 1, 7, 5],
+    [6, 7, 5, 4, 9, 1, 2, 8, 3],
+    [1, 5, 4, 2, 3, 7, 8, 9, 6],
+    [3, 6, 9, 8, 4, 5, 7, 2, 1],
+    [2, 8, 7, 1, 6, 9, 5, 3, 4],
+    [5, 2, 1, 9, 7, 4, 3, 6, 8],
+    [4, 3, 8, 5, 2, 6, 9, 1, 7],
+    [7, 9, 6, 3, 1, 8, 4, 5, 2],
+]
+
+# A sudoku solution that also respects the anti-king, anti-knight and orthogonal
+# non-consecutive rules. The two givens of Miracle only have this solution.
+Miracle = [[0]*9 for _ in range(4)] + [[0, 0, 1] + [0]*6, [0]*6 + [2, 0, 0]] + [[0]*9 for _ in range(3)]
+MiracleSolution = [
+    [4, 8, 3, 7, 2, 6, 1, 5, 9],
+    [7, 2, 6, 1, 5, 9, 4, 8, 3],
+    [1, 5, 9, 4, 8, 3, 7, 2, 6],
+    [8, 3, 7, 2, 6, 1, 5, 9, 4],
+    [2, 6, 1, 5, 9, 4, 8, 3, 7],
+    [5, 9, 4, 8, 3, 7, 2, 6, 1],
+    [3, 7, 2, 6, 1, 5, 9, 4, 8],
+    [6, 1, 5, 9, 4, 8, 3, 7, 2],
+    [9, 4, 8, 3, 7, 2, 6, 1, 5],
+]
+
+# A 6x6 sudoku solution with boxes of 2 rows and 3 columns
+Classic6x6Solution = [
+    [5, 6, 2, 1, 3, 4],
+    [4, 1, 3, 2, 5, 6],
+    [3, 4, 1, 5, 6, 2],
+    [2, 5, 6, 4, 1, 3],
+    [1, 3, 4, 6, 2, 5],
+    [6, 2, 5, 3, 4, 1],
+]
+
+# A 7x7 latin square, which has no boxes
+Latin7x7Solution = [
+    [1, 3, 2, 5, 4, 6, 7],
+    [3, 1, 4, 7, 2, 5, 6],
+    [4, 7, 1, 6, 3, 2, 5],
+    [2, 6, 7, 3, 5, 4, 1],
+    [5, 4, 3, 1, 6, 7, 2],
+    [6, 2, 5, 4, 7, 1, 3],
+    [7, 5, 6, 2, 1, 3, 4],
+]
+
+def PatternSolution(OrderRow, OrderCol):
+    
+    '''
+    A sudoku solution for boxes of OrderRow rows and OrderCol columns, made of shifted rows.
+    '''
+    
+    Size = OrderRow*OrderCol
+    return [[(OrderCol*(r % OrderRow) + r//OrderRow + c) % Size + 1 for c in range(Size)] for r in range(Size)]
+
+def Givens(Solution, Count, Seed):
+    
+    '''
+    A puzzle made of Count cells of Solution, picked at random.
+    '''
+    
+    N = len(Solution)
+    Kept = set(random.Random(Seed).sample(range(N*N), Count))
+    
+    return [[Solution[r][c] if r*N + c in Kept else 0 for c in range(N)] for r in range(N)]
+
+# Sample puzzles: the Omni fields of the puzzle and a solution of it
+Samples = {
+    "inkala": ({"Matrix": Inkala}, InkalaSolution),
+    "classic-6x6": ({"Matrix": Givens(Classic6x6Solution, 12, 6), "OrderRow": 2, "OrderCol": 3, "UpperBound": 6},
+                    Classic6x6Solution),
+    "classic-16x16": ({"Matrix": Givens(PatternSolution(4, 4), 150, 5), "OrderRow": 4, "OrderCol": 4, "UpperBound": 16},
+                      PatternSolution(4, 4)),
+    "anti-king": ({"Matrix": Givens(MiracleSolution, 12, 1), "AntiKing": True}, MiracleSolution),
+    "anti-knight": ({"Matrix": Givens(MiracleSolution, 12, 2), "AntiKnight": True}, MiracleSolution),
+    "nonconsec": ({"Matrix": Givens(MiracleSolution, 12, 3), "OrthogonalNonConsec": True}, MiracleSolution),
+    "latin-7x7": ({"Matrix": Givens(Latin7x7Solution, 22, 8), "Sudoku": False, "LatinSquare": True, "UpperBound": 7},
+                  Latin7x7Solution),
+    "miracle": ({"Matrix": Miracle, "AntiKing": True, "AntiKnight": True, "OrthogonalNonConsec": True},
+                MiracleSolution),
+}
+
+def SolutionErrors(puzzle, Grid):
+    
+    '''
+    The rules of an Omni sudoku that Grid breaks. The givens, rows, columns and boxes are
+    checked (the boxes only for sudokus), together with the anti-king, anti-knight and non-consecutive flags.
+    '''
+    
+    Errors = []
+    N = len(puzzle.Matrix)
+    Digits = set(range(puzzle.LowerBound, puzzle.UpperBound + 1))
+    
+    if len(Grid) != N or any(len(Row) != N for Row in Grid):
+        return ["shape"]
+    
+    for r in range(N):
+        for c in range(N):
+            if puzzle.Matrix[r][c] and Grid[r][c] != puzzle.Matrix[r][c]:
+                Errors.append(f"given ({r}, {c})")
+    
+    Units = [[(r, c) for c in range(N)] for r in range(N)]
+    Units += [[(r, c) for r in range(N)] for c in range(N)]
+    if puzzle.Sudoku:
+        Units += [
+            [(r, c) for r in range(Top, Top + puzzle.OrderRow) for c in range(Left, Left + puzzle.OrderCol)]
+            for Top in range(0, N, puzzle.OrderRow)
+            for Left in range(0, N, puzzle.OrderCol)
+        ]
+    for Unit in Units:
+        if {Grid[r][c] for r, c in Unit} != Digits:
+            Errors.append(f"unit {Unit[0]}-{Unit[-1]}")
+    
+    Moves = []
+    if puzzle.AntiKing:
+        Moves += [(1, -1), (1, 1)]
+    if puzzle.AntiKnight:
+        Moves += [(1, -2), (1, 2), (2, -1), (2, 1)]
+    
+    for r in range(N):
+        for c in range(N):
+            for dr, c2 in [(dr, c + dc) for dr, dc in Moves]:
+                if r + dr < N and 0 <= c2 < N and Grid[r][c] == Grid[r + dr][c2]:
+                    Errors.append(f"chess ({r}, {c})-({r + dr}, {c2})")
+            
+            if puzzle.OrthogonalNonConsec:
+                for r2, c2 in ((r + 1, c), (r, c + 1)):
+                    if r2 < N and c2 < N and abs(Grid[r][c] - Grid[r2][c2]) == 1:
+                        Errors.append(f"consecutive ({r}, {c})-({r2}, {c2})")
+    
+    return Errors
+
+@pytest.fixture
+def CheckSolution():
+    
+    def Check(puzzle, Grid):
+        Errors = SolutionErrors(puzzle, Grid)
+        assert not Errors, f"Invalid solution {Grid}: {Errors[:5]}"
+    
+    return Check
+
+@pytest.fixture(scope="session")
+def SamplePuzzle():
+    
+    def Load(Name, **Update):
+        return Omni(**{**Samples[Name][0], **Update})
+    
+    return Load
+
+@pytest.fixture(scope="session")
+def SampleSolution():
+    
+    return lambda Name: Samples[Name][1]
@@ -0,0 +1,172 @@
+import pytest
+from ortools.sat.python import cp_model
+from InputJSONClass import Omni
+from OmniSolver.BitmaskSudokuSolver import BitmaskSudokuSolver
+from SolverManager import OmniSolverManager, BuildOmniSolver, RunSolver, BitmaskEligible
+import SolverConfig
+
+# Solution of a classic 9x9 sudoku, used to build a puzzle with several solutions
+Classic9x9 = [[(3*(r % 3) + r//3 + c) % 9 + 1 for c in range(9)] for r in range(9)]
+
+def EmptyGrid(OrderRow, OrderCol, **Flags):
+    
+    Size = OrderRow*OrderCol
+    return Omni(OrderRow=OrderRow, OrderCol=OrderCol, Matrix=[[0]*Size for _ in range(Size)],
+                UpperBound=Size, **Flags)
+
+# Puzzles with a known number of solutions: (solutions, puzzle)
+MultiSolutionPuzzles = {
+    "empty-4x4": (288, lambda: EmptyGrid(2, 2)),
+    "classic-9x9-without-1-2-3": (30, lambda: Omni(Matrix=[[v if v > 3 else 0 for v in Row] for Row in Classic9x9])),
+    "empty-6x6-nonconsec": (48, lambda: EmptyGrid(2, 3, OrthogonalNonConsec=True)),
+    "empty-4x4-anti-king": (0, lambda: EmptyGrid(2, 2, AntiKing=True)),
+    "empty-4x4-latin": (576, lambda: EmptyGrid(2, 2, Sudoku=False, LatinSquare=True)),
+    "empty-5x5-latin-anti-king": (240, lambda: EmptyGrid(1, 5, Sudoku=False, LatinSquare=True, AntiKing=True)),
+}
+
+SampleNames = ["inkala", "classic-16x16", "classic-6x6", "anti-king", "anti-knight", "nonconsec", "miracle", "latin-7x7"]
+
+def LoadPuzzle(SamplePuzzle, Name):
+    
+    if Name in MultiSolutionPuzzles:
+        return MultiSolutionPuzzles[Name][1]()
+    
+    return SamplePuzzle(Name)
+
+@pytest.fixture(params=SampleNames + list(MultiSolutionPuzzles))
+def Puzzle(request, SamplePuzzle):
+    
+    return LoadPuzzle(SamplePuzzle, request.param)
+
+def RunBoth(puzzle, Mode):
+    
+    '''
+    Run the bitmask solver and CP-SAT on a puzzle in the given mode.
+    '''
+    
+    puzzle = puzzle.model_copy(update={"Mode": Mode})
+    assert BitmaskEligible(puzzle)
+    
+    return (RunSolver(BitmaskSudokuSolver(puzzle, Boxes=puzzle.Sudoku), puzzle),
+            RunSolver(BuildOmniSolver(puzzle), puzzle))
+
+def Canonical(Solutions):
+    
+    return sorted(tuple(map(tuple, Solution)) for Solution in Solutions)
+
+def test_SingleModeAgrees(Puzzle, CheckSolution):
+    
+    (Solutions, Details), (Expected, ExpectedDetails) = RunBoth(Puzzle, "single")
+    
+    assert Details["status"] == ExpectedDetails["status"]
+    assert len(Solutions) == len(Expected)
+    for Solution in Solutions:
+        CheckSolution(Puzzle, Solution)
+
+def test_UniqueModeAgrees(Puzzle, CheckSolution):
+    
+    (Solutions, Details), (Expected, ExpectedDetails) = RunBoth(Puzzle, "unique")
+    
+    assert Details["verdict"] == ExpectedDetails["verdict"]
+    assert Details["exhaustive"] and ExpectedDetails["exhaustive"]
+    assert len(Solutions) == len(Expected)
+    for Solution in Solutions:
+        CheckSolution(Puzzle, Solution)
+
+def test_AllModeAgrees(Puzzle, CheckSolution):
+    
+    (Solutions, Details), (Expected, ExpectedDetails) = RunBoth(Puzzle, "all")
+    
+    for Key in ("status", "count", "exhaustive", "capped"):
+        assert Details[Key] == ExpectedDetails[Key]
+    
+    # Capped enumerations may stop on different solutions
+    if ExpectedDetails["exhaustive"]:
+        assert Canonical(Solutions) == Canonical(Expected)
+    for Solution in Solutions:
+        CheckSolution(Puzzle, Solution)
+
+@pytest.mark.parametrize("Name", list(MultiSolutionPuzzles))
+def test_SolutionCounts(Name):
+    
+    Count, Build = MultiSolutionPuzzles[Name]
+    puzzle = Build().model_copy(update={"Mode": "all"})
+    
+    Solutions, Details = RunSolver(BitmaskSudokuSolver(puzzle, Boxes=puzzle.Sudoku), puzzle)
+    
+    assert len(Solutions) == Count
+    assert Details["exhaustive"]
+
+def test_CappedEnumerationAgrees(CheckSolution):
+    
+    puzzle = EmptyGrid(2, 2).model_copy(update={"MaxSolutions": 50})
+    (Solutions, Details), (_, ExpectedDetails) = RunBoth(puzzle, "all")
+    
+    assert Details["count"] == ExpectedDetails["count"] == 50
+    assert Details["capped"] and ExpectedDetails["capped"]
+    assert Details["status"] == ExpectedDetails["status"] == "FEASIBLE"
+    assert len(Canonical(Solutions)) == len(set(Canonical(Solutions))) == 50
+    for Solution in Solutions:
+        CheckSolution(puzzle, Solution)
+
+def test_GaveUpIsNotInfeasible(SamplePuzzle):
+    
+    Solver = BitmaskSudokuSolver(SamplePuzzle("inkala"), NodeLimit=0)
+    
+    assert Solver.Solve() == []
+    assert Solver.GaveUp
+    assert Solver.ModelStatus == cp_model.UNKNOWN
+    assert not Solver.Exhaustive
+
+def test_EasyPuzzlesUseTheBitmaskSolver(SamplePuzzle, CheckSolution):
+    
+    puzzle = SamplePuzzle("classic-6x6")
+    Solutions, Details = OmniSolverManager(puzzle)
+    
+    assert Details["engine"] == "bitmask"
+    CheckSolution(puzzle, Solutions[0])
+
+@pytest.mark.parametrize("Name", ["latin-7x7", "empty-4x4-latin"])
+def test_LatinSquaresUseTheBitmaskSolverWithoutBoxes(SamplePuzzle, CheckSolution, Name):
+    
+    # The boxes of OrderRow x OrderCol would make the empty 4x4 grid a sudoku with 288 solutions
+    puzzle = LoadPuzzle(SamplePuzzle, Name).model_copy(update={"Mode": "all"})
+    Solutions, Details = OmniSolverManager(puzzle)
+    
+    assert Details["engine"] == "bitmask"
+    assert len(Solutions) == (1 if Name == "latin-7x7" else 576)
+    for Solution in Solutions:
+        CheckSolution(puzzle, Solution)
+
+def test_BoxesAreCheckedOnlyForSudokus(SamplePuzzle):
+    
+    # The 7x7 grid cannot be split into boxes of the default 3x3 order
+    assert BitmaskEligible(SamplePuzzle("latin-7x7"))
+    assert not BitmaskEligible(SamplePuzzle("latin-7x7", Sudoku=True))
+    assert not BitmaskEligible(SamplePuzzle("latin-7x7", LatinSquare=False))
+
+@pytest.mark.parametrize("Name, Mode", [
+    ("inkala", "single"),
+    ("inkala", "unique"),
+    ("inkala", "all"),
+    ("classic-9x9-without-1-2-3", "all"),
+    ("empty-6x6-nonconsec", "all"),
+])
+def test_GaveUpFallsBackToCPSAT(monkeypatch, SamplePuzzle, CheckSolution, Name, Mode):
+    
+    puzzle = LoadPuzzle(SamplePuzzle, Name).model_copy(update={"Mode": Mode})
+    
+    Expected, ExpectedDetails = RunSolver(BuildOmniSolver(puzzle), puzzle)
+    
+    # The enumerations find some of the solutions before giving up, which must be dropped
+    monkeypatch.setattr(SolverConfig, "SOLVER_BITMASK_NODE_LIMIT", 3)
+    Solutions, Details = OmniSolverManager(puzzle)
+    
+    assert Details["engine"] == "cp-sat"
+    for Key in ("status", "verdict", "count", "exhaustive", "capped"):
+        assert Details.get(Key) == ExpectedDetails.get(Key)
+    
+    if Mode == "all":
+        assert Canonical(Solutions) == Canonical(Expected)
+    for Solution in Solutions:
+        CheckSolution(puzzle, Solution)
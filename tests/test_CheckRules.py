@@ -0,0 +1,41 @@
+import pytest
+from Benchmarks.RunBenchmarks import BuildSolver, LoadCorpus, DefaultCorpus
+from Benchmarks.CheckRules import RuleErrors, Rules
+
+Corpus = LoadCorpus(DefaultCorpus)
+
+def Case(Name):
+    
+    return next(Case for Case in Corpus if Case["name"] == Name)
+
+def test_EveryCorpusMethodHasARule():
+    
+    Methods = {Call["method"] for Case in Corpus for Call in Case["constraints"]}
+    assert Methods <= set(Rules)
+
+@pytest.mark.parametrize("Name", ["killer-a", "sandwich-a", "skyscraper-latin-6x6", "warping-renban",
+                                  "star-battle-8x8", "nqueens-8", "kakurasu-6x6"])
+def test_RulesAcceptTheSolutionAndRejectASwap(Name):
+    
+    Solver, puzzle = BuildSolver(Case(Name))
+    Solution = Solver.Solve(30)[0]
+    
+    assert RuleErrors(Case(Name), puzzle, [Solution]) == ([], True)
+    
+    # Swapping two different cells of a row breaks the row, column or box of a sudoku, and
+    # moves a piece or shaded cell to another column otherwise
+    Row = next(Row for Row in Solution if len(set(Row)) > 1)
+    c1 = 0
+    c2 = next(c for c, Value in enumerate(Row) if Value != Row[0])
+    Row[c1], Row[c2] = Row[c2], Row[c1]
+    
+    Errors, _ = RuleErrors(Case(Name), puzzle, [Solution])
+    assert Errors
+
+def test_RepeatedSolutionsAreErrors():
+    
+    Solver, puzzle = BuildSolver(Case("nqueens-8"))
+    Solution = Solver.Solve(30)[0]
+    
+    Errors, _ = RuleErrors(Case("nqueens-8"), puzzle, [Solution, Solution])
+    assert Errors == ["1 repeated solution(s)"]
@@ -0,0 +1,135 @@
+import random
+import pytest
+from OmniSolver.PuzzleSymmetry import PuzzleTransform, SymmetryGroupForOmni, CanonicalOmniPuzzle
+
+def RandomSudokuTransform(Rand, Size, OrderRow, OrderCol, Transpose):
+    
+    '''
+    A random symmetry of the full sudoku group: bands, stacks, rows within bands, columns
+    within stacks, transposition and digit relabelling.
+    '''
+    
+    def LineOrder(Order):
+        Bands = Rand.sample(range(Size//Order), Size//Order)
+        return [Band*Order + Line for Band in Bands for Line in Rand.sample(range(Order), Order)]
+    
+    Digits = list(range(1, Size + 1))
+    
+    return PuzzleTransform(Transpose, LineOrder(OrderRow), LineOrder(OrderCol),
+                           dict(zip(Digits, Rand.sample(Digits, Size))))
+
+def DihedralTransforms(Size, Reverse):
+    
+    '''
+    The 8 rotations/reflections of the grid, with or without the digit reversal.
+    '''
+    
+    Lines = list(range(Size))
+    DigitMap = {Digit: Size + 1 - Digit if Reverse else Digit for Digit in range(1, Size + 1)}
+    
+    return [
+        PuzzleTransform(Transpose, RowOrder, ColOrder, DigitMap)
+        for Transpose in (False, True)
+        for RowOrder in (Lines, Lines[::-1])
+        for ColOrder in (Lines, Lines[::-1])
+    ]
+
+def IsDihedral(Transform: PuzzleTransform):
+    
+    Lines = tuple(range(len(Transform.RowOrder)))
+    return Transform.RowOrder in (Lines, Lines[::-1]) and Transform.ColOrder in (Lines, Lines[::-1])
+
+def CheckEquivalentPuzzles(puzzle, Solution, Transforms, CheckSolution):
+    
+    '''
+    Equivalent puzzles share a cache entry, so they must have the same canonical form, and
+    the solution cached in the canonical frame must map back to a solution of every one of
+    them. Returns the transform of the puzzle.
+    '''
+    
+    Canonical, Transform = CanonicalOmniPuzzle(puzzle)
+    assert Transform is not None
+    
+    Cached = Transform.Apply(Solution)
+    CheckSolution(Canonical, Cached)
+    
+    for Symmetry in Transforms:
+        Equivalent = puzzle.model_copy(update={"Matrix": Symmetry.Apply(puzzle.Matrix)})
+        EquivalentCanonical, EquivalentTransform = CanonicalOmniPuzzle(Equivalent)
+        
+        assert EquivalentCanonical.Matrix == Canonical.Matrix
+        CheckSolution(Equivalent, EquivalentTransform.Invert(Cached))
+    
+    return Transform
+
+@pytest.mark.parametrize("Transpose", [False, True])
+def test_ApplyInvertRoundTrip(SamplePuzzle, Transpose):
+    
+    Rand = random.Random(4)
+    Grid = SamplePuzzle("inkala").Matrix
+    
+    for _ in range(20):
+        Transform = RandomSudokuTransform(Rand, 9, 3, 3, Transpose)
+        Mapped = Transform.Apply(Grid)
+        
+        assert Transform.Invert(Mapped) == Grid
+        assert Transform.Apply(Transform.Invert(Grid)) == Grid
+        
+        # Empty cells are moved but never relabelled
+        assert sum(Row.count(0) for Row in Mapped) == sum(Row.count(0) for Row in Grid)
+
+def test_CanonicalTransformMapsThePuzzle(SamplePuzzle):
+    
+    puzzle = SamplePuzzle("inkala")
+    Canonical, Transform = CanonicalOmniPuzzle(puzzle)
+    
+    assert Transform.Apply(puzzle.Matrix) == Canonical.Matrix
+    assert Transform.Invert(Canonical.Matrix) == puzzle.Matrix
+
+def test_EquivalentSudokusShareTheCanonicalForm(SamplePuzzle, SampleSolution, CheckSolution):
+    
+    Rand = random.Random(11)
+    Transforms = [RandomSudokuTransform(Rand, 9, 3, 3, Index % 2 == 1) for Index in range(6)]
+    
+    CheckEquivalentPuzzles(SamplePuzzle("inkala"), SampleSolution("inkala"), Transforms, CheckSolution)
+
+def test_RectangularBoxesAreNotTransposed(SamplePuzzle, SampleSolution, CheckSolution):
+    
+    Rand = random.Random(7)
+    Transforms = [RandomSudokuTransform(Rand, 6, 2, 3, False) for _ in range(4)]
+    
+    puzzle = SamplePuzzle("classic-6x6")
+    Transform = CheckEquivalentPuzzles(puzzle, SampleSolution("classic-6x6"), Transforms, CheckSolution)
+    
+    # Transposing a grid with 2x3 boxes breaks the boxes
+    assert not SymmetryGroupForOmni(puzzle, 6, 6, 1, 6).AllowTranspose
+    assert not Transform.Transpose
+
+@pytest.mark.parametrize("Name", ["anti-king", "anti-knight"])
+def test_ChessPuzzlesOnlyUseDihedralTransforms(SamplePuzzle, SampleSolution, CheckSolution, Name):
+    
+    puzzle = SamplePuzzle(Name)
+    Group = SymmetryGroupForOmni(puzzle, 9, 9, 1, 9)
+    assert (Group.Geometric, Group.Relabel) == ("dihedral", "any")
+    
+    # Swapping rows within a band would break the anti-king/anti-knight rule
+    Transform = CheckEquivalentPuzzles(puzzle, SampleSolution(Name), DihedralTransforms(9, False), CheckSolution)
+    assert IsDihedral(Transform)
+    
+    # Even when a band symmetry would give a smaller grid
+    Swapped = puzzle.model_copy(update={"Matrix": [puzzle.Matrix[1], puzzle.Matrix[0]] + puzzle.Matrix[2:]})
+    assert IsDihedral(CanonicalOmniPuzzle(Swapped)[1])
+
+@pytest.mark.parametrize("Name", ["nonconsec", "miracle"])
+def test_NonConsecutivePuzzlesOnlyReverseDigits(SamplePuzzle, SampleSolution, CheckSolution, Name):
+    
+    puzzle = SamplePuzzle(Name)
+    Group = SymmetryGroupForOmni(puzzle, 9, 9, 1, 9)
+    assert (Group.Geometric, Group.Relabel) == ("dihedral", "reverse")
+    
+    Transforms = DihedralTransforms(9, False) + DihedralTransforms(9, True)
+    Transform = CheckEquivalentPuzzles(puzzle, SampleSolution(Name), Transforms, CheckSolution)
+    
+    assert IsDihedral(Transform)
+    assert Transform.DigitMap in ({Digit: Digit for Digit in range(1, 10)},
+                                  {Digit: 10 - Digit for Digit in range(1, 10)})
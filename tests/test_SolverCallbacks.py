@@ -0,0 +1,79 @@
+import copy
+import pytest
+from InputJSONClass import Omni, Chess
+from NQueens.NQueensSolver import NQueens
+from SolverManager import BuildOmniSolver
+from Benchmarks.RunBenchmarks import BuildSolver, LoadCorpus, DefaultCorpus
+
+def CorpusCase(Name):
+    
+    return next(Case for Case in LoadCorpus(DefaultCorpus, Name) if Case["name"] == Name)
+
+def Distinct(Solutions):
+    
+    return {tuple(map(tuple, Solution)) for Solution in Solutions}
+
+def IsRenban(Values):
+    
+    return len(set(Values)) == len(Values) and max(Values) - min(Values) == len(Values) - 1
+
+def WarpingRenbanErrors(Case, Grid):
+    
+    '''
+    The warping renban line pairs of a corpus case that Grid breaks: either both lines of a
+    pair are renbans, or the two lines together form one.
+    '''
+    
+    Call = next(Call for Call in Case["constraints"] if Call["method"] == "WarpingRenbanLinesConstraints")
+    
+    Errors = []
+    for Line1, Line2 in zip(*Call["args"][:2]):
+        Values1 = [Grid[r][c] for r, c in Line1]
+        Values2 = [Grid[r][c] for r, c in Line2]
+        if not (IsRenban(Values1) and IsRenban(Values2)) and not IsRenban(Values1 + Values2):
+            Errors.append((Line1, Line2))
+    
+    return Errors
+
+def test_FreeLiteralsDoNotRepeatGrids():
+    
+    puzzle = Omni(OrderRow=2, OrderCol=2, Matrix=[[0]*4 for _ in range(4)], UpperBound=4)
+    Solver = BuildOmniSolver(puzzle)
+    
+    # A literal that no constraint uses doubles every assignment of the model
+    Solver.Model.NewBoolVar("Free")
+    Solutions = Solver.MultiSolutionSolve()
+    
+    assert len(Solutions) == len(Distinct(Solutions)) == Solver.SolutionCount == 288
+    assert Solver.Exhaustive and not Solver.SolutionsCapped
+
+def test_FreeLiteralsDoNotRepeatQueens():
+    
+    Solver = NQueens(Chess(Order=8))
+    Solver.NQueensConstraint()
+    Solver.Model.NewBoolVar("Free")
+    
+    Streamed = []
+    assert Solver.MultiSolutionSolve(OnSolution=Streamed.append) == []
+    assert len(Streamed) == len(Distinct(Streamed)) == Solver.SolutionCount == 92
+
+@pytest.mark.parametrize("Name", ["warping-renban", "warping-renban-long", "warping-renban-long-pairwise"])
+@pytest.mark.parametrize("Blank", [False, True])
+def test_WarpingRenbanGridsAreDistinct(CheckSolution, Name, Blank):
+    
+    Case = copy.deepcopy(CorpusCase(Name))
+    
+    # Without half of its givens, the puzzle has many grids for each line that can warp
+    if Blank:
+        Givens = [(r, c) for r, Row in enumerate(Case["puzzle"]["Matrix"]) for c, Value in enumerate(Row) if Value]
+        for r, c in Givens[1::2]:
+            Case["puzzle"]["Matrix"][r][c] = 0
+    
+    Solver, puzzle = BuildSolver(Case)
+    Solutions = Solver.MultiSolutionSolve(50)
+    
+    assert len(Solutions) == len(Distinct(Solutions)) == Solver.SolutionCount == 50
+    assert Solver.SolutionsCapped
+    for Solution in Solutions:
+        CheckSolution(puzzle, Solution)
+        assert not WarpingRenbanErrors(Case, Solution)
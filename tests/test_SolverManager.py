@@ -0,0 +1,47 @@
+import copy
+import pytest
+from SolverManager import BuildOmniSolver, RunSolver
+from Benchmarks.RunBenchmarks import BuildSolver, LoadCorpus, DefaultCorpus
+
+def UniqueWarpingRenban(Name):
+    
+    '''
+    A warping renban case of the corpus with the cells of a solution of it given, except for
+    the cells of its lines. Returns the solver and puzzle of the case and the solution.
+    '''
+    
+    Case = copy.deepcopy(next(Case for Case in LoadCorpus(DefaultCorpus, Name) if Case["name"] == Name))
+    Solver, _ = BuildSolver(Case)
+    Solution = Solver.Solve(10)[0]
+    
+    Call = next(Call for Call in Case["constraints"] if Call["method"] == "WarpingRenbanLinesConstraints")
+    LineCells = {tuple(Cell) for Line in Call["args"][0] + Call["args"][1] for Cell in Line}
+    
+    Case["puzzle"]["Matrix"] = [[0 if (r, c) in LineCells else Value for c, Value in enumerate(Row)]
+                                for r, Row in enumerate(Solution)]
+    Case["puzzle"]["Mode"] = "unique"
+    
+    return BuildSolver(Case), Solution
+
+@pytest.mark.parametrize("Name", ["miracle", "anti-knight"])
+def test_FreeLiteralsDoNotMakeAPuzzleMultiple(SamplePuzzle, Name):
+    
+    puzzle = SamplePuzzle(Name, Mode="unique")
+    Solver = BuildOmniSolver(puzzle)
+    Solver.Model.NewBoolVar("Free")
+    
+    Solutions, Details = RunSolver(Solver, puzzle)
+    
+    assert Details["verdict"] == ("unique" if Name == "miracle" else "multiple")
+    assert Details["exhaustive"]
+    assert len({tuple(map(tuple, Solution)) for Solution in Solutions}) == len(Solutions)
+
+@pytest.mark.parametrize("Name", ["warping-renban", "warping-renban-long", "warping-renban-long-pairwise"])
+def test_WarpingRenbanIsUnique(CheckSolution, Name):
+    
+    (Solver, puzzle), Solution = UniqueWarpingRenban(Name)
+    Solutions, Details = RunSolver(Solver, puzzle)
+    
+    assert (Details["verdict"], Details["exhaustive"]) == ("unique", True)
+    assert Solutions == [Solution]
+    CheckSolution(puzzle, Solution)
@@ -0,0 +1,43 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+import main
+
+@pytest.fixture
+def Client():
+    
+    main.SolveResults.Clear()
+    with TestClient(main.app) as Client:
+        yield Client
+    main.SolveResults.Clear()
+
+def test_CacheHitsDoNotReportTheFirstSolve(SamplePuzzle, SampleSolution, Client):
+    
+    Payload = SamplePuzzle("inkala").model_dump()
+    
+    First = Client.post("/solve", json=Payload).json()
+    assert First["cached"] is False
+    assert {"elapsed", "build_time", "engine"} <= set(First)
+    
+    # The same puzzle with its digits reversed is served from the cache of the first one
+    Reversed = {**Payload, "Matrix": [[10 - Value if Value else 0 for Value in Row] for Row in Payload["Matrix"]]}
+    Second = Client.post("/solve", json=Reversed).json()
+    
+    assert Second["cached"] is True
+    assert not set(Second) & main.SolveRunFields
+    assert Second["solutions"] == [[[10 - Value for Value in Row] for Row in SampleSolution("inkala")]]
+    
+    # Serving a hit leaves the cached result untouched
+    Third = Client.post("/solve", json=Payload).json()
+    assert Third == {**{Key: Value for Key, Value in First.items() if Key not in main.SolveRunFields}, "cached": True}
+
+def test_BatchCacheHitsDoNotReportTheFirstSolve(SamplePuzzle, Client):
+    
+    Payload = SamplePuzzle("classic-6x6").model_dump()
+    Other = SamplePuzzle("inkala").model_dump()
+    Client.post("/solve", json=Payload)
+    
+    Records = [json.loads(Line) for Line in Client.post("/solve/batch", json=[Payload, Other]).text.splitlines()]
+    
+    assert Records[0]["cached"] is True and not set(Records[0]) & main.SolveRunFields
+    assert Records[1]["cached"] is False and "elapsed" in Records[1]